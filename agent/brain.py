@@ -6,12 +6,23 @@ Coordinates LLM, sentiment, memory, and emotion into a unified pipeline.
 import logging
 import time
 
-from config.config import SYSTEM_PROMPT, EXERCISE_TRIGGER_THRESHOLD, EXERCISE_COOLDOWN_TURNS
+from config.config import (
+    SYSTEM_PROMPT,
+    EXERCISE_TRIGGER_THRESHOLD,
+    EXERCISE_COOLDOWN_TURNS,
+    SENTIMENT_SENTENCE_MODE,
+    TURN_FALLBACK_REPLY,
+    PROFILE_TURNS,
+)
 from agent.llm import LLMClient
-from agent.sentiment import SentimentAnalyzer
-from agent.memory import ConversationMemory, MemoryEntry
+from agent.sentiment import SentimentAnalyzer, SentimentResult
+from agent.memory import ConversationMemory, MemoryEntry, MemoryNamespaces
 from agent.emotion import EmotionEngine
 from agent.exercises import ExerciseManager
+from agent.degradation import DegradationController, TurnLoad
+from agent.deadline import FallbackLog, TurnDeadline
+from agent.profiling import profile_call
+from agent.startup import profiler
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +31,28 @@ class AgentBrain:
     """Core agent that coordinates LLM, sentiment, memory, and emotion modules."""
 
     def __init__(self):
-        self.llm = LLMClient()
-        self.sentiment = SentimentAnalyzer()
-        self.memory = ConversationMemory()
-        self.emotion_engine = EmotionEngine()
-        self.exercise_manager = ExerciseManager()
+        with profiler.stage("llm"):
+            self.llm = LLMClient()
+        with profiler.stage("sentiment"):
+            self.sentiment = SentimentAnalyzer()
+        with profiler.stage("memory"):
+            self.memories = MemoryNamespaces()  # ChromaDB is opened on first use
+        with profiler.stage("emotion"):
+            self.emotion_engine = EmotionEngine()
+        with profiler.stage("exercises"):
+            self.exercise_manager = ExerciseManager()
+        self.load = DegradationController()
+        self.fallbacks = FallbackLog()
         self._conversation_history: list[dict] = []
         self._exercise_state: dict = {"pending": False, "active": False, "current_exercise": None, "step_index": 0}
+        self.last_reply_sentiment = None
         logger.info("AgentBrain initialized.")
 
+    @property
+    def memory(self) -> ConversationMemory:
+        """Memory for the default namespace (opened on first access)."""
+        return self.memories.get()
+
     def check_systems(self) -> dict[str, bool]:
         """Verify all subsystems are operational."""
         return {
@@ -37,10 +61,29 @@ class AgentBrain:
             "memory": True,
         }
 
-    def process(self, user_input: str, face_emotion: str | None = None, stream: bool = False):
+    def process(
+        self,
+        user_input: str,
+        face_emotion: str | None = None,
+        stream: bool = False,
+        namespace: str | None = None,
+        load: TurnLoad | None = None,
+        deadline: TurnDeadline | None = None,
+        profiled: bool = False,
+    ):
         """
         Full processing pipeline for a user message.
 
+        ``namespace`` selects whose long-term memory is searched and written
+        (defaults to MEMORY_DEFAULT_NAMESPACE). ``load`` is the turn's
+        degradation bookkeeping when the caller already started it (so time
+        spent capturing the camera counts); its level decides which optional
+        steps run. ``deadline`` likewise carries the turn's deadline; stages
+        that overrun their budget fall back (neutral sentiment, no memories,
+        a canned reply) and are recorded in it and in ``self.fallbacks``.
+        ``profiled`` (or PROFILE_TURNS) sample-profiles the call, including
+        the reply stream when ``stream`` is set, into PROFILE_DIR.
+
         1. Check for exercise flow (pending offer or active exercise)
         2. Sentiment analysis
         3. Memory retrieval (RAG)
@@ -49,18 +92,37 @@ class AgentBrain:
         6. LLM response generation
         7. Memory storage
         """
+        load = load or self.load.begin_turn()
+        deadline = deadline or TurnDeadline(self.fallbacks)
+        try:
+            if profiled or PROFILE_TURNS:
+                return profile_call(lambda: self._run_pipeline(user_input, face_emotion, stream, namespace, load, deadline))
+            return self._run_pipeline(user_input, face_emotion, stream, namespace, load, deadline)
+        except BaseException:
+            load.finish()
+            raise
+
+    def _run_pipeline(self, user_input, face_emotion, stream, namespace, load: TurnLoad, deadline: TurnDeadline):
         # 1. Handle exercise flow if active
         exercise_response = self._handle_exercise_flow(user_input)
         if exercise_response:
+            load.finish()
             return exercise_response if not stream else self._stream_response(exercise_response)
         
-        # 2. Analyze sentiment
-        sentiment_result = self.sentiment.analyze(user_input)
+        # 2. Analyze sentiment (per sentence, cached, when enabled); neutral if it overruns
+        analyze = self.sentiment.analyze_sentences if SENTIMENT_SENTENCE_MODE else self.sentiment.analyze
+        neutral = SentimentResult("neutral", 0.0, 0.0, {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0})
+        sentiment_result = deadline.run("sentiment", analyze, neutral, user_input)
         logger.info("Sentiment: %s", sentiment_result)
 
-        # 3. Retrieve relevant memories (RAG)
-        memories = self.memory.retrieve(user_input)
+        # 3. Retrieve relevant memories (RAG) from this user's namespace only; none if it overruns.
+        #    Opening the namespace (the first time: importing ChromaDB) counts against the budget.
+        def retrieve():
+            return self.memories.get(namespace).retrieve(user_input)
+
+        memories = deadline.run("retrieval", retrieve, []) if load.allows("rag") else []
         memory_context = self._format_memories(memories)
+        memory = self.memories.peek(namespace)  # For its mood timeline; None if not open (yet)
 
         # 4. Update emotional state
         mental_state = self.emotion_engine.update(
@@ -68,6 +130,7 @@ class AgentBrain:
             face_emotion=face_emotion,
             retrieved_memories=memories,
             exercise_threshold=EXERCISE_TRIGGER_THRESHOLD,
+            mood_timeline=memory.timeline if memory is not None else None,
         )
         
         # 5. Check if we should offer an exercise
@@ -78,56 +141,53 @@ class AgentBrain:
             self.exercise_manager.mark_exercise_offered(mental_state.session_turn_count)
             offer_message = self.exercise_manager.format_exercise_offer()
             logger.info("Offering mental exercise to user")
+            load.finish()
             return offer_message if not stream else self._stream_response(offer_message)
 
-        # 6. Build prompt and generate response
+        # 6. Build prompt and generate response (canned reply if the first token is late)
         system_prompt = self._build_system_prompt(mental_state, memory_context)
         self._conversation_history.append({"role": "user", "content": user_input})
 
         messages = [{"role": "system", "content": system_prompt}] + self._conversation_history[-4:]
-        
-        if stream:
-            response_generator = self.llm.chat(messages, stream_output=True)
-            
-            def wrapped_generator():
-                full_response = []
-                for token in response_generator:
+        tokens = deadline.stream(
+            lambda: self.llm.chat(messages, stream_output=True, **load.llm_overrides()),
+            TURN_FALLBACK_REPLY,
+        )
+
+        def reply_generator():
+            full_response = []
+            reply_scorer = self.sentiment.stream_scorer()
+            try:
+                for token in tokens:
+                    load.first_output()
                     full_response.append(token)
+                    reply_scorer.feed(token)
                     yield token
-                    
+
                 final_response = "".join(full_response).strip()
+                self.last_reply_sentiment = reply_scorer.finish()
+                logger.debug("Reply sentiment: %s", self.last_reply_sentiment)
                 self._conversation_history.append({"role": "assistant", "content": final_response})
-                
-                # 7. Store in long-term memory
-                self.memory.store(
-                    MemoryEntry(
-                        user_message=user_input,
-                        assistant_response=final_response,
-                        sentiment_label=sentiment_result.label,
-                        sentiment_score=sentiment_result.compound,
-                        emotion=mental_state.dominant_emotion,
-                        timestamp=time.time(),
+
+                # 7. Store in long-term memory (deferred at the highest load level; never a canned reply)
+                if not deadline.fell_back("first_token"):
+                    load.store(
+                        self.memories.get(namespace),
+                        MemoryEntry(
+                            user_message=user_input,
+                            assistant_response=final_response,
+                            sentiment_label=sentiment_result.label,
+                            sentiment_score=sentiment_result.compound,
+                            emotion=mental_state.dominant_emotion,
+                            timestamp=time.time(),
+                        )
                     )
-                )
-            return wrapped_generator()
-        else:
-            response = self.llm.chat(messages)
-
-            self._conversation_history.append({"role": "assistant", "content": response})
-
-            # 7. Store in long-term memory
-            self.memory.store(
-                MemoryEntry(
-                    user_message=user_input,
-                    assistant_response=response,
-                    sentiment_label=sentiment_result.label,
-                    sentiment_score=sentiment_result.compound,
-                    emotion=mental_state.dominant_emotion,
-                    timestamp=time.time(),
-                )
-            )
+            finally:
+                load.finish()
 
-            return response
+        if stream:
+            return reply_generator()
+        return "".join(reply_generator()).strip()
 
     def _build_system_prompt(self, mental_state, memory_context: str) -> str:
         """Construct a compact system prompt for CPU inference."""
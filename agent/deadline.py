@@ -0,0 +1,184 @@
+"""
+Per-turn deadlines with per-stage budgets.
+Every chat turn carries a TurnDeadline. Blocking stages (vision, sentiment,
+retrieval, the LLM's first token) run under a budget capped by what is
+left of the turn's deadline; a stage that overruns or fails is abandoned
+and replaced by a fallback value, and the fallback is recorded. Tail
+latency is then set by the configured budgets, not by the slowest
+dependency.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from agent import profiling
+from config.config import (
+    TURN_DEADLINE,
+    TURN_BUDGETS,
+    TURN_TOKEN_STALL,
+    TURN_FALLBACK_LOG,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stages whose last call overran and is still running; new calls fall back at once
+_stuck: dict[str, threading.Thread] = {}
+_stuck_lock = threading.Lock()
+
+
+class FallbackLog:
+    """Process-wide record of stage fallbacks: counts per stage plus recent events."""
+
+    def __init__(self, size: int = TURN_FALLBACK_LOG):
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._recent: deque = deque(maxlen=size)
+
+    def record(self, stage: str, reason: str, elapsed_ms: float) -> dict:
+        event = {"stage": stage, "reason": reason, "elapsed_ms": round(elapsed_ms, 1), "at": time.time()}
+        with self._lock:
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._recent.append(event)
+        return event
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"counts": dict(self._counts), "recent": list(self._recent)}
+
+
+class TurnDeadline:
+    """Deadline and budgets of one chat turn, and the fallbacks it took."""
+
+    def __init__(
+        self,
+        log: Optional[FallbackLog] = None,
+        total: float = TURN_DEADLINE,
+        budgets: Optional[dict[str, float]] = None,
+    ):
+        self.started = time.monotonic()
+        self.expires = self.started + total
+        self.budgets = budgets or TURN_BUDGETS
+        self.fallbacks: list[dict] = []
+        self._log = log
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def budget(self, stage: str) -> float:
+        """Seconds ``stage`` may take: its own budget, capped by the turn deadline."""
+        return min(self.budgets.get(stage, float("inf")), self.remaining())
+
+    def fallback(self, stage: str, reason: str, started: Optional[float] = None) -> None:
+        elapsed_ms = 1000 * (time.monotonic() - (started or self.started))
+        logger.warning("Turn stage '%s' fell back: %s (%.0f ms)", stage, reason, elapsed_ms)
+        event = {"stage": stage, "reason": reason, "elapsed_ms": round(elapsed_ms, 1)}
+        if self._log is not None:
+            event = self._log.record(stage, reason, elapsed_ms)
+        self.fallbacks.append(event)
+
+    def run(self, stage: str, fn: Callable[..., Any], fallback: Any, *args, **kwargs) -> Any:
+        """Call ``fn`` within the stage budget; return ``fallback`` if it overruns or raises.
+
+        An overrunning call keeps running in its (daemon) thread; until it
+        returns, further calls of the same stage fall back immediately
+        instead of piling up more blocked threads.
+        """
+        started = time.monotonic()
+        with _stuck_lock:
+            previous = _stuck.get(stage)
+            if previous is not None and previous.is_alive():
+                self.fallback(stage, "previous call still running", started)
+                return fallback
+            _stuck.pop(stage, None)
+
+        result: dict[str, Any] = {}
+        profile = profiling.current()
+
+        def call():
+            try:
+                with profiling.attached(profile):
+                    result["value"] = fn(*args, **kwargs)
+            except Exception as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=call, name=f"turn-{stage}", daemon=True)
+        worker.start()
+        worker.join(self.budget(stage))
+        if worker.is_alive():
+            with _stuck_lock:
+                _stuck[stage] = worker
+            self.fallback(stage, "timeout", started)
+            return fallback
+        if "error" in result:
+            self.fallback(stage, f"error: {result['error']}", started)
+            return fallback
+        return result["value"]
+
+    def stream(self, open_tokens: Callable[[], Iterable[str]], fallback_text: str, stage: str = "first_token") -> Iterator[str]:
+        """Relay the tokens of ``open_tokens()`` from a pump thread under the first-token budget.
+
+        If no token arrives in time, yields ``fallback_text`` instead. Once
+        the reply has started, a gap longer than TURN_TOKEN_STALL ends it
+        early (the partial reply is kept). Either way the pump thread stops
+        at its next token, which closes the LLM request.
+        """
+        started = time.monotonic()
+        q: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+        done = object()
+        profile = profiling.current()
+
+        def pump():
+            it = None
+            try:
+                with profiling.attached(profile):
+                    it = iter(open_tokens())
+                    for token in it:
+                        if cancelled.is_set():
+                            break
+                        q.put(token)
+            except Exception as e:
+                q.put(e)
+            finally:
+                close = getattr(it, "close", None)  # Closes the LLM's HTTP response
+                if close is not None:
+                    close()
+                q.put(done)
+
+        threading.Thread(target=pump, name="turn-llm-pump", daemon=True).start()
+        first = True
+        try:
+            while True:
+                try:
+                    item = q.get(timeout=self.budget(stage) if first else TURN_TOKEN_STALL)
+                except queue.Empty:
+                    if first:
+                        self.fallback(stage, "timeout", started)
+                        yield fallback_text
+                    else:
+                        self.fallback("token_stall", f"no token for {TURN_TOKEN_STALL:g} s", started)
+                    return
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    if first:
+                        self.fallback(stage, f"error: {item}", started)
+                        yield fallback_text
+                    else:
+                        self.fallback("token_stall", f"error: {item}", started)
+                    return
+                first = False
+                yield item
+        finally:
+            cancelled.set()
+
+    def fell_back(self, stage: str) -> bool:
+        return any(f["stage"] == stage for f in self.fallbacks)
+
+    def summary(self) -> list[dict]:
+        """Fallbacks taken so far, for API responses."""
+        return [{"stage": f["stage"], "reason": f["reason"]} for f in self.fallbacks]
@@ -0,0 +1,263 @@
+"""
+Load-aware graceful degradation.
+Watches how long turns take to produce their first output and how many
+are in flight, and when the device is saturated sheds optional work in a
+fixed order — camera capture, then memory retrieval (RAG), then reply
+length / model size, then synchronous memory writes — so interactive
+latency stays bounded. Levels are left again with hysteresis.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from config.config import (
+    LLM_TIMEOUT,
+    DEGRADE_ENABLED,
+    DEGRADE_TARGET_LATENCY,
+    DEGRADE_MAX_INFLIGHT,
+    DEGRADE_WINDOW,
+    DEGRADE_MIN_SAMPLES,
+    DEGRADE_SAMPLE_MAX_AGE,
+    DEGRADE_RAISE_AT,
+    DEGRADE_RECOVER_AT,
+    DEGRADE_RAISE_DWELL,
+    DEGRADE_RECOVER_DWELL,
+    DEGRADE_MAX_TOKENS,
+    DEGRADE_MODEL,
+    DEGRADE_WRITE_QUEUE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Each level sheds everything the levels before it shed
+LEVELS = ("normal", "no_camera", "no_rag", "short_replies", "deferred_writes")
+
+# Feature → first level at which it is switched off
+FEATURE_LEVEL = {"camera": 1, "rag": 2, "full_reply": 3, "sync_writes": 4}
+
+
+class TurnLoad:
+    """Load bookkeeping for one chat turn; its level is fixed when the turn starts."""
+
+    def __init__(self, controller: "DegradationController", turn_id: int, level: int):
+        self._controller = controller
+        self.id = turn_id
+        self.level = level
+        self.started = time.monotonic()
+        self._first_output: Optional[float] = None
+        self._finished = False
+
+    @property
+    def mode(self) -> str:
+        return LEVELS[self.level]
+
+    def allows(self, feature: str) -> bool:
+        return self.level < FEATURE_LEVEL[feature]
+
+    def llm_overrides(self) -> dict:
+        """Keyword arguments for ``LLMClient.chat`` at this turn's level."""
+        if self.allows("full_reply"):
+            return {}
+        overrides = {"max_tokens": DEGRADE_MAX_TOKENS}
+        if DEGRADE_MODEL:
+            overrides["model"] = DEGRADE_MODEL
+        return overrides
+
+    def first_output(self) -> None:
+        """Mark the moment the user started seeing a reply (idempotent)."""
+        if self._first_output is None:
+            self._first_output = time.monotonic()
+
+    def store(self, memory, entry) -> None:
+        """Write ``entry`` to ``memory`` now, or later if writes are deferred."""
+        self._controller.store(memory, entry, defer=not self.allows("sync_writes"))
+
+    def finish(self) -> None:
+        """End the turn (idempotent); records its latency if it produced output."""
+        if self._finished:
+            return
+        self._finished = True
+        latency = None if self._first_output is None else self._first_output - self.started
+        self._controller._end_turn(self, latency)
+
+
+class DegradationController:
+    """Chooses a degradation level from measured turn latency and concurrency.
+
+    Load pressure is the larger of the mean time-to-first-output of recent
+    turns over ``target_latency`` and the turns in flight over
+    ``max_inflight`` (latency counts once ``min_samples`` turns are in).
+    Above ``raise_at`` the level steps up (at most once per
+    ``raise_dwell`` seconds); below ``recover_at`` it steps down (at most
+    once per ``recover_dwell``). Only turns served at the current level
+    count, so a level is judged by its own effect.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = DEGRADE_ENABLED,
+        target_latency: float = DEGRADE_TARGET_LATENCY,
+        max_inflight: int = DEGRADE_MAX_INFLIGHT,
+        window: int = DEGRADE_WINDOW,
+        min_samples: int = DEGRADE_MIN_SAMPLES,
+        sample_max_age: float = DEGRADE_SAMPLE_MAX_AGE,
+        raise_at: float = DEGRADE_RAISE_AT,
+        recover_at: float = DEGRADE_RECOVER_AT,
+        raise_dwell: float = DEGRADE_RAISE_DWELL,
+        recover_dwell: float = DEGRADE_RECOVER_DWELL,
+        write_queue: int = DEGRADE_WRITE_QUEUE,
+    ):
+        self.enabled = enabled
+        self.target_latency = target_latency
+        self.max_inflight = max_inflight
+        self.min_samples = min_samples
+        self.sample_max_age = sample_max_age
+        self.raise_at = raise_at
+        self.recover_at = recover_at
+        self.raise_dwell = raise_dwell
+        self.recover_dwell = recover_dwell
+
+        self._lock = threading.Lock()
+        self._level = 0
+        self._changed_at = time.monotonic()
+        self._changes = 0
+        self._pressure = 0.0
+        self._samples: deque = deque(maxlen=window)  # (monotonic time, latency s) at the current level
+        self._active: dict[int, float] = {}  # turn id → start time
+        self._next_id = 0
+        self._turns_by_mode = {mode: 0 for mode in LEVELS}
+
+        self._writes: queue.Queue = queue.Queue(maxsize=write_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Level selection ---
+
+    def _evaluate(self, now: float) -> None:
+        """Recompute pressure and move at most one level. Caller holds the lock."""
+        stale = [tid for tid, started in self._active.items() if now - started > LLM_TIMEOUT]
+        for tid in stale:  # A stream that was never consumed never finishes
+            del self._active[tid]
+
+        latencies = [lat for t, lat in self._samples if now - t <= self.sample_max_age]
+        latency_pressure = 0.0
+        if latencies and len(latencies) >= max(1, self.min_samples):
+            latency_pressure = sum(latencies) / len(latencies) / self.target_latency
+        self._pressure = max(latency_pressure, len(self._active) / self.max_inflight)
+        if not self.enabled:
+            return
+
+        since = now - self._changed_at
+        if self._pressure > self.raise_at and self._level < len(LEVELS) - 1 and since >= self.raise_dwell:
+            self._set_level(self._level + 1, now)
+        elif self._pressure < self.recover_at and self._level > 0 and since >= self.recover_dwell:
+            self._set_level(self._level - 1, now)
+
+    def _set_level(self, level: int, now: float) -> None:
+        logger.warning(
+            "Load %.2f: degradation level %s → %s", self._pressure, LEVELS[self._level], LEVELS[level]
+        )
+        self._level = level
+        self._changed_at = now
+        self._changes += 1
+        self._samples.clear()
+        if level < FEATURE_LEVEL["sync_writes"] and not self._writes.empty():
+            self._start_writer()
+
+    @property
+    def level(self) -> int:
+        with self._lock:
+            self._evaluate(time.monotonic())
+            return self._level
+
+    @property
+    def mode(self) -> str:
+        return LEVELS[self.level]
+
+    # --- Turns ---
+
+    def begin_turn(self) -> TurnLoad:
+        now = time.monotonic()
+        with self._lock:
+            self._evaluate(now)
+            self._next_id += 1
+            self._active[self._next_id] = now
+            self._turns_by_mode[LEVELS[self._level]] += 1
+            return TurnLoad(self, self._next_id, self._level)
+
+    def _end_turn(self, turn: TurnLoad, latency: Optional[float]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._active.pop(turn.id, None)
+            if latency is not None and turn.level == self._level:
+                self._samples.append((now, latency))
+            self._evaluate(now)
+
+    # --- Deferred memory writes ---
+
+    def store(self, memory, entry, defer: bool = False) -> None:
+        if defer:
+            try:
+                self._writes.put_nowait((memory, entry))
+                self._start_writer()
+                return
+            except queue.Full:
+                pass  # Never drop a memory: write it now
+        memory.store(entry)
+
+    def _start_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._drain, name="deferred-memory-writes", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _drain(self) -> None:
+        """Write deferred entries whenever the level no longer defers writes."""
+        while not self._stop.wait(1.0):
+            while self.level < FEATURE_LEVEL["sync_writes"] and self._write_one():
+                pass
+
+    def _write_one(self) -> bool:
+        try:
+            memory, entry = self._writes.get_nowait()
+        except queue.Empty:
+            return False
+        try:
+            memory.store(entry)
+        except Exception as e:
+            logger.error(f"Deferred memory write failed: {e}")
+        return True
+
+    def flush(self) -> None:
+        """Write every deferred entry now (used on shutdown)."""
+        while self._write_one():
+            pass
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    # --- Metrics ---
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._evaluate(now)
+            latencies = [lat for _, lat in self._samples]
+            return {
+                "enabled": self.enabled,
+                "level": self._level,
+                "mode": LEVELS[self._level],
+                "pressure": round(self._pressure, 2),
+                "inflight": len(self._active),
+                "latency_ms": round(1000 * sum(latencies) / len(latencies), 1) if latencies else None,
+                "level_changes": self._changes,
+                "in_level_s": round(now - self._changed_at, 1),
+                "deferred_writes": self._writes.qsize(),
+                "turns_by_mode": dict(self._turns_by_mode),
+            }
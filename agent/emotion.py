@@ -11,6 +11,7 @@ from typing import Optional
 
 from agent.sentiment import SentimentResult
 from agent.memory import RetrievedMemory
+from agent.mood_timeline import MoodTimeline
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,8 @@ class MentalState:
     dominant_emotion: str = "neutral"
     session_turn_count: int = 0
     needs_exercise: bool = False  # True if user would benefit from a mental exercise
+    lowest_sentence_sentiment: Optional[float] = None  # Most negative sentence in a multi-sentence message
+    baseline_sentiment: Optional[float] = None  # Multi-day average from the mood timeline
 
     def to_context_string(self) -> str:
         """Format mental state for injection into the LLM prompt."""
@@ -37,6 +40,10 @@ class MentalState:
         ]
         if self.face_emotion and self.face_emotion != "unknown":
             parts.append(f"Detected facial emotion: {self.face_emotion}")
+        if self.baseline_sentiment is not None:
+            parts.append(f"Mood over recent days: {self.baseline_sentiment:+.2f}")
+        if self.lowest_sentence_sentiment is not None and self.lowest_sentence_sentiment < -0.5:
+            parts.append("Part of the message was strongly negative")
         return "\n".join(parts)
 
 
@@ -56,6 +63,7 @@ class EmotionEngine:
         face_emotion: Optional[str] = None,
         retrieved_memories: Optional[list[RetrievedMemory]] = None,
         exercise_threshold: float = -0.3,
+        mood_timeline: Optional[MoodTimeline] = None,
     ) -> MentalState:
         """Process new input signals and return updated mental state."""
         self._turn_count += 1
@@ -76,9 +84,19 @@ class EmotionEngine:
             if neg_ratio > 0.6:
                 hist_avg -= 0.1  # Weight toward concern
 
+        # Multi-day baseline (O(1) lookup in the materialized mood timeline)
+        baseline = mood_timeline.baseline() if mood_timeline is not None else None
+        if baseline is not None and baseline < -0.2:
+            hist_avg -= 0.05  # A low mood over several days also warrants concern
+
+        # Per-sentence signal: a mixed message can hide one very negative sentence
+        lowest_sentence = (
+            min(c for _, c in sentiment.sentences) if len(sentiment.sentences) > 1 else None
+        )
+
         # Detect if user needs a mental exercise
         needs_exercise = self._should_offer_exercise(
-            hist_avg, trend, effective_emotion, sentiment.compound
+            hist_avg, trend, effective_emotion, sentiment.compound, lowest_sentence
         )
 
         return MentalState(
@@ -89,6 +107,8 @@ class EmotionEngine:
             dominant_emotion=effective_emotion,
             session_turn_count=self._turn_count,
             needs_exercise=needs_exercise,
+            lowest_sentence_sentiment=lowest_sentence,
+            baseline_sentiment=None if baseline is None else round(baseline, 3),
         )
 
     def _resolve_emotion(
@@ -124,7 +144,12 @@ class EmotionEngine:
         return "stable"
 
     def _should_offer_exercise(
-        self, hist_avg: float, trend: str, emotion: str, current_sentiment: float
+        self,
+        hist_avg: float,
+        trend: str,
+        emotion: str,
+        current_sentiment: float,
+        lowest_sentence: Optional[float] = None,
     ) -> bool:
         """Determine if user would benefit from a mental exercise."""
         # Offer exercise if:
@@ -132,6 +157,7 @@ class EmotionEngine:
         # 2. Trend is declining (getting worse)
         # 3. Current sentiment is very negative
         # 4. Emotion indicates stress (sad, angry, fear)
+        # 5. One sentence is very negative and the message leans negative overall
         
         stress_emotions = {"sad", "angry", "fear", "disgust"}
         
@@ -143,5 +169,7 @@ class EmotionEngine:
             return True
         if emotion in stress_emotions and current_sentiment < -0.2:  # Stressed + negative
             return True
+        if lowest_sentence is not None and lowest_sentence < -0.6 and current_sentiment < 0:
+            return True
         
         return False
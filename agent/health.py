@@ -0,0 +1,144 @@
+"""
+Background health monitoring.
+Probes each subsystem on its own schedule (with exponential backoff while
+it is failing) and caches the results, so status requests never wait on a
+busy Ollama server or the camera.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from config.config import HEALTH_RETRY_MIN, HEALTH_RETRY_MAX
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of the most recent run of one probe."""
+
+    ok: bool
+    checked_at: float  # Unix time the probe finished
+    latency_ms: float
+    error: Optional[str] = None
+    failures: int = 0  # Consecutive failed probes
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["age_s"] = round(time.time() - self.checked_at, 1)
+        data["latency_ms"] = round(self.latency_ms, 1)
+        return data
+
+
+class _Probe:
+    def __init__(self, name: str, check: Callable[[], bool], interval: float):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        self.result: Optional[ProbeResult] = None
+        self.lock = threading.Lock()  # One run of this probe at a time
+        self.next_due = 0.0
+
+
+class HealthMonitor:
+    """Cached, periodically refreshed subsystem health.
+
+    Each probe is a zero-argument callable returning a bool (exceptions
+    count as failures). A healthy probe is re-run every ``interval``
+    seconds; a failing one is retried after ``retry_min`` seconds, doubling
+    per consecutive failure up to ``retry_max``.
+    """
+
+    def __init__(self, retry_min: float = HEALTH_RETRY_MIN, retry_max: float = HEALTH_RETRY_MAX):
+        self._retry_min = retry_min
+        self._retry_max = retry_max
+        self._probes: dict[str, _Probe] = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_probe(self, name: str, check: Callable[[], bool], interval: float) -> None:
+        """Register a probe; it runs on the next scheduler pass."""
+        self._probes[name] = _Probe(name, check, interval)
+        self._wake.set()
+
+    def _run(self, probe: _Probe) -> ProbeResult:
+        with probe.lock:
+            start = time.perf_counter()
+            error = None
+            try:
+                ok = bool(probe.check())
+            except Exception as e:
+                ok, error = False, f"{type(e).__name__}: {e}"
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            failures = 0 if ok else (probe.result.failures + 1 if probe.result else 1)
+            if ok:
+                delay = probe.interval
+            else:
+                delay = min(self._retry_max, self._retry_min * 2 ** (failures - 1))
+                if failures == 1:
+                    logger.warning("Health probe '%s' failed%s.", probe.name, f": {error}" if error else "")
+            if ok and probe.result is not None and not probe.result.ok:
+                logger.info("Health probe '%s' recovered.", probe.name)
+
+            probe.result = ProbeResult(ok, time.time(), latency_ms, error, failures)
+            probe.next_due = time.monotonic() + delay
+        self._wake.set()
+        return probe.result
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()  # Before reading probe state, so a wake-up from here on is never lost
+            now = time.monotonic()
+            for probe in list(self._probes.values()):
+                if probe.next_due <= now and not probe.lock.locked():
+                    probe.next_due = float("inf")  # Rescheduled by _run when it finishes
+                    threading.Thread(target=self._run, args=(probe,), name=f"health-{probe.name}", daemon=True).start()
+            pending = [p.next_due for p in self._probes.values()]
+            wait = min(pending) - time.monotonic() if pending else self._retry_max
+            self._wake.wait(max(0.05, min(wait, self._retry_max)))
+
+    def start(self) -> None:
+        """Start the background scheduler (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def refresh(self, names: Optional[list[str]] = None) -> dict[str, ProbeResult]:
+        """Run probes now (all, or ``names``) and return their fresh results.
+
+        A probe already running in the background is waited for rather
+        than started a second time.
+        """
+        results = {}
+        for name in names or list(self._probes):
+            probe = self._probes[name]
+            if probe.lock.locked():
+                with probe.lock:  # Wait for the in-flight run
+                    pass
+                results[name] = probe.result
+            else:
+                results[name] = self._run(probe)
+        return results
+
+    def results(self) -> dict[str, Optional[ProbeResult]]:
+        """Latest cached result per probe (None if it has never finished)."""
+        return {name: probe.result for name, probe in self._probes.items()}
+
+    def status(self) -> dict[str, bool]:
+        """Cached up/down flag per probe; never blocks."""
+        return {name: bool(r and r.ok) for name, r in self.results().items()}
+
+    def details(self) -> dict[str, Optional[dict]]:
+        """Cached results as JSON-ready dicts (timestamps, age, latency, error)."""
+        return {name: r.to_dict() if r else None for name, r in self.results().items()}
@@ -0,0 +1,180 @@
+"""
+Idle model unloading and memory reporting.
+The LLM weights (in Ollama), the embedding model and the emotion model
+each hold hundreds of MB. The IdleManager unloads a component once nobody
+has used it for its idle period; the component loads again on its next
+use. RSS figures come from /proc (Linux); elsewhere they are None.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Union
+
+from config.config import (
+    CAMERA_ENABLED,
+    IDLE_CHECK_INTERVAL,
+    IDLE_UNLOAD_LLM,
+    IDLE_UNLOAD_EMBEDDINGS,
+    IDLE_UNLOAD_VISION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def rss_mb(pid: Union[int, str] = "self") -> Optional[float]:
+    """Resident set size of a process in MB (None if unknown)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def ollama_rss_mb() -> Optional[float]:
+    """Combined RSS of the local Ollama processes (server and model runners), None if none are visible."""
+    if not os.path.isdir("/proc"):
+        return None
+    total, found = 0.0, False
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/comm") as f:
+                comm = f.read().strip()
+        except OSError:
+            continue
+        if comm.startswith("ollama"):
+            rss = rss_mb(name)
+            if rss is not None:
+                total += rss
+                found = True
+    return round(total, 1) if found else None
+
+
+class _Component:
+    def __init__(self, name, idle_after, last_used, loaded, unload, rss):
+        self.name = name
+        self.idle_after = idle_after
+        self.last_used = last_used
+        self.loaded = loaded
+        self.unload = unload
+        self.rss = rss
+        self.rss_mb: Optional[float] = None  # As of the last check
+        self.unloads = 0
+
+
+class IdleManager:
+    """Unloads registered components after they have been idle for a while.
+
+    Each component is described by callables: ``last_used()`` (Unix
+    time), ``loaded()``, ``unload()`` and optionally ``rss()`` (MB it
+    holds; None while unloaded or unknown). An ``idle_after`` of 0 never
+    unloads. Reloading is the component's own business: it loads again on
+    its next use. Memory figures are refreshed on every check, so status
+    requests never scan /proc.
+    """
+
+    def __init__(self, interval: float = IDLE_CHECK_INTERVAL):
+        self._interval = interval
+        self._components: dict[str, _Component] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(
+        self,
+        name: str,
+        idle_after: float,
+        last_used: Callable[[], float],
+        loaded: Callable[[], bool],
+        unload: Callable[[], object],
+        rss: Optional[Callable[[], Optional[float]]] = None,
+    ) -> None:
+        self._components[name] = _Component(name, idle_after, last_used, loaded, unload, rss)
+
+    def start(self) -> "IdleManager":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="idle-manager", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while True:
+            self.check()
+            if self._stop.wait(self._interval):
+                return
+
+    def check(self, now: Optional[float] = None) -> list[str]:
+        """Unload every component idle for longer than its period and refresh memory figures.
+
+        Returns the names of the components unloaded.
+        """
+        now = time.time() if now is None else now
+        unloaded = []
+        for c in self._components.values():
+            try:
+                if c.idle_after > 0 and c.loaded() and now - c.last_used() >= c.idle_after and c.unload():
+                    c.unloads += 1
+                    unloaded.append(c.name)
+                    logger.info("Unloaded idle '%s' (unused for %.0f s).", c.name, now - c.last_used())
+            except Exception as e:
+                logger.warning("Unloading idle '%s' failed: %s", c.name, e)
+            try:
+                c.rss_mb = c.rss() if c.rss is not None else None
+            except Exception:
+                c.rss_mb = None
+        return unloaded
+
+    def snapshot(self) -> dict:
+        """Per-component residency, idle time and memory, plus this process's RSS."""
+        now = time.time()
+        components = {}
+        for c in self._components.values():
+            try:
+                components[c.name] = {
+                    "loaded": c.loaded(),
+                    "idle_s": round(now - c.last_used(), 1),
+                    "unload_after_s": c.idle_after or None,
+                    "rss_mb": round(c.rss_mb, 1) if c.rss_mb is not None else None,
+                    "unloads": c.unloads,
+                }
+            except Exception as e:
+                components[c.name] = {"error": str(e)}
+        rss = rss_mb()
+        return {"process_rss_mb": round(rss, 1) if rss is not None else None, "components": components}
+
+
+def manage_idle_models(brain, camera=None) -> IdleManager:
+    """Start unloading the LLM, the embedding model and the emotion model when idle."""
+    manager = IdleManager()
+    manager.add(
+        "llm", IDLE_UNLOAD_LLM,
+        last_used=lambda: brain.llm.last_used,
+        loaded=lambda: bool(brain.llm.resident),
+        unload=brain.llm.unload,
+        rss=ollama_rss_mb,
+    )
+    embedder = brain.memories.embedder
+    manager.add(
+        "embeddings", IDLE_UNLOAD_EMBEDDINGS,
+        last_used=lambda: embedder.last_used,
+        loaded=lambda: embedder.loaded,
+        unload=embedder.unload,
+        rss=lambda: embedder.rss_mb if embedder.loaded else None,
+    )
+    if CAMERA_ENABLED and camera is not None:
+        manager.add(
+            "vision", IDLE_UNLOAD_VISION,
+            last_used=lambda: camera.model_last_used,
+            loaded=lambda: camera.model_loaded,
+            unload=camera.unload_model,
+            rss=lambda: rss_mb(camera.worker_pid) if getattr(camera, "worker_pid", None) else None,
+        )
+    return manager.start()
@@ -0,0 +1,261 @@
+"""
+Precompiled VADER lexicon cache.
+Compiles VADER's text lexicons once into a binary hash-table file that is
+memory-mapped read-only, so every process shares the same page-cache copy
+instead of parsing the text files into its own dicts on startup.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional
+
+import vaderSentiment.vaderSentiment as vader_module
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from config.config import LEXICON_CACHE_PATH, LEXICON_MEMO_SIZE, SENTIMENT_LEXICON_CACHE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VLEXv1\0\0"
+EMPTY = 0xFFFFFFFF
+_HEADER = struct.Struct("<8sQ")        # magic, source signature
+_TABLE = struct.Struct("<IIII")        # kind, slot count, entry count, flags
+_FLOAT_SLOT = struct.Struct("<IId")    # key offset, key length, value
+_STR_SLOT = struct.Struct("<IIII")     # key offset, key length, value offset, value length
+KIND_FLOAT, KIND_STR = 1, 2
+FLAG_NO_ASCII_KEYS = 1
+_MISSING = object()
+
+LEXICON_FILE = "vader_lexicon.txt"
+EMOJI_FILE = "emoji_utf8_lexicon.txt"
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _source_paths() -> list[Path]:
+    base = Path(vader_module.__file__).resolve().parent
+    return [base / LEXICON_FILE, base / EMOJI_FILE]
+
+
+def source_signature() -> int:
+    """Cheap fingerprint of the VADER source files (size + mtime, no reads)."""
+    parts = []
+    for path in _source_paths():
+        st = path.stat()
+        parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+    return zlib.crc32("|".join(parts).encode()) | (len(parts) << 32)
+
+
+def _parse_sources() -> tuple[dict[str, float], dict[str, str]]:
+    """Parse the text lexicons exactly the way SentimentIntensityAnalyzer does."""
+    lex_path, emoji_path = _source_paths()
+    lexicon = {}
+    for line in lex_path.read_text(encoding="utf-8").rstrip("\n").split("\n"):
+        if not line:
+            continue
+        word, measure = line.strip().split("\t")[0:2]
+        lexicon[word] = float(measure)
+    emojis = {}
+    for line in emoji_path.read_text(encoding="utf-8").rstrip("\n").split("\n"):
+        emoji, description = line.strip().split("\t")[0:2]
+        emojis[emoji] = description
+    return lexicon, emojis
+
+
+def _build_table(entries: dict, kind: int, blob: bytearray) -> bytes:
+    """Serialize one open-addressing table; keys/values are appended to ``blob``."""
+    n_slots = 1
+    while n_slots < len(entries) * 2:
+        n_slots <<= 1
+    mask = n_slots - 1
+    slot_struct = _FLOAT_SLOT if kind == KIND_FLOAT else _STR_SLOT
+    slots: list[Optional[tuple]] = [None] * n_slots
+    flags = FLAG_NO_ASCII_KEYS if not any(k.isascii() for k in entries) else 0
+
+    for key, value in entries.items():
+        raw = _encode(key)
+        key_ref = (len(blob), len(raw))
+        blob += raw
+        if kind == KIND_FLOAT:
+            slot = (*key_ref, float(value))
+        else:
+            raw_val = _encode(value)
+            slot = (*key_ref, len(blob), len(raw_val))
+            blob += raw_val
+        i = zlib.crc32(raw) & mask
+        while slots[i] is not None:
+            i = (i + 1) & mask
+        slots[i] = slot
+
+    empty = (EMPTY, 0, 0.0) if kind == KIND_FLOAT else (EMPTY, 0, 0, 0)
+    out = bytearray(_TABLE.pack(kind, n_slots, len(entries), flags))
+    for slot in slots:
+        out += slot_struct.pack(*(slot or empty))
+    return bytes(out)
+
+
+def build_lexicon_cache(path: Path = LEXICON_CACHE_PATH) -> Path:
+    """Compile the VADER lexicons into ``path`` (written atomically)."""
+    lexicon, emojis = _parse_sources()
+    blob = bytearray()
+    lex_table = _build_table(lexicon, KIND_FLOAT, blob)
+    emoji_table = _build_table(emojis, KIND_STR, blob)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, source_signature()))
+        f.write(lex_table)
+        f.write(emoji_table)
+        f.write(blob)
+    os.replace(tmp, path)
+    logger.info("Compiled VADER lexicon cache: %s (%d bytes).", path, path.stat().st_size)
+    return path
+
+
+class MappedTable:
+    """Read-only dict-like view over one table in the memory-mapped cache.
+
+    Recently used keys (hits and misses) are memoized in a small per-process
+    dict so hot words cost a plain dict lookup; the memo is cleared when it
+    reaches ``memo_size`` entries.
+    """
+
+    def __init__(self, buf: mmap.mmap, offset: int, memo_size: int = LEXICON_MEMO_SIZE):
+        self._buf = buf
+        self._memo: dict = {}
+        self._memo_size = memo_size
+        self._kind, self._n_slots, self._count, flags = _TABLE.unpack_from(buf, offset)
+        self._no_ascii_keys = bool(flags & FLAG_NO_ASCII_KEYS)
+        self._mask = self._n_slots - 1
+        self._slots_at = offset + _TABLE.size
+        self._slot = _FLOAT_SLOT if self._kind == KIND_FLOAT else _STR_SLOT
+        self.end = self._slots_at + self._n_slots * self._slot.size
+        self._blob_at = 0  # Set by the loader once all tables are known
+
+    def _find(self, key) -> Optional[tuple]:
+        if not isinstance(key, str) or (self._no_ascii_keys and key.isascii()):
+            return None
+        raw = _encode(key)
+        buf, size, slot_struct = self._buf, self._slot.size, self._slot
+        blob_at, mask = self._blob_at, self._mask
+        i = zlib.crc32(raw) & mask
+        while True:
+            slot = slot_struct.unpack_from(buf, self._slots_at + i * size)
+            key_off = slot[0]
+            if key_off == EMPTY:
+                return None
+            start = blob_at + key_off
+            if slot[1] == len(raw) and buf[start:start + slot[1]] == raw:
+                return slot
+            i = (i + 1) & mask
+
+    def _value(self, slot: tuple):
+        if self._kind == KIND_FLOAT:
+            return slot[2]
+        start = self._blob_at + slot[2]
+        return self._buf[start:start + slot[3]].decode("utf-8", "surrogatepass")
+
+    def _lookup(self, key):
+        value = self._memo.get(key, None)
+        if value is None:
+            slot = self._find(key)
+            value = _MISSING if slot is None else self._value(slot)
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[key] = value
+        return value
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._memo[key] is not _MISSING
+        except KeyError:
+            return self._lookup(key) is not _MISSING
+
+    def __getitem__(self, key):
+        try:
+            value = self._memo[key]
+        except KeyError:
+            value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> Iterator[tuple]:
+        for i in range(self._n_slots):
+            slot = self._slot.unpack_from(self._buf, self._slots_at + i * self._slot.size)
+            if slot[0] != EMPTY:
+                start = self._blob_at + slot[0]
+                key = self._buf[start:start + slot[1]].decode("utf-8", "surrogatepass")
+                yield key, self._value(slot)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.items())
+
+
+_mapped: Optional[tuple[MappedTable, MappedTable]] = None
+
+
+def load_lexicon_cache(path: Path = LEXICON_CACHE_PATH) -> tuple[MappedTable, MappedTable]:
+    """Map the compiled cache (building or rebuilding it if missing or stale).
+
+    Returns (lexicon, emojis) views; the mapping is reused within a process.
+    """
+    global _mapped
+    if _mapped is not None:
+        return _mapped
+
+    path = Path(path)
+    signature = source_signature()
+    for attempt in range(2):
+        if not path.exists():
+            build_lexicon_cache(path)
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, cached_signature = _HEADER.unpack_from(buf, 0)
+        if magic == MAGIC and cached_signature == signature:
+            break
+        buf.close()
+        logger.info("VADER lexicon cache is stale; rebuilding.")
+        path.unlink(missing_ok=True)
+    else:
+        raise RuntimeError(f"Could not build a valid lexicon cache at {path}")
+
+    lexicon = MappedTable(buf, _HEADER.size)
+    emojis = MappedTable(buf, lexicon.end)
+    lexicon._blob_at = emojis._blob_at = emojis.end
+    _mapped = (lexicon, emojis)
+    return _mapped
+
+
+def create_vader_analyzer(use_cache: bool = SENTIMENT_LEXICON_CACHE) -> SentimentIntensityAnalyzer:
+    """Build a VADER analyzer backed by the memory-mapped lexicon cache.
+
+    Falls back to VADER's own text-file loader when the cache is disabled
+    or cannot be used.
+    """
+    if not use_cache:
+        return SentimentIntensityAnalyzer()
+    try:
+        lexicon, emojis = load_lexicon_cache()
+    except Exception as e:
+        logger.warning("Lexicon cache unavailable (%s); parsing VADER text files.", e)
+        return SentimentIntensityAnalyzer()
+
+    analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    analyzer.lexicon, analyzer.emojis = lexicon, emojis
+    return analyzer
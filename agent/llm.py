@@ -5,6 +5,7 @@ Communicates with Ollama's REST API for fully offline operation.
 
 import json
 import logging
+import time
 from typing import Optional
 
 import requests
@@ -18,11 +19,20 @@ from config.config import (
     LLM_NUM_THREAD,
     LLM_TIMEOUT,
     LLM_STOP_SEQUENCES,
+    LLM_KEEP_ALIVE,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _keep_alive(value):
+    """Ollama takes seconds as a number or a duration string ("30m"); negative keeps the model loaded."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
 class LLMClient:
     """Client for local LLM inference via Ollama."""
 
@@ -32,16 +42,25 @@ class LLMClient:
         model: str = LLM_MODEL,
         temperature: float = LLM_TEMPERATURE,
         max_tokens: int = LLM_MAX_TOKENS,
+        keep_alive=LLM_KEEP_ALIVE,
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.keep_alive = _keep_alive(keep_alive)  # Sent with every request; Ollama otherwise unloads after 5 min idle
+        self.resident: set[str] = set()  # Models this client has asked Ollama to keep loaded
+        self.last_used = time.time()
+
+    def _used(self, model: str) -> None:
+        self.last_used = time.time()
+        if self.keep_alive != 0:
+            self.resident.add(model)
 
-    def is_available(self) -> bool:
+    def is_available(self, timeout: float = 5) -> bool:
         """Check if Ollama server is running and the configured model is loaded."""
         try:
-            resp = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            resp = requests.get(f"{self.base_url}/api/tags", timeout=timeout)
             if resp.status_code == 200:
                 models = [m["name"] for m in resp.json().get("models", [])]
                 available = any(self.model in m for m in models)
@@ -55,13 +74,51 @@ class LLMClient:
             logger.error("Ollama server is not running.")
             return False
 
+    def preload(self) -> bool:
+        """Load the model into Ollama's memory without generating (a request with no prompt)."""
+        try:
+            resp = requests.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive, "stream": False},
+                timeout=LLM_TIMEOUT,
+            )
+            resp.raise_for_status()
+            self._used(self.model)
+            load_ns = resp.json().get("load_duration", 0)
+            logger.info("Model '%s' loaded (%.1fs, keep_alive=%s).", self.model, load_ns / 1e9, self.keep_alive)
+            return True
+        except requests.ConnectionError:
+            logger.error("Cannot preload model: Ollama is not running.")
+            return False
+
+    def unload(self, timeout: float = 30) -> bool:
+        """Ask Ollama to unload the models this client loaded (keep_alive=0); the next request reloads them."""
+        unloaded = False
+        for model in list(self.resident):
+            try:
+                resp = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={"model": model, "keep_alive": 0, "stream": False},
+                    timeout=timeout,
+                )
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning("Could not unload model '%s': %s", model, e)
+                continue
+            self.resident.discard(model)
+            unloaded = True
+            logger.info("Model '%s' unloaded from Ollama.", model)
+        return unloaded
+
     def generate(self, prompt: str, system: str = "") -> str:
         """Single-shot generation via /api/generate with streaming."""
+        self._used(self.model)
         payload = {
             "model": self.model,
             "prompt": prompt,
             "system": system,
             "stream": True,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": self.temperature,
                 "num_predict": self.max_tokens,
@@ -97,15 +154,28 @@ class LLMClient:
             logger.error("LLM generation error: %s", e)
             return f"[Error: {e}]"
 
-    def chat(self, messages: list[dict], stream_output: bool = False):
-        """Chat-style generation via /api/chat with streaming support."""
+    def chat(
+        self,
+        messages: list[dict],
+        stream_output: bool = False,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+    ):
+        """Chat-style generation via /api/chat with streaming support.
+
+        ``max_tokens`` and ``model`` override the client defaults for this
+        call (used when degrading under load).
+        """
+        model = model or self.model
+        self._used(model)
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": messages,
             "stream": True,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": self.temperature,
-                "num_predict": self.max_tokens,
+                "num_predict": max_tokens or self.max_tokens,
                 "num_ctx": LLM_NUM_CTX,
                 "num_thread": LLM_NUM_THREAD,
                 "stop": LLM_STOP_SEQUENCES,
@@ -122,14 +192,17 @@ class LLMClient:
             
             if stream_output:
                 def generate():
-                    for line in resp.iter_lines():
-                        if line:
-                            chunk = json.loads(line)
-                            token = chunk.get("message", {}).get("content", "")
-                            if token:
-                                yield token
-                            if chunk.get("done", False):
-                                break
+                    try:
+                        for line in resp.iter_lines():
+                            if line:
+                                chunk = json.loads(line)
+                                token = chunk.get("message", {}).get("content", "")
+                                if token:
+                                    yield token
+                                if chunk.get("done", False):
+                                    break
+                    finally:
+                        resp.close()  # An abandoned stream tells Ollama to stop generating
                 return generate()
             else:
                 full_response = []
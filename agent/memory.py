@@ -1,16 +1,26 @@
 """
 Long-term conversational memory using ChromaDB and sentence embeddings.
 Provides RAG capabilities for context-aware responses.
+Each user/profile gets its own namespace (collection), opened lazily.
 """
 
+import hashlib
 import logging
+import re
+import threading
 import time
 from typing import Optional
 from dataclasses import dataclass, field
 
-import chromadb
-
-from config.config import MEMORY_DIR, MEMORY_COLLECTION, MEMORY_TOP_K
+from agent.idle import rss_mb
+from agent.mood_timeline import MoodTimeline, timeline_path_for
+from config.config import (
+    MEMORY_DIR,
+    MEMORY_COLLECTION,
+    MEMORY_TOP_K,
+    MEMORY_DEFAULT_NAMESPACE,
+    MEMORY_NAMESPACE_IDLE_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +49,127 @@ class RetrievedMemory:
     timestamp: float
 
 
+@dataclass
+class NamespaceStats:
+    """Usage statistics for one open memory namespace."""
+
+    namespace: str
+    collection: str
+    count: int
+    stores: int
+    retrievals: int
+    opened_at: float
+    last_used: float
+
+    def to_dict(self) -> dict:
+        """Serialize for JSON API responses."""
+        return {
+            "namespace": self.namespace,
+            "collection": self.collection,
+            "count": self.count,
+            "stores": self.stores,
+            "retrievals": self.retrievals,
+            "opened_at": self.opened_at,
+            "last_used": self.last_used,
+            "idle_seconds": round(time.time() - self.last_used, 1),
+        }
+
+
+def collection_name_for(namespace: str) -> str:
+    """Map a user/profile namespace to a valid ChromaDB collection name.
+
+    The default namespace keeps the original collection so existing
+    memories remain visible after upgrading. Names Chroma accepts as they
+    are keep their case; any other name is sanitized, shortened if needed
+    and suffixed with a short hash of the raw namespace, so two distinct
+    namespaces never share a collection.
+    """
+    if not namespace or not namespace.strip() or namespace == MEMORY_DEFAULT_NAMESPACE:
+        return MEMORY_COLLECTION
+    safe = re.sub(r"[^a-zA-Z0-9_-]", "_", namespace)
+    name = f"{MEMORY_COLLECTION}__{safe}"
+    if safe != namespace or len(name) > 63 or not name[-1].isalnum():
+        digest = hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:63 - len(digest) - 1].rstrip('_-')}-{digest}"
+    return name
+
+
+class EmbeddingModel:
+    """Chroma's default MiniLM embedder, loaded once and shared by every namespace.
+
+    Chroma's own default embedding function builds a new ONNX session on
+    every call; this one keeps a single session resident from first use
+    until ``unload()`` (the next embed loads it again).
+    """
+
+    def __init__(self):
+        self._model = None
+        self._function = None
+        self._lock = threading.Lock()
+        self.last_used = time.time()
+        self.loads = 0
+        self.rss_mb: Optional[float] = None  # Process RSS growth measured at the last load
+
+    def function(self):
+        """The embedding function to give Chroma collections (same name and config as Chroma's default)."""
+        if self._function is None:
+            from chromadb.api.types import EmbeddingFunction
+
+            model = self
+
+            class ResidentEmbeddingFunction(EmbeddingFunction):
+                # Not a DefaultEmbeddingFunction subclass: Chroma would replace that by a fresh default
+                def __init__(self):
+                    pass
+
+                def __call__(self, input):
+                    return model.embed(input)
+
+                @staticmethod
+                def name() -> str:
+                    return "default"  # Same model, so collections keep their persisted "default" config
+
+                def get_config(self) -> dict:
+                    return {}
+
+                @staticmethod
+                def build_from_config(config: dict):
+                    from chromadb.api.types import DefaultEmbeddingFunction
+
+                    return DefaultEmbeddingFunction()
+
+            self._function = ResidentEmbeddingFunction()
+        return self._function
+
+    def embed(self, input):
+        with self._lock:
+            self.last_used = time.time()
+            model = self._model
+            if model is None:
+                from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+                before = rss_mb()
+                model = ONNXMiniLM_L6_V2()
+                result = model(input)  # Loads the session while other callers wait
+                after = rss_mb()
+                self.rss_mb = round(after - before, 1) if before is not None and after is not None else None
+                self._model = model
+                self.loads += 1
+                logger.info("Embedding model loaded (%s MB).", self.rss_mb)
+                return result
+        return model(input)
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def unload(self) -> bool:
+        """Drop the ONNX session; returns False if it was not loaded."""
+        with self._lock:
+            loaded, self._model = self._model is not None, None
+        return loaded
+
+
 class ConversationMemory:
     """ChromaDB-backed long-term conversation memory with RAG retrieval."""
 
@@ -46,12 +177,29 @@ class ConversationMemory:
         self,
         persist_dir: str = str(MEMORY_DIR),
         collection_name: str = MEMORY_COLLECTION,
+        client=None,
+        namespace: str = MEMORY_DEFAULT_NAMESPACE,
+        timeline: Optional[MoodTimeline] = None,
+        embedding_function=None,
     ):
-        self._client = chromadb.PersistentClient(path=persist_dir)
+        if client is None:
+            import chromadb  # Deferred: importing chromadb alone takes seconds on a Pi
+
+            client = chromadb.PersistentClient(path=persist_dir)
+        self._client = client
+        options = {"embedding_function": embedding_function} if embedding_function is not None else {}
         self._collection = self._client.get_or_create_collection(
             name=collection_name,
             metadata={"hnsw:space": "cosine"},
+            **options,
         )
+        self.namespace = namespace
+        self.collection_name = collection_name
+        self.timeline = timeline or MoodTimeline(timeline_path_for(collection_name))
+        self.opened_at = time.time()
+        self.last_used = self.opened_at
+        self.stores = 0
+        self.retrievals = 0
         logger.info(
             "Memory initialized: %d entries in '%s'.",
             self._collection.count(),
@@ -75,14 +223,22 @@ class ConversationMemory:
             documents=[document],
             metadatas=[metadata],
         )
+        self.stores += 1
+        self.last_used = time.time()
+        self.timeline.record(
+            entry.sentiment_score, entry.sentiment_label, entry.emotion, entry.timestamp
+        )
         logger.debug("Stored memory: %s", doc_id)
 
     def retrieve(self, query: str, top_k: int = MEMORY_TOP_K) -> list[RetrievedMemory]:
         """Retrieve the most relevant past conversations for a query."""
-        if self._collection.count() == 0:
+        self.retrievals += 1
+        self.last_used = time.time()
+        total = self._collection.count()
+        if total == 0:
             return []
 
-        effective_k = min(top_k, self._collection.count())
+        effective_k = min(top_k, total)
         results = self._collection.query(
             query_texts=[query],
             n_results=effective_k,
@@ -103,7 +259,136 @@ class ConversationMemory:
                 )
         return memories
 
+    def warm_up(self) -> bool:
+        """Load the embedding model by embedding one query (not counted as a retrieval).
+
+        Querying embeds the text even when the collection is empty.
+        """
+        self._collection.query(query_texts=["warm-up"], n_results=1)
+        return True
+
     @property
     def count(self) -> int:
         """Total number of stored memories."""
         return self._collection.count()
+
+    def rebuild_timeline(self) -> int:
+        """Backfill the mood timeline from stored metadata (one full scan).
+
+        Returns the number of turns folded in. Only needed once for memories
+        stored before the timeline existed.
+        """
+        path = timeline_path_for(self.collection_name)
+        self.timeline.flush()  # So pending changes of the old timeline can't overwrite the rebuilt file later
+        path.unlink(missing_ok=True)
+        self.timeline = MoodTimeline(path)
+        results = self._collection.get(include=["metadatas"])
+        for meta in results["metadatas"] or []:
+            self.timeline.record(
+                float(meta.get("sentiment_score", 0.0)),
+                meta.get("sentiment_label", "neutral"),
+                meta.get("emotion", "neutral"),
+                meta.get("timestamp", 0) or None,
+            )
+        self.timeline.flush()
+        return len(results["metadatas"] or [])
+
+    def stats(self) -> NamespaceStats:
+        """Return usage statistics for this namespace."""
+        return NamespaceStats(
+            namespace=self.namespace,
+            collection=self.collection_name,
+            count=self._collection.count(),
+            stores=self.stores,
+            retrievals=self.retrievals,
+            opened_at=self.opened_at,
+            last_used=self.last_used,
+        )
+
+
+class MemoryNamespaces:
+    """Lazily opens one ConversationMemory per user/profile namespace.
+
+    The ChromaDB client is created on first use, each namespace's collection
+    is opened the first time it is requested, and namespaces idle for longer
+    than ``idle_seconds`` are dropped from the process (their data stays on
+    disk and is reopened on the next request).
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = str(MEMORY_DIR),
+        idle_seconds: float = MEMORY_NAMESPACE_IDLE_SECONDS,
+    ):
+        self._persist_dir = persist_dir
+        self._idle_seconds = idle_seconds
+        self._client = None
+        self.embedder = EmbeddingModel()
+        self._open: dict[str, ConversationMemory] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: Optional[str] = None) -> ConversationMemory:
+        """Return the memory for a namespace, opening it on first use."""
+        namespace = namespace or MEMORY_DEFAULT_NAMESPACE
+        with self._lock:
+            self._evict_idle_locked()
+            memory = self._open.get(namespace)
+            if memory is None:
+                if self._client is None:
+                    import chromadb
+
+                    self._client = chromadb.PersistentClient(path=self._persist_dir)
+                memory = ConversationMemory(
+                    collection_name=collection_name_for(namespace),
+                    client=self._client,
+                    namespace=namespace,
+                    embedding_function=self.embedder.function(),
+                )
+                self._open[namespace] = memory
+            memory.last_used = time.time()
+            return memory
+
+    def peek(self, namespace: Optional[str] = None) -> Optional[ConversationMemory]:
+        """The namespace's memory if it is already open, else None; never opens it or marks it used."""
+        with self._lock:
+            return self._open.get(namespace or MEMORY_DEFAULT_NAMESPACE)
+
+    def evict_idle(self) -> list[str]:
+        """Drop namespaces that have been idle too long. Returns evicted names."""
+        with self._lock:
+            return self._evict_idle_locked()
+
+    def _evict_idle_locked(self) -> list[str]:
+        cutoff = time.time() - self._idle_seconds
+        evicted = [ns for ns, m in self._open.items() if m.last_used < cutoff]
+        for ns in evicted:
+            memory = self._open.pop(ns)
+            try:
+                memory.timeline.flush()  # A reopened namespace reads the file back
+            except OSError as e:
+                logger.warning("Could not write mood timeline of '%s': %s", ns, e)
+            logger.info("Evicted idle memory namespace '%s'.", ns)
+        return evicted
+
+    def healthy(self) -> bool:
+        """Whether the store answers, checked on an open namespace without marking it used.
+
+        True while no namespace is open: the store is opened on first use,
+        and a health probe should neither import ChromaDB early nor keep a
+        namespace from being evicted.
+        """
+        with self._lock:
+            memory = self._open.get(MEMORY_DEFAULT_NAMESPACE) or next(iter(self._open.values()), None)
+        return memory is None or memory.count >= 0
+
+    def stats(self) -> list[NamespaceStats]:
+        """Per-namespace statistics for all currently open namespaces."""
+        with self._lock:
+            memories = list(self._open.values())
+        return [m.stats() for m in memories]
+
+    @property
+    def open_namespaces(self) -> list[str]:
+        """Names of namespaces currently held in the process."""
+        with self._lock:
+            return list(self._open)
@@ -0,0 +1,309 @@
+"""
+Materialized mood timeline.
+Incrementally maintained per-hour and per-day sentiment/emotion rollups,
+stored as a compact columnar NumPy file per memory namespace, so long-term
+mood questions never have to scan the vector store. Recording a turn only
+updates memory; changed timelines are written in the background every
+MOOD_FLUSH_INTERVAL seconds and at exit.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.config import MOOD_DIR, MOOD_BASELINE_DAYS, MOOD_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+EMOTIONS = ("happy", "sad", "angry", "fear", "surprise", "neutral", "disgust")
+_EMOTION_INDEX = {e: i for i, e in enumerate(EMOTIONS)}
+_INITIAL_ROWS = 64
+
+# Timelines with unwritten changes, and the thread that writes them
+_dirty: set["MoodTimeline"] = set()
+_dirty_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+@dataclass
+class MoodBucket:
+    """Aggregated mood for one hour or day."""
+
+    start: datetime
+    count: int
+    avg_sentiment: float
+    min_sentiment: float
+    max_sentiment: float
+    positive: int
+    neutral: int
+    negative: int
+    dominant_emotion: str
+
+    def to_dict(self) -> dict:
+        """Serialize for JSON API responses."""
+        return {
+            "start": self.start.isoformat(),
+            "count": self.count,
+            "avg_sentiment": round(self.avg_sentiment, 3),
+            "min_sentiment": round(self.min_sentiment, 3),
+            "max_sentiment": round(self.max_sentiment, 3),
+            "positive": self.positive,
+            "neutral": self.neutral,
+            "negative": self.negative,
+            "dominant_emotion": self.dominant_emotion,
+        }
+
+
+class _Rollup:
+    """Column arrays keyed by an integer bucket (day ordinal or hour index)."""
+
+    def __init__(self, columns: Optional[dict[str, np.ndarray]] = None):
+        if columns is None:
+            columns = {
+                "bucket": np.zeros(_INITIAL_ROWS, dtype=np.int32),
+                "count": np.zeros(_INITIAL_ROWS, dtype=np.uint32),
+                "sentiment_sum": np.zeros(_INITIAL_ROWS, dtype=np.float64),
+                "sentiment_min": np.zeros(_INITIAL_ROWS, dtype=np.float32),
+                "sentiment_max": np.zeros(_INITIAL_ROWS, dtype=np.float32),
+                "labels": np.zeros((_INITIAL_ROWS, 3), dtype=np.uint32),  # neg, neu, pos
+                "emotions": np.zeros((_INITIAL_ROWS, len(EMOTIONS)), dtype=np.uint32),
+            }
+            self.rows = 0
+        else:
+            self.rows = len(columns["bucket"])
+        self.columns = columns
+        self.index = {int(b): i for i, b in enumerate(columns["bucket"][: self.rows])}
+
+    def _row(self, bucket: int) -> int:
+        row = self.index.get(bucket)
+        if row is not None:
+            return row
+        row = self.rows
+        if row >= len(self.columns["bucket"]):
+            grow = max(_INITIAL_ROWS, row)
+            for name, col in self.columns.items():
+                pad = np.zeros((grow,) + col.shape[1:], dtype=col.dtype)
+                self.columns[name] = np.concatenate([col, pad])
+        self.columns["bucket"][row] = bucket
+        self.index[bucket] = row
+        self.rows += 1
+        return row
+
+    def add(self, bucket: int, score: float, label_code: int, emotion_code: int) -> None:
+        row = self._row(bucket)
+        c = self.columns
+        first = c["count"][row] == 0
+        c["count"][row] += 1
+        c["sentiment_sum"][row] += score
+        c["sentiment_min"][row] = score if first else min(c["sentiment_min"][row], score)
+        c["sentiment_max"][row] = score if first else max(c["sentiment_max"][row], score)
+        c["labels"][row, label_code] += 1
+        c["emotions"][row, emotion_code] += 1
+
+    def totals(self, bucket: int) -> tuple[int, float]:
+        """(count, sentiment sum) for one bucket, O(1)."""
+        row = self.index.get(bucket)
+        if row is None:
+            return 0, 0.0
+        return int(self.columns["count"][row]), float(self.columns["sentiment_sum"][row])
+
+    def bucket(self, bucket: int, start: datetime) -> Optional[MoodBucket]:
+        row = self.index.get(bucket)
+        if row is None:
+            return None
+        c = self.columns
+        count = int(c["count"][row])
+        neg, neu, pos = (int(v) for v in c["labels"][row])
+        return MoodBucket(
+            start=start,
+            count=count,
+            avg_sentiment=float(c["sentiment_sum"][row]) / count,
+            min_sentiment=float(c["sentiment_min"][row]),
+            max_sentiment=float(c["sentiment_max"][row]),
+            positive=pos,
+            neutral=neu,
+            negative=neg,
+            dominant_emotion=EMOTIONS[int(np.argmax(c["emotions"][row]))],
+        )
+
+    def trimmed(self, prefix: str) -> dict[str, np.ndarray]:
+        return {f"{prefix}_{name}": col[: self.rows] for name, col in self.columns.items()}
+
+
+def _label_code(label: str) -> int:
+    return {"negative": 0, "neutral": 1, "positive": 2}.get(label, 1)
+
+
+class MoodTimeline:
+    """Per-hour and per-day mood rollups for one memory namespace."""
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # One file write at a time, outside ``_lock``
+        self._dirty = False
+        self._days, self._hours = self._load()
+
+    def _load(self) -> tuple[_Rollup, _Rollup]:
+        if not self._path.exists():
+            return _Rollup(), _Rollup()
+        try:
+            with np.load(self._path) as data:
+                days = {k[len("day_"):]: data[k] for k in data.files if k.startswith("day_")}
+                hours = {k[len("hour_"):]: data[k] for k in data.files if k.startswith("hour_")}
+            return _Rollup(days), _Rollup(hours)
+        except Exception as e:
+            logger.warning("Mood timeline %s unreadable (%s); starting empty.", self._path, e)
+            return _Rollup(), _Rollup()
+
+    def record(
+        self,
+        sentiment_score: float,
+        sentiment_label: str,
+        emotion: str,
+        timestamp: Optional[float] = None,
+        flush: bool = False,
+    ) -> None:
+        """Fold one conversation turn into the hourly and daily rollups.
+
+        The file is written later by the background flusher (or now, with
+        ``flush=True``).
+        """
+        moment = datetime.fromtimestamp(timestamp if timestamp is not None else time.time())
+        day = moment.toordinal()
+        label_code = _label_code(sentiment_label)
+        emotion_code = _EMOTION_INDEX.get(emotion, _EMOTION_INDEX["neutral"])
+        with self._lock:
+            self._days.add(day, sentiment_score, label_code, emotion_code)
+            self._hours.add(day * 24 + moment.hour, sentiment_score, label_code, emotion_code)
+            self._dirty = True
+        if flush:
+            self.flush()
+        else:
+            _schedule_flush(self)
+
+    def flush(self) -> None:
+        """Write the rollups to disk (atomically) if they changed since the last write."""
+        with self._lock:
+            if not self._dirty:
+                return
+            columns = {k: v.copy() for k, v in {**self._days.trimmed("day"), **self._hours.trimmed("hour")}.items()}
+            self._dirty = False
+        try:
+            with self._write_lock:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp, "wb") as f:
+                    np.savez(f, **columns)
+                os.replace(tmp, self._path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def baseline(self, days: int = MOOD_BASELINE_DAYS, before: Optional[date] = None) -> Optional[float]:
+        """Mean sentiment over the ``days`` days before ``before`` (default: today).
+
+        Cost depends only on ``days``, never on how much history is stored.
+        Returns None if there were no turns in the window.
+        """
+        end = (before or date.today()).toordinal()
+        count, total = 0, 0.0
+        with self._lock:
+            for day in range(end - days, end):
+                n, s = self._days.totals(day)
+                count += n
+                total += s
+        return total / count if count else None
+
+    def daily(self, days: int = 14) -> list[MoodBucket]:
+        """Daily mood for the last ``days`` days (including today), oldest first."""
+        today = date.today().toordinal()
+        with self._lock:
+            buckets = [
+                self._days.bucket(d, datetime.fromordinal(d))
+                for d in range(today - days + 1, today + 1)
+            ]
+        return [b for b in buckets if b is not None]
+
+    def hourly(self, hours: int = 24) -> list[MoodBucket]:
+        """Hourly mood for the last ``hours`` hours (including this one), oldest first."""
+        now = datetime.now()
+        current = now.toordinal() * 24 + now.hour
+        with self._lock:
+            buckets = [
+                self._hours.bucket(h, datetime.fromordinal(h // 24).replace(hour=h % 24))
+                for h in range(current - hours + 1, current + 1)
+            ]
+        return [b for b in buckets if b is not None]
+
+    def trend(self, days: int = 14) -> str:
+        """'improving', 'declining' or 'stable' comparing the two halves of the window."""
+        daily = self.daily(days)
+        if len(daily) < 2:
+            return "stable"
+        half = len(daily) // 2
+        first = sum(b.avg_sentiment for b in daily[:half]) / half
+        second = sum(b.avg_sentiment for b in daily[half:]) / (len(daily) - half)
+        if second - first > 0.15:
+            return "improving"
+        if second - first < -0.15:
+            return "declining"
+        return "stable"
+
+    def report(self, days: int = 14) -> dict:
+        """Mood-trend report for APIs and the CLI."""
+        daily = self.daily(days)
+        tomorrow = date.fromordinal(date.today().toordinal() + 1)
+        return {
+            "days": days,
+            "turns": sum(b.count for b in daily),
+            "average": self.baseline(days, before=tomorrow),
+            "trend": self.trend(days),
+            "daily": [b.to_dict() for b in daily],
+        }
+
+
+def _schedule_flush(timeline: MoodTimeline) -> None:
+    global _flusher
+    with _dirty_lock:
+        _dirty.add(timeline)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="mood-flush", daemon=True)
+            _flusher.start()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(MOOD_FLUSH_INTERVAL)
+        flush_all()
+
+
+def flush_all() -> None:
+    """Write every timeline with unwritten changes (runs periodically and at exit)."""
+    with _dirty_lock:
+        pending = list(_dirty)
+        _dirty.clear()
+    for timeline in pending:
+        try:
+            timeline.flush()
+        except OSError as e:
+            logger.warning("Could not write mood timeline %s: %s", timeline._path, e)
+            with _dirty_lock:
+                _dirty.add(timeline)
+
+
+atexit.register(flush_all)
+
+
+def timeline_path_for(collection_name: str) -> Path:
+    """Timeline file for a memory collection."""
+    return MOOD_DIR / f"{collection_name}.npz"
@@ -0,0 +1,229 @@
+"""
+Per-turn sampling profiler.
+When a turn is slow, a profile of just that turn shows where the time
+went. A TurnProfile samples the Python stacks of the threads working on
+one ``AgentBrain.process`` call (the caller, the threads its stages run
+in, and whoever iterates the reply stream) from a sampler thread using
+``sys._current_frames()`` — pure Python, no native tooling. The result
+is written as collapsed stacks (flamegraph.pl, speedscope, inferno) or
+as speedscope JSON to a directory that keeps only the newest files.
+Nothing here runs unless a turn is profiled.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from config.config import PROFILE_DIR, PROFILE_FORMAT, PROFILE_INTERVAL, PROFILE_KEEP, PROFILE_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Thread ident → profile of the turn that thread is working on
+_active: dict[int, "TurnProfile"] = {}
+
+
+def current() -> Optional["TurnProfile"]:
+    """The profile of the turn the calling thread is working on, if any."""
+    return _active.get(threading.get_ident()) if _active else None
+
+
+@contextmanager
+def attached(profile: Optional["TurnProfile"]):
+    """Sample the calling thread as part of ``profile`` (no-op for None).
+
+    Used by threads a profiled turn hands work to, so their stacks land in
+    the turn's profile rather than just the caller waiting on them.
+    """
+    if profile is None:
+        yield
+        return
+    profile.enter()
+    try:
+        yield
+    finally:
+        profile.leave()
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class TurnProfile:
+    """Stack samples of the threads attached to one turn."""
+
+    def __init__(self, label: str = "turn", interval: float = PROFILE_INTERVAL):
+        self.label = label
+        self.interval = interval
+        self.samples: list[tuple[str, tuple, float]] = []  # (thread name, root-first frame names, seconds)
+        self.path: Optional[str] = None
+        self._threads: dict[int, str] = {}  # ident → thread name
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._wall = 0.0
+
+    def enter(self) -> None:
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+        _active[thread.ident] = self
+
+    def leave(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.pop(ident, None)
+        if _active.get(ident) is self:
+            del _active[ident]
+
+    def start(self) -> "TurnProfile":
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name="turn-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def _sample(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now - self._started > PROFILE_MAX_SECONDS:
+                logger.warning("Stopped profiling %s after %.0f s", self.label, PROFILE_MAX_SECONDS)
+                return  # A stream that was never iterated (or a stuck turn); don't sample forever
+            elapsed, last = now - last, now
+            with self._lock:
+                threads = dict(self._threads)
+            frames = sys._current_frames()
+            for ident, name in threads.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.samples.append((name, tuple(reversed(stack)), elapsed))
+            del frames
+
+    def finish(self) -> Optional[str]:
+        """Stop sampling and write the profile; returns its path (None if writing failed)."""
+        if self._stop.is_set():
+            return self.path
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._wall = time.perf_counter() - self._started
+        try:
+            self.path = self.write()
+            logger.info("Profiled %s: %.2f s, %d samples → %s", self.label, self._wall, len(self.samples), self.path)
+        except OSError as e:
+            logger.warning("Could not write turn profile: %s", e)
+        return self.path
+
+    # --- Output ---
+
+    def collapsed(self) -> str:
+        """One ``thread;outer;...;inner count`` line per distinct stack."""
+        counts = Counter(";".join((name.replace(";", ","),) + stack) for name, stack, _ in self.samples)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+    def speedscope(self) -> dict:
+        """Speedscope file: one sampled profile per thread, weighted in milliseconds."""
+        frames: list[dict] = []
+        index: dict[str, int] = {}
+        profiles: dict[str, dict] = {}
+        for name, stack, seconds in self.samples:
+            profile = profiles.setdefault(name, {
+                "type": "sampled", "name": name, "unit": "milliseconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+            })
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame})
+            profile["samples"].append([index[frame] for frame in stack])
+            profile["weights"].append(round(1000 * seconds, 3))
+            profile["endValue"] = round(profile["endValue"] + 1000 * seconds, 3)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.label} ({self._wall:.2f} s)",
+            "exporter": "wellbeing-ai turn profiler",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def write(self, directory: str = str(PROFILE_DIR), fmt: str = PROFILE_FORMAT, keep: int = PROFILE_KEEP) -> str:
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        base = os.path.join(directory, f"{self.label}-{stamp}-{os.getpid()}")
+        if fmt == "speedscope":
+            path = base + ".speedscope.json"
+            with open(path, "w") as f:
+                json.dump(self.speedscope(), f)
+        else:
+            path = base + ".folded"
+            with open(path, "w") as f:
+                f.write(self.collapsed())
+        _rotate(directory, keep)
+        return path
+
+
+def _rotate(directory: str, keep: int) -> None:
+    """Delete all but the ``keep`` newest profiles in ``directory``."""
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith((".folded", ".speedscope.json")):
+            path = os.path.join(directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+    for _, path in sorted(entries, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def profile_call(fn: Callable[[], Any], label: str = "turn") -> Any:
+    """Call ``fn`` under a new TurnProfile.
+
+    If it returns a generator (a streamed reply), sampling continues while
+    the generator runs and the profile is written once it is exhausted or
+    closed; otherwise it is written before returning.
+    """
+    profile = TurnProfile(label).start()
+    profile.enter()
+    try:
+        result = fn()
+    except BaseException:
+        profile.leave()
+        profile.finish()
+        raise
+    profile.leave()
+    if isinstance(result, types.GeneratorType):
+        return _profiled_stream(profile, result)
+    profile.finish()
+    return result
+
+
+def _profiled_stream(profile: TurnProfile, stream: Iterator) -> Iterator:
+    """Relay ``stream``, sampling whichever thread resumes it while it runs."""
+    try:
+        while True:
+            profile.enter()
+            try:
+                item = next(stream)
+            except StopIteration:
+                return
+            finally:
+                profile.leave()
+            yield item
+    finally:
+        stream.close()
+        profile.finish()
@@ -3,15 +3,36 @@ Offline sentiment analysis module using VADER.
 Lightweight, CPU-only, suitable for Raspberry Pi deployment.
 """
 
+import hashlib
 import logging
-from dataclasses import dataclass
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, Optional
 
+import numpy as np
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-from config.config import SENTIMENT_THRESHOLDS
+from agent.lexicon import create_vader_analyzer
+from config.config import (
+    SENTIMENT_THRESHOLDS,
+    SENTIMENT_BATCH_WORKERS,
+    SENTIMENT_BATCH_CHUNK,
+    SENTIMENT_SENTENCE_CACHE_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
+# Compact label codes used by batch results: LABELS[code + 1] -> label
+LABEL_NEGATIVE, LABEL_NEUTRAL, LABEL_POSITIVE = -1, 0, 1
+LABELS = ("negative", "neutral", "positive")
+
+# Sentence boundary: terminal punctuation followed by whitespace, or a line break
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n+")
+
 
 @dataclass
 class SentimentResult:
@@ -21,18 +42,140 @@ class SentimentResult:
     compound: float   # -1.0 to 1.0
     intensity: float  # 0.0 to 1.0 (absolute strength)
     scores: dict      # Raw VADER scores
+    sentences: list[tuple[str, float]] = field(default_factory=list)  # (sentence, compound)
 
     def __str__(self) -> str:
         return f"{self.label} (compound={self.compound:.2f}, intensity={self.intensity:.2f})"
 
 
+@dataclass
+class BatchSentimentResult:
+    """Array-backed sentiment for many texts (one float32 + one int8 per item)."""
+
+    compound: np.ndarray  # float32, -1.0 to 1.0
+    labels: np.ndarray    # int8 label codes, see LABELS
+
+    def __len__(self) -> int:
+        return len(self.compound)
+
+    def label(self, index: int) -> str:
+        """Label string for the item at ``index``."""
+        return LABELS[int(self.labels[index]) + 1]
+
+    def counts(self) -> dict[str, int]:
+        """Number of items per label."""
+        codes = np.bincount(self.labels.astype(np.int64) + 1, minlength=3)
+        return {name: int(n) for name, n in zip(LABELS, codes)}
+
+    @classmethod
+    def concat(cls, parts: list["BatchSentimentResult"]) -> "BatchSentimentResult":
+        """Join chunk results in order."""
+        if not parts:
+            return cls(np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int8))
+        return cls(
+            np.concatenate([p.compound for p in parts]),
+            np.concatenate([p.labels for p in parts]),
+        )
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into non-empty, stripped sentences."""
+    return [s.strip() for s in _SENTENCE_BREAK.split(text) if s and s.strip()]
+
+
+def _sentence_key(sentence: str) -> bytes:
+    return hashlib.blake2b(sentence.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+
+
+def label_codes(compound: np.ndarray, thresholds: dict = SENTIMENT_THRESHOLDS) -> np.ndarray:
+    """Vectorized label classification of compound scores."""
+    codes = np.full(len(compound), LABEL_NEUTRAL, dtype=np.int8)
+    codes[compound >= thresholds["positive"]] = LABEL_POSITIVE
+    codes[compound <= thresholds["negative"]] = LABEL_NEGATIVE
+    return codes
+
+
+# Per-process analyzer for pool workers (built once by the initializer).
+_worker_analyzer: Optional[SentimentIntensityAnalyzer] = None
+
+
+def _init_worker() -> None:
+    global _worker_analyzer
+    _worker_analyzer = create_vader_analyzer()
+
+
+def _score_chunk(texts: list[str]) -> BatchSentimentResult:
+    """Score a chunk of texts with this process's analyzer."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _init_worker()
+    compound = np.fromiter(
+        (
+            _worker_analyzer.polarity_scores(t)["compound"] if t and t.strip() else 0.0
+            for t in texts
+        ),
+        dtype=np.float32,
+        count=len(texts),
+    )
+    return BatchSentimentResult(compound, label_codes(compound))
+
+
+def _chunked(texts: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(texts)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+class IncrementalSentiment:
+    """Scores a streamed text (e.g. the assistant's reply) as sentences complete."""
+
+    def __init__(self, analyzer: "SentimentAnalyzer"):
+        self._analyzer = analyzer
+        self._buffer = ""
+        self.sentences: list[tuple[str, float]] = []
+
+    def feed(self, chunk: str) -> list[tuple[str, float]]:
+        """Add streamed text; returns (sentence, compound) for newly completed sentences."""
+        self._buffer += chunk
+        parts = _SENTENCE_BREAK.split(self._buffer)
+        if len(parts) < 2:
+            return []
+        self._buffer = parts[-1]
+        return self._score([p.strip() for p in parts[:-1] if p and p.strip()])
+
+    def finish(self) -> SentimentResult:
+        """Score any trailing partial sentence and return the aggregate result."""
+        tail = self._buffer.strip()
+        self._buffer = ""
+        if tail:
+            self._score([tail])
+        return self._analyzer.aggregate(self.sentences)
+
+    def _score(self, sentences: list[str]) -> list[tuple[str, float]]:
+        scored = [(s, self._analyzer.score_sentence(s)) for s in sentences]
+        self.sentences.extend(scored)
+        return scored
+
+
 class SentimentAnalyzer:
     """VADER-based sentiment analyzer for conversational text."""
 
-    def __init__(self):
-        self._analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, sentence_cache_size: int = SENTIMENT_SENTENCE_CACHE_SIZE):
+        self._analyzer = create_vader_analyzer()
         self._thresholds = SENTIMENT_THRESHOLDS
-        logger.info("Sentiment analyzer initialized (VADER).")
+        self._sentence_cache: OrderedDict[bytes, float] = OrderedDict()
+        self._sentence_cache_size = sentence_cache_size
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        logger.info("Sentiment analyzer initialized (VADER, precompiled lexicon).")
+
+    def _label(self, compound: float) -> str:
+        if compound >= self._thresholds["positive"]:
+            return "positive"
+        if compound <= self._thresholds["negative"]:
+            return "negative"
+        return "neutral"
 
     def analyze(self, text: str) -> SentimentResult:
         """Analyze sentiment of the given text and return a structured result."""
@@ -43,14 +186,7 @@ class SentimentAnalyzer:
 
         scores = self._analyzer.polarity_scores(text)
         compound = scores["compound"]
-
-        if compound >= self._thresholds["positive"]:
-            label = "positive"
-        elif compound <= self._thresholds["negative"]:
-            label = "negative"
-        else:
-            label = "neutral"
-
+        label = self._label(compound)
         intensity = abs(compound)
 
         return SentimentResult(
@@ -59,3 +195,101 @@ class SentimentAnalyzer:
             intensity=intensity,
             scores=scores,
         )
+
+    def score_sentence(self, sentence: str) -> float:
+        """Compound score for one sentence, cached by sentence hash."""
+        key = _sentence_key(sentence)
+        with self._cache_lock:
+            compound = self._sentence_cache.get(key)
+            if compound is not None:
+                self._sentence_cache.move_to_end(key)
+                self.cache_hits += 1
+                return compound
+        compound = self._analyzer.polarity_scores(sentence)["compound"]
+        with self._cache_lock:
+            self.cache_misses += 1
+            self._sentence_cache[key] = compound
+            if len(self._sentence_cache) > self._sentence_cache_size:
+                self._sentence_cache.popitem(last=False)
+        return compound
+
+    def aggregate(self, sentences: list[tuple[str, float]]) -> SentimentResult:
+        """Combine per-sentence scores into a turn-level result (word-weighted mean)."""
+        if not sentences:
+            return SentimentResult(label="neutral", compound=0.0, intensity=0.0, scores={})
+        weights = [max(1, len(s.split())) for s, _ in sentences]
+        compound = sum(w * c for w, (_, c) in zip(weights, sentences)) / sum(weights)
+        compound = round(compound, 4)
+        return SentimentResult(
+            label=self._label(compound),
+            compound=compound,
+            intensity=abs(compound),
+            scores={"compound": compound},
+            sentences=list(sentences),
+        )
+
+    def analyze_sentences(self, text: str) -> SentimentResult:
+        """Sentence-segmented analysis: each sentence is scored once and cached.
+
+        Repeated or edited long messages only pay for sentences not seen
+        before. A single-sentence message is scored exactly like analyze().
+        """
+        sentences = split_sentences(text or "")
+        if len(sentences) <= 1:
+            result = self.analyze(text)
+            if sentences:
+                result.sentences = [(sentences[0], result.compound)]
+            return result
+        return self.aggregate([(s, self.score_sentence(s)) for s in sentences])
+
+    def stream_scorer(self) -> IncrementalSentiment:
+        """Start incremental scoring of a streamed text."""
+        return IncrementalSentiment(self)
+
+    def iter_analyze(
+        self,
+        texts: Iterable[str],
+        workers: int = SENTIMENT_BATCH_WORKERS,
+        chunk_size: int = SENTIMENT_BATCH_CHUNK,
+    ) -> Iterator[BatchSentimentResult]:
+        """Stream chunk results, in input order, for a (possibly lazy) corpus.
+
+        Chunks are fanned out over a process pool where each worker holds its
+        own VADER instance. With ``workers <= 1`` scoring stays in-process.
+        """
+        chunks = _chunked(texts, chunk_size)
+        if workers <= 1:
+            for chunk in chunks:
+                compound = np.fromiter(
+                    (
+                        self._analyzer.polarity_scores(t)["compound"] if t and t.strip() else 0.0
+                        for t in chunk
+                    ),
+                    dtype=np.float32,
+                    count=len(chunk),
+                )
+                yield BatchSentimentResult(compound, label_codes(compound, self._thresholds))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            # Keep a bounded window of chunks in flight so huge corpora stream
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(_score_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def analyze_many(
+        self,
+        texts: list[str],
+        workers: int = SENTIMENT_BATCH_WORKERS,
+        chunk_size: int = SENTIMENT_BATCH_CHUNK,
+    ) -> BatchSentimentResult:
+        """Score many texts at once for retrospective reports and backfills."""
+        if len(texts) <= chunk_size:
+            workers = 1  # A pool costs more than it saves for a single chunk
+        return BatchSentimentResult.concat(
+            list(self.iter_analyze(texts, workers=workers, chunk_size=chunk_size))
+        )
@@ -0,0 +1,171 @@
+"""
+Startup profiling.
+Records how long each initialisation stage takes (always; it is cheap)
+and, when enabled with ``--profile-startup``, how long every module takes
+to import, so a slow boot can be traced to the package responsible.
+Only the standard library is imported here, so enabling the profiler
+first thing in an entry point sees every later import.
+"""
+
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's real loader while it loads, timing create + exec."""
+
+    def __init__(self, loader, timer: "_ImportTimer"):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        with self._timer.timing(spec.name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        try:
+            with self._timer.timing(module.__name__):
+                self._loader.exec_module(module)
+        finally:
+            # Only present while loading: afterwards the module sees its real loader
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta-path finder that times the import of every module found after it is installed."""
+
+    def __init__(self):
+        self.self_times: dict[str, float] = {}  # module → seconds excluding nested imports
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    @contextmanager
+    def timing(self, name: str):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)  # Time spent in nested imports
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                self.self_times[name] = self.self_times.get(name, 0.0) + total - nested
+
+
+class StartupProfiler:
+    """Init-stage timings and milestones since process start, plus optional import timing."""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.stages: list[list] = []  # [name, nesting depth, seconds or None while running], in start order
+        self.milestones: dict[str, float] = {}  # name → seconds since t0
+        self._timer: Optional[_ImportTimer] = None
+        self._depth = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def imports_enabled(self) -> bool:
+        return self._timer is not None
+
+    def enable_imports(self) -> None:
+        """Start timing imports (call before the heavy imports happen)."""
+        if self._timer is None:
+            self._timer = _ImportTimer()
+            sys.meta_path.insert(0, self._timer)
+
+    def disable_imports(self) -> None:
+        if self._timer is not None and self._timer in sys.meta_path:
+            sys.meta_path.remove(self._timer)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time an initialisation stage; stages may nest."""
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        entry = [name, depth, None]
+        with self._lock:
+            self.stages.append(entry)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._depth.value = depth
+            entry[2] = time.monotonic() - start
+
+    def mark(self, name: str) -> None:
+        """Record a milestone (e.g. "ui_ready") once, as seconds since process start."""
+        with self._lock:
+            self.milestones.setdefault(name, time.monotonic() - self.t0)
+
+    def summary(self) -> dict:
+        """Milestones and top-level stage times, for the status API."""
+        with self._lock:
+            return {
+                "milestones": {k: round(v, 2) for k, v in self.milestones.items()},
+                "stages": {name: round(secs, 3) for name, depth, secs in self.stages if depth == 0 and secs is not None},
+            }
+
+    def report(self, top: int = 15) -> str:
+        """Human-readable breakdown of imports by package, slowest modules and init stages."""
+        lines = ["=" * 64, "Startup Profile", "=" * 64]
+        with self._lock:
+            milestones = dict(self.milestones)
+            stages = [tuple(s) for s in self.stages]
+        for name, secs in sorted(milestones.items(), key=lambda kv: kv[1]):
+            lines.append(f"  {name:32s} {secs:8.2f} s after start")
+
+        if self._timer is not None:
+            times = dict(self._timer.self_times)
+            packages: dict[str, list] = {}
+            for module, secs in times.items():
+                entry = packages.setdefault(module.split(".")[0], [0.0, 0])
+                entry[0] += secs
+                entry[1] += 1
+            lines += ["", f"  Imports: {sum(times.values()):.2f} s in {len(times)} modules", "",
+                      f"  {'package':32s} {'seconds':>8s} {'modules':>8s}"]
+            for package, (secs, count) in sorted(packages.items(), key=lambda kv: -kv[1][0])[:top]:
+                lines.append(f"  {package:32s} {secs:8.3f} {count:8d}")
+            lines += ["", f"  {'slowest modules (self time)':32s} {'seconds':>8s}"]
+            for module, secs in sorted(times.items(), key=lambda kv: -kv[1])[:top]:
+                lines.append(f"  {module[:32]:32s} {secs:8.3f}")
+
+        if stages:
+            lines += ["", f"  {'init stage':32s} {'seconds':>8s}"]
+            for name, depth, secs in stages:
+                shown = f"{secs:8.3f}" if secs is not None else f"{'running':>8s}"
+                lines.append(f"  {('  ' * depth + name)[:32]:32s} {shown}")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()
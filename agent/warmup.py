@@ -0,0 +1,117 @@
+"""
+Parallel model warm-up.
+Right after start, the first chat turn would otherwise pay for Ollama
+loading the LLM weights, the embedding model's first load and the emotion
+model's first forward pass. The WarmupOrchestrator runs one warm-up task
+per component in its own thread, so these loads overlap each other (and
+the user's first message), and reports each component's readiness.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from agent.startup import profiler
+from config.config import CAMERA_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# Component states, in the order they are normally passed through
+PENDING, RUNNING, READY, UNAVAILABLE, FAILED = "pending", "running", "ready", "unavailable", "failed"
+
+
+class _Component:
+    def __init__(self, name: str, task: Callable[[], bool]):
+        self.name = name
+        self.task = task
+        self.state = PENDING
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class WarmupOrchestrator:
+    """Runs named warm-up tasks in parallel and tracks their readiness.
+
+    A task is a zero-argument callable; it returns True once its
+    component is loaded and exercised, False if the component is not
+    available (e.g. no emotion model installed). An exception marks the
+    component as failed; the app still works, that component just loads
+    on first use instead.
+    """
+
+    def __init__(self):
+        self._components: dict[str, _Component] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+
+    def add(self, name: str, task: Callable[[], bool]) -> None:
+        """Register a component; call before ``start()``."""
+        self._components[name] = _Component(name, task)
+
+    def start(self) -> "WarmupOrchestrator":
+        """Start every task in its own daemon thread (returns at once)."""
+        self._started = time.monotonic()
+        for component in self._components.values():
+            thread = threading.Thread(target=self._run, args=(component,), name=f"warmup-{component.name}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def _run(self, component: _Component) -> None:
+        with self._lock:
+            component.state = RUNNING
+        start = time.monotonic()
+        try:
+            state, error = (READY if component.task() else UNAVAILABLE), None
+        except Exception as e:
+            state, error = FAILED, f"{type(e).__name__}: {e}"
+        elapsed = time.monotonic() - start
+        with self._lock:
+            component.state, component.error, component.seconds = state, error, elapsed
+            finished = all(c.state not in (PENDING, RUNNING) for c in self._components.values())
+        if state == FAILED:
+            logger.warning("Warm-up of '%s' failed after %.1fs: %s", component.name, elapsed, error)
+        else:
+            logger.info("Warm-up of '%s': %s in %.1fs", component.name, state, elapsed)
+        if finished:
+            profiler.mark("models_warm")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every task has finished; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in self._threads)
+
+    def ready(self, name: str) -> bool:
+        component = self._components.get(name)
+        return component is not None and component.state == READY
+
+    @property
+    def done(self) -> bool:
+        with self._lock:
+            return all(c.state not in (PENDING, RUNNING) for c in self._components.values())
+
+    def snapshot(self) -> dict:
+        """Per-component state, duration and error, for the status API."""
+        with self._lock:
+            return {
+                c.name: {
+                    "state": c.state,
+                    "seconds": round(c.seconds, 2) if c.seconds is not None else None,
+                    "error": c.error,
+                }
+                for c in self._components.values()
+            }
+
+
+def warm_up_models(brain, camera=None) -> WarmupOrchestrator:
+    """Start warming the LLM, the default memory namespace's embedder and the emotion model."""
+    warmup = WarmupOrchestrator()
+    warmup.add("llm", brain.llm.preload)
+    warmup.add("embeddings", lambda: brain.memories.get().warm_up())
+    if CAMERA_ENABLED and camera is not None:
+        warmup.add("vision", camera.warm_up)
+    return warmup.start()
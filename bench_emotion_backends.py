@@ -0,0 +1,116 @@
+"""
+Emotion backend benchmark.
+For each backend, in a fresh subprocess: import + model load time, RSS
+growth, per-frame detect() latency, and agreement of the dominant emotion
+with the FER backend on the same recorded frames.
+
+Usage: python bench_emotion_backends.py <video_file|image_dir> [frames] [backend ...]
+"""
+
+import json
+import subprocess
+import sys
+
+from interface.emotion_backends import BACKENDS
+
+CHILD = r"""
+import json, sys, time
+from pathlib import Path
+
+def rss_kb():
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+name, source, count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+import cv2, numpy  # Shared by every backend; not counted
+
+def read_frames():
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+        return [cv2.imread(str(p)) for p in files[:count]]
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+frames = read_frames()
+before = rss_kb()
+start = time.perf_counter()
+from interface.emotion_backends import BACKENDS
+backend = BACKENDS[name]()
+load_ms = (time.perf_counter() - start) * 1000
+backend.detect(frames[0])  # First call builds kernels / graphs
+after = rss_kb()
+
+labels, times = [], []
+for frame in frames:
+    t = time.perf_counter()
+    faces = backend.detect(frame)
+    times.append((time.perf_counter() - t) * 1000)
+    labels.append(max(faces[0]["emotions"], key=faces[0]["emotions"].get) if faces else None)
+times.sort()
+print(json.dumps({
+    "load_ms": load_ms,
+    "rss_mb": (after - before) / 1024,
+    "median_ms": times[len(times) // 2],
+    "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+    "labels": labels,
+}))
+"""
+
+
+def run(name: str, source: str, count: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, name, source, str(count)], capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    source = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    names = sys.argv[3:] or list(BACKENDS)
+
+    print("=" * 78)
+    print(f"Emotion Backend Benchmark ({source}, up to {count} frames)")
+    print("=" * 78)
+
+    results = {name: run(name, source, count) for name in names}
+    reference = results.get("fer", {}).get("labels")
+
+    print(f"\n  {'backend':8s} {'load (ms)':>10s} {'RSS +MB':>9s} {'median ms':>10s} {'p95 ms':>8s} {'faces':>7s} {'agree w/ fer':>13s}")
+    for name, r in results.items():
+        if "error" in r:
+            print(f"  {name:8s} unavailable: {r['error']}")
+            continue
+        labels = r["labels"]
+        found = sum(label is not None for label in labels)
+        agree = "-"
+        if reference is not None and name != "fer":
+            both = [(a, b) for a, b in zip(reference, labels) if a is not None and b is not None]
+            agree = f"{sum(a == b for a, b in both) / len(both):.0%} of {len(both)}" if both else "n/a"
+        print(
+            f"  {name:8s} {r['load_ms']:10.0f} {r['rss_mb']:9.1f} {r['median_ms']:10.1f} "
+            f"{r['p95_ms']:8.1f} {found:3d}/{len(labels):<3d} {agree:>13s}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Face tracking benchmark.
+Compares per-frame vision cost of the full-frame path (face detection +
+classification on every frame) with detect-then-track (template tracking
+between detections, emotion CNN on face crops only) for the configured
+emotion backend.
+
+Usage: python bench_face_tracking.py [frames] [video_path]
+Frames are read up front (from the video file or the webcam) so capture
+time is excluded.
+"""
+
+import statistics
+import sys
+import time
+
+import cv2
+
+from config.config import CAMERA_INDEX
+from interface.emotion_backends import create_emotion_backend
+from interface.face_tracking import FaceTracker
+
+
+def read_frames(count: int, source) -> list:
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def dominant(faces: list[dict]):
+    if not faces:
+        return None
+    emotions = faces[0]["emotions"]
+    return max(emotions, key=emotions.get)
+
+
+def run_full(backend, frames: list) -> tuple[list[float], list]:
+    times, labels = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        faces = backend.detect(frame)
+        times.append(time.perf_counter() - start)
+        labels.append(dominant(faces))
+    return times, labels
+
+
+def run_tracked(backend, frames: list) -> tuple[list[float], list, FaceTracker]:
+    tracker = FaceTracker()
+    times, labels = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        faces = backend.classify(frame, tracker.update(frame, backend.find_faces))
+        times.append(time.perf_counter() - start)
+        labels.append(dominant(faces))
+    return times, labels, tracker
+
+
+def report(label: str, times: list[float]) -> None:
+    ms = sorted(t * 1000 for t in times)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {label:18s} mean {statistics.mean(ms):7.1f} ms   median {statistics.median(ms):7.1f} ms   p95 {p95:7.1f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    source = sys.argv[2] if len(sys.argv) > 2 else CAMERA_INDEX
+
+    print("=" * 70)
+    print("Face Tracking Benchmark")
+    print("=" * 70)
+
+    backend = create_emotion_backend()
+    if backend is None:
+        print("✗ Emotion backend not available (see log above)")
+        sys.exit(1)
+
+    frames = read_frames(count, source)
+    if not frames:
+        print(f"✗ Could not read frames from {source!r}")
+        sys.exit(1)
+    print(f"\n{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} from {source!r}, "
+          f"backend '{backend.name}'\n")
+
+    backend.detect(frames[0])  # Warm up the model
+
+    full_times, full_labels = run_full(backend, frames)
+    tracked_times, tracked_labels, tracker = run_tracked(backend, frames)
+
+    report("full-frame", full_times)
+    report("detect-then-track", tracked_times)
+    stats = tracker.stats()
+    agree = sum(a == b for a, b in zip(full_labels, tracked_labels)) / len(frames)
+    print(f"\n  speedup: {statistics.mean(full_times) / statistics.mean(tracked_times):.2f}x")
+    print(f"  detections: {stats['detections']}, tracked frames: {stats['tracked']}, "
+          f"track losses: {stats['losses']}")
+    print(f"  detect: {stats['detect_ms']} ms/call, track: {stats['track_ms']} ms/frame")
+    print(f"  dominant emotion agreement with full-frame path: {agree:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+VADER lexicon startup benchmark.
+Measures analyzer construction time, RSS growth and scoring throughput in
+fresh subprocesses for VADER's own text loader versus the precompiled
+memory-mapped lexicon cache.
+
+Usage: python bench_lexicon.py [runs]
+"""
+
+import json
+import subprocess
+import sys
+
+MODES = ["text", "cache-mmap"]
+
+CHILD = r"""
+import json, sys, time
+from pathlib import Path
+
+def rss_kb():
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+mode = sys.argv[1]
+import vaderSentiment.vaderSentiment  # import cost is identical in every mode
+from agent import lexicon
+
+before = rss_kb()
+start = time.perf_counter()
+analyzer = lexicon.create_vader_analyzer(use_cache=(mode == "cache-mmap"))
+init_ms = (time.perf_counter() - start) * 1000
+after = rss_kb()
+
+texts = ["I am not feeling great today :( but the walk was LOVELY!! \U0001F60A"] * 2000
+start = time.perf_counter()
+scores = [analyzer.polarity_scores(t)["compound"] for t in texts]
+per_msg_us = (time.perf_counter() - start) / len(texts) * 1e6
+print(json.dumps({"init_ms": init_ms, "rss_kb": after - before, "per_msg_us": per_msg_us, "score": scores[0]}))
+"""
+
+
+def run(mode: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 60)
+    print(f"VADER Lexicon Startup Benchmark ({runs} runs per mode)")
+    print("=" * 60)
+
+    from agent.lexicon import build_lexicon_cache
+    build_lexicon_cache()
+
+    print(f"\n  {'mode':12s} {'init (ms)':>10s} {'RSS +KB':>10s} {'us/msg':>10s}  score")
+    for mode in MODES:
+        results = [run(mode) for _ in range(runs)]
+        init_ms = sorted(r["init_ms"] for r in results)[runs // 2]
+        rss = sorted(r["rss_kb"] for r in results)[runs // 2]
+        per_msg = sorted(r["per_msg_us"] for r in results)[runs // 2]
+        print(f"  {mode:12s} {init_ms:10.1f} {rss:10d} {per_msg:10.1f}  {results[0]['score']}")
+
+    print("\n  (medians; RSS for cache-mmap counts mapped pages that are shared")
+    print("   with every other process using the same cache file)")
+
+
+if __name__ == "__main__":
+    main()
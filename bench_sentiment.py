@@ -0,0 +1,74 @@
+"""
+Sentiment throughput benchmark.
+Compares per-message analyze() with the batch analyze_many() API
+(in-process and across a process pool) on a synthetic message corpus.
+
+Usage: python bench_sentiment.py [message_count] [workers]
+"""
+
+import random
+import sys
+import time
+
+from agent.sentiment import SentimentAnalyzer
+from config.config import SENTIMENT_BATCH_WORKERS
+
+TEMPLATES = [
+    "I had a really {adj} day at work today.",
+    "Honestly I feel {adj} and I don't know why.",
+    "My friend said something {adj} and it stuck with me.",
+    "Slept badly again. Everything feels {adj}.",
+    "We went for a walk by the lake, it was {adj}!",
+    "Not sure what to think, just {adj} I guess.",
+]
+ADJECTIVES = [
+    "great", "terrible", "okay", "exhausting", "wonderful", "lonely",
+    "calm", "stressful", "fine", "awful", "lovely", "confusing",
+]
+
+
+def make_corpus(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(adj=rng.choice(ADJECTIVES)) for _ in range(n)]
+
+
+def bench(label: str, fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:32s} {elapsed:7.2f}s  {n / elapsed:10.0f} msg/s")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else SENTIMENT_BATCH_WORKERS
+
+    print("=" * 60)
+    print(f"Sentiment Throughput Benchmark ({n} messages, {workers} workers)")
+    print("=" * 60)
+
+    corpus = make_corpus(n)
+    analyzer = SentimentAnalyzer()
+
+    results = {}
+    bench("analyze() loop", lambda: results.setdefault("loop", [analyzer.analyze(t) for t in corpus]), n)
+    bench("analyze_many(workers=1)", lambda: results.setdefault("one", analyzer.analyze_many(corpus, workers=1)), n)
+    bench(
+        f"analyze_many(workers={workers})",
+        lambda: results.setdefault("pool", analyzer.analyze_many(corpus, workers=workers, chunk_size=max(1, n // (workers * 4)))),
+        n,
+    )
+
+    batch = results["pool"]
+    mismatches = sum(
+        1 for i, r in enumerate(results["loop"]) if r.label != batch.label(i)
+    )
+    print(f"\n  Label mismatches vs analyze(): {mismatches}")
+    print(f"  Label counts: {batch.counts()}")
+    print(f"  Batch result size: {batch.compound.nbytes + batch.labels.nbytes} bytes "
+          f"({(batch.compound.nbytes + batch.labels.nbytes) / n:.0f} bytes/msg)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Multi-worker deployment benchmark.
+Starts a fake Ollama, then serves the app two ways and drives both with the
+same load: a few users streaming chat turns back to back while many
+clients poll status and camera snapshots (synthetic camera source):
+
+  single: python web_app.py style — one process, in-process brain
+  multi:  brain_service.py + N HTTP worker processes (gunicorn if installed,
+          otherwise N Flask servers balanced round-robin by the client)
+
+Reports requests/s and latency percentiles per endpoint for each mode.
+Chat turns are stored under the "bench" memory profile, in a temporary
+memory store and mood directory (never in data/).
+
+Usage: python bench_service.py [--workers 4] [--clients 16] [--chatters 2] [--duration 20] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+import requests
+
+from fake_ollama import FakeOllama
+from loadtest import scratch_env, start_single, start_multi, stop_all, wait_ready
+
+POLL_MIX = {"status": 1, "snapshot": 1}  # Relative request weights of the polling clients
+
+
+def request(session: requests.Session, base: str, kind: str) -> float:
+    """Run one request of ``kind``; returns seconds until the response completed."""
+    start = time.perf_counter()
+    if kind == "chat_stream":
+        with session.post(f"{base}/api/chat_stream", json={"message": "Tell me something calming about the evening", "profile": "bench"},
+                          stream=True, timeout=300) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if line and b'"type": "error"' in line:
+                    raise RuntimeError(line.decode())
+    elif kind == "status":
+        session.get(f"{base}/api/status", timeout=60).raise_for_status()
+    elif kind == "snapshot":
+        session.get(f"{base}/api/camera/snapshot", timeout=60).raise_for_status()
+    return time.perf_counter() - start
+
+
+def drive(urls: list[str], clients: int, chatters: int, duration: float) -> dict:
+    kinds = ["chat_stream", *POLL_MIX]
+    samples: dict[str, list[float]] = {kind: [] for kind in kinds}
+    errors: dict[str, int] = {kind: 0 for kind in kinds}
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(i: int, chat: bool):
+        rng = random.Random(i)
+        session = requests.Session()
+        n = i
+        while time.time() < stop_at:
+            kind = "chat_stream" if chat else rng.choices(list(POLL_MIX), list(POLL_MIX.values()))[0]
+            base = urls[n % len(urls)]
+            n += 1
+            try:
+                elapsed = request(session, base, kind)
+                with lock:
+                    samples[kind].append(elapsed)
+            except Exception:
+                with lock:
+                    errors[kind] += 1
+
+    threads = [threading.Thread(target=client, args=(i, i < chatters)) for i in range(chatters + clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    polls = sum(len(samples[kind]) for kind in POLL_MIX)
+    result = {"poll_requests_per_s": round(polls / duration, 2), "endpoints": {}}
+    for kind, values in samples.items():
+        values.sort()
+        result["endpoints"][kind] = {
+            "ok": len(values),
+            "errors": errors[kind],
+            "p50_ms": round(statistics.median(values) * 1000, 1) if values else None,
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1) if values else None,
+        }
+    return result
+
+
+def run_mode(mode: str, args, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = scratch_env(env, tmp)
+        if mode == "single":
+            urls, procs = start_single(env)
+        else:
+            urls, procs = start_multi(env, args.workers, os.path.join(tmp, "brain.sock"))
+        try:
+            wait_ready(urls, procs)
+            return {"mode": mode, "http_processes": 1 if mode == "single" else args.workers,
+                    **drive(urls, args.clients, args.chatters, args.duration)}
+        finally:
+            stop_all(procs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-process and multi-worker serving.")
+    parser.add_argument("--workers", type=int, default=4, help="HTTP worker processes in multi mode")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent status/snapshot polling clients")
+    parser.add_argument("--chatters", type=int, default=2, help="Concurrent users streaming chat turns")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per mode")
+    parser.add_argument("--tps", type=float, default=8.0, help="Fake LLM tokens per second")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    fake = FakeOllama(tps=args.tps).start()
+    env = {**os.environ, "OLLAMA_BASE_URL": fake.url, "CAMERA_SOURCE": os.environ.get("CAMERA_SOURCE", "synthetic")}
+    results = [run_mode(mode, args, env) for mode in ("single", "multi")]
+    fake.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"Multi-worker Benchmark ({args.chatters} chatting + {args.clients} polling clients, "
+          f"{args.duration:.0f}s per mode, {os.cpu_count()} CPUs)")
+    print("=" * 72)
+    for r in results:
+        print(f"\n  {r['mode']} ({r['http_processes']} HTTP process(es)): {r['poll_requests_per_s']:.1f} polls/s")
+        print(f"    {'endpoint':12s} {'ok':>6s} {'errors':>7s} {'p50 ms':>9s} {'p95 ms':>9s}")
+        for kind, e in r["endpoints"].items():
+            p50 = f"{e['p50_ms']:9.1f}" if e["p50_ms"] is not None else f"{'-':>9s}"
+            p95 = f"{e['p95_ms']:9.1f}" if e["p95_ms"] is not None else f"{'-':>9s}"
+            print(f"    {kind:12s} {e['ok']:6d} {e['errors']:7d} {p50} {p95}")
+    single, multi = results
+    if single["poll_requests_per_s"]:
+        print(f"\n  polling throughput gain: {multi['poll_requests_per_s'] / single['poll_requests_per_s']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Vision pipeline benchmark.
+Replays a video file, image directory or the synthetic scene (no camera
+needed) and reports per-stage timings — grab, colour conversion, motion
+gate, face detection, tracking, classification, overlay, JPEG encode — plus
+end-to-end throughput.
+
+Usage: python bench_vision.py [source] [frames] [--json] [--faces=1,2,4,8]
+  source: "synthetic" (default), a video file or an image directory
+  --json: print machine-readable results (for CI) instead of a table
+  --faces: instead, sweep synthetic scenes with these face counts and
+           compare batched vs per-face classification latency
+"""
+
+import json
+import statistics
+import sys
+import time
+
+import cv2
+
+from config.config import CAMERA_JPEG_QUALITY, EMOTION_BACKEND
+from interface.camera import MotionGate, draw_faces
+from interface.emotion_backends import create_emotion_backend
+from interface.face_tracking import FaceTracker
+from interface.replay import ReplaySource, synthetic_frame
+
+
+def haar_faces():
+    """Fallback detector (the Haar cascade both backends use) when no backend loads."""
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    def find_faces(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return [tuple(int(v) for v in b) for b in cascade.detectMultiScale(gray, 1.1, 5, minSize=(50, 50))]
+
+    return find_faces
+
+
+def center_box(frame) -> tuple[int, int, int, int]:
+    h, w = frame.shape[:2]
+    return (w // 3, h // 4, w // 3, h // 2)
+
+
+def timed(samples: dict, stage: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def run(source: str, count: int) -> dict:
+    replay = ReplaySource(source, fps=0, loop=True)  # Unpaced: measure, don't wait
+    if not replay.isOpened():
+        raise SystemExit(f"✗ Could not open source {source!r}")
+
+    backend = create_emotion_backend()
+    find_faces = backend.find_faces if backend is not None else haar_faces()
+    tracker = FaceTracker()
+    gate = MotionGate()
+    encode_params = [cv2.IMWRITE_JPEG_QUALITY, CAMERA_JPEG_QUALITY]
+
+    samples: dict[str, list[float]] = {}
+    faces_found = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        frame_start = time.perf_counter()
+        ok, frame = timed(samples, "grab", replay.read)
+        if not ok:
+            break
+        timed(samples, "convert", lambda f: (cv2.cvtColor(f, cv2.COLOR_BGR2RGB), cv2.cvtColor(f, cv2.COLOR_BGR2GRAY)), frame)
+        _, thumb = timed(samples, "motion_gate", gate.check, frame)
+        gate.record(thumb, [])
+        boxes = timed(samples, "detect", find_faces, frame)
+        faces_found += bool(boxes)
+        timed(samples, "track", tracker.update, frame, find_faces)
+        if backend is not None:
+            results = timed(samples, "classify", backend.classify, frame, boxes or [center_box(frame)])
+        else:
+            results = [{"box": list(b), "emotions": {"neutral": 1.0}} for b in boxes or [center_box(frame)]]
+        overlay = frame.copy()
+        timed(samples, "overlay", draw_faces, overlay, results)
+        timed(samples, "encode", cv2.imencode, ".jpg", overlay, encode_params)
+        samples.setdefault("total", []).append((time.perf_counter() - frame_start) * 1000)
+    elapsed = time.perf_counter() - start
+    replay.release()
+
+    frames = len(samples.get("total", []))
+    return {
+        "source": source,
+        "kind": replay.kind,
+        "backend": backend.name if backend is not None else f"none ({EMOTION_BACKEND} unavailable; Haar only)",
+        "frames": frames,
+        "frames_with_faces": faces_found,
+        "throughput_fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        "stages_ms": {
+            stage: {
+                "mean": round(statistics.mean(values), 3),
+                "median": round(statistics.median(values), 3),
+                "p95": round(sorted(values)[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            }
+            for stage, values in samples.items()
+        },
+        "tracker": tracker.stats(),
+    }
+
+
+def run_face_sweep(counts: list[int], frames: int) -> list[dict]:
+    """Per-frame detect + classify latency as the number of faces grows."""
+    backend = create_emotion_backend()
+    find_faces = backend.find_faces if backend is not None else haar_faces()
+    rows = []
+    for n in counts:
+        scene = [synthetic_frame(i, (1280, 720), faces=n) for i in range(frames)]
+        samples: dict[str, list[float]] = {}
+        found = 0
+        for frame in scene:
+            boxes = timed(samples, "detect", find_faces, frame)
+            found += len(boxes)
+            if backend is not None and boxes:
+                timed(samples, "batched", backend.classify, frame, boxes)
+                timed(samples, "per_face", lambda: [backend.classify(frame, [b]) for b in boxes])
+        rows.append({
+            "faces": n,
+            "faces_detected": round(found / frames, 2),
+            **{f"{stage}_ms": round(statistics.median(v), 3) for stage, v in samples.items()},
+        })
+    return rows
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    source = args[0] if args else "synthetic"
+    count = int(args[1]) if len(args) > 1 else 200
+
+    sweep = next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--faces=")), None)
+    if sweep:
+        rows = run_face_sweep([int(n) for n in sweep.split(",")], min(count, 50))
+        if "--json" in sys.argv:
+            print(json.dumps(rows, indent=2))
+            return
+        print(f"\n  {'faces':>5s} {'detected':>9s} {'detect ms':>10s} {'batched ms':>11s} {'per-face ms':>12s}")
+        for r in rows:
+            print(f"  {r['faces']:5d} {r['faces_detected']:9.2f} {r['detect_ms']:10.2f} "
+                  f"{r.get('batched_ms', float('nan')):11.2f} {r.get('per_face_ms', float('nan')):12.2f}")
+        return
+
+    result = run(source, count)
+
+    if "--json" in sys.argv:
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=" * 64)
+    print(f"Vision Pipeline Benchmark ({result['kind']}: {source})")
+    print("=" * 64)
+    print(f"\n  backend: {result['backend']}")
+    print(f"  frames: {result['frames']} ({result['frames_with_faces']} with faces)\n")
+    print(f"  {'stage':12s} {'mean ms':>9s} {'median ms':>10s} {'p95 ms':>9s}")
+    for stage, t in result["stages_ms"].items():
+        print(f"  {stage:12s} {t['mean']:9.2f} {t['median']:10.2f} {t['p95']:9.2f}")
+    print(f"\n  throughput: {result['throughput_fps']:.1f} frames/s (all stages, one thread)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""
+Brain service for multi-worker deployments.
+Holds the heavy singletons (AgentBrain with its LLM client and memory, the
+camera/emotion pipeline, the health monitor and the turn counter) in one
+long-running process and serves them to any number of HTTP worker
+processes over a local Unix socket.
+
+Usage: python brain_service.py [--socket PATH] [--profile-startup]
+Then start the web workers with BRAIN_SERVICE_SOCKET=PATH (see README).
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from functools import partial
+from multiprocessing.connection import Client, Listener
+from typing import Iterator, Optional
+
+from agent.degradation import TurnLoad
+from agent.deadline import TurnDeadline
+from agent.health import HealthMonitor
+from agent.idle import manage_idle_models
+from agent.startup import profiler
+from agent.warmup import warm_up_models
+from config.config import (
+    CAMERA_ENABLED,
+    OLLAMA_BASE_URL,
+    LLM_MODEL,
+    HEALTH_LLM_INTERVAL,
+    HEALTH_LLM_TIMEOUT,
+    HEALTH_PROBE_INTERVAL,
+    BRAIN_SERVICE_SOCKET,
+    BRAIN_SERVICE_MAX_IDLE,
+    WARMUP_MODELS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceError(RuntimeError):
+    """A call to the brain service failed (or the service is unreachable)."""
+
+
+class BrainService:
+    """Everything the web routes need from the stateful side of the app.
+
+    Used directly (in-process) by the single-process dev server, and
+    behind ``serve()`` / ``ServiceClient`` in multi-worker mode. Methods
+    take and return plain, picklable values.
+    """
+
+    OPS = {
+        "status", "chat", "camera_available", "snapshot", "latest_jpeg",
+        "camera_overlay", "camera_emotion", "camera_stats", "memory_stats",
+        "mood_trend", "reset", "trigger_exercise", "list_exercises",
+        "skip_exercise", "start_exercise",
+    }
+    STREAM_OPS = {"chat_events", "stream_jpeg"}
+    # Operations with side effects: never re-sent once the service may have received them
+    MUTATING_OPS = {"chat", "chat_events", "reset", "trigger_exercise", "skip_exercise", "start_exercise"}
+
+    def __init__(self):
+        logger.info("Initializing AI agent...")
+        # Heavy imports are deferred to here so HTTP workers that only use ServiceClient never pay for them
+        with profiler.stage("brain"):
+            from agent.brain import AgentBrain
+
+            self.brain = AgentBrain()
+        with profiler.stage("camera"):
+            from interface.camera import create_camera
+
+            self.camera = create_camera()
+        self.turn_count = 0
+        self._turn_lock = threading.Lock()
+
+        with profiler.stage("health"):
+            self.health = HealthMonitor()
+            self.health.add_probe("llm", lambda: self.brain.llm.is_available(timeout=HEALTH_LLM_TIMEOUT), HEALTH_LLM_INTERVAL)
+            self.health.add_probe("sentiment", lambda: True, HEALTH_PROBE_INTERVAL)
+            self.health.add_probe("memory", self.brain.memories.healthy, HEALTH_PROBE_INTERVAL)
+            if CAMERA_ENABLED:
+                self.health.add_probe("camera", self.camera.is_available, HEALTH_PROBE_INTERVAL)
+            self.health.start()  # Probes run in the background; status reads their cached results
+        # LLM weights, embedder and emotion model load in parallel, in the background
+        self.warmup = warm_up_models(self.brain, self.camera) if WARMUP_MODELS else None
+        self.idle = manage_idle_models(self.brain, self.camera)  # ...and are unloaded again when unused
+        profiler.mark("backend_ready")
+        logger.info("Backend ready; subsystem health is probed in the background.")
+
+    def system_status(self) -> dict[str, bool]:
+        """Cached subsystem flags in the shape the UI expects."""
+        status = self.health.status()
+        status.setdefault("camera", False)
+        return status
+
+    def status(self, fresh: bool = False) -> dict:
+        if fresh:
+            self.health.refresh()
+        return {
+            "status": self.system_status(),
+            "health": self.health.details(),
+            "camera_enabled": CAMERA_ENABLED,
+            "ollama_url": OLLAMA_BASE_URL,
+            "model": LLM_MODEL,
+            "load": self.brain.load.snapshot(),
+            "fallbacks": self.brain.fallbacks.snapshot(),
+            "warming": False,
+            "warmup": self.warmup.snapshot() if self.warmup is not None else {},
+            "models": self.idle.snapshot(),
+            "startup": profiler.summary(),
+        }
+
+    # --- Chat ---
+
+    def _begin_turn(self, capture_emotion: bool) -> tuple[int, Optional[str], TurnLoad, TurnDeadline]:
+        with self._turn_lock:
+            self.turn_count += 1
+            turn = self.turn_count
+        load = self.brain.load.begin_turn()
+        deadline = TurnDeadline(self.brain.fallbacks)
+        face_emotion = None
+        if capture_emotion and load.allows("camera") and CAMERA_ENABLED and self.camera is not None:
+            logger.info("Capturing emotion from camera...")
+            face_emotion = deadline.run("vision", self._capture_emotion, None)
+            logger.info(f"Detected emotion: {face_emotion}")
+        return turn, face_emotion, load, deadline
+
+    def _capture_emotion(self) -> Optional[str]:
+        # The availability check runs inside the vision budget too: it may open the camera
+        return self.camera.capture_emotion() if self.camera.is_available() else None
+
+    def chat(self, message: str, capture_emotion: bool = False, profile: Optional[str] = None, profiled: bool = False) -> dict:
+        turn, face_emotion, load, deadline = self._begin_turn(capture_emotion)
+        response = self.brain.process(
+            message, face_emotion=face_emotion, namespace=profile, load=load, deadline=deadline, profiled=profiled
+        )
+        return {
+            "response": response,
+            "face_emotion": face_emotion,
+            "turn_count": turn,
+            "degradation": load.mode,
+            "fallbacks": deadline.summary(),
+        }
+
+    def chat_events(
+        self, message: str, capture_emotion: bool = False, profile: Optional[str] = None, profiled: bool = False
+    ) -> Iterator[dict]:
+        """Events of one streamed turn: emotion, exercise_offer, token..., done.
+
+        ``profile`` is the user's memory namespace; ``profiled`` asks for a
+        sampling profile of the turn (see agent/profiling.py).
+        """
+        _, face_emotion, load, deadline = self._begin_turn(capture_emotion)
+        if face_emotion:
+            yield {"type": "emotion", "emotion": face_emotion}
+
+        response_generator = self.brain.process(
+            message, face_emotion=face_emotion, stream=True, namespace=profile, load=load, deadline=deadline,
+            profiled=profiled,
+        )
+
+        # Check if brain triggered an exercise offer during processing
+        if self.brain._exercise_state.get("pending"):
+            exercises = self.brain.exercise_manager.get_all_exercises()
+            yield {"type": "exercise_offer", "exercises": exercises}
+            # Consume the text generator so it doesn't leak
+            for _ in response_generator:
+                pass
+            self.brain._exercise_state["pending"] = False
+            yield {"type": "done", "degradation": load.mode, "fallbacks": deadline.summary()}
+            return
+
+        for token in response_generator:
+            yield {"type": "token", "token": token}
+        yield {"type": "done", "degradation": load.mode, "fallbacks": deadline.summary()}
+
+    def reset(self) -> None:
+        self.brain._conversation_history = []
+        self.turn_count = 0
+        logger.info("Conversation reset")
+
+    # --- Camera ---
+
+    def camera_available(self) -> bool:
+        return CAMERA_ENABLED and self.camera is not None and self.camera.is_available()
+
+    def snapshot(self) -> tuple[Optional[bytes], Optional[str]]:
+        return self.camera.capture_snapshot_with_overlay()
+
+    def latest_jpeg(self) -> Optional[tuple[bytes, str]]:
+        encoded = self.camera.encoder.latest()
+        return (encoded.jpeg, encoded.etag) if encoded is not None else None
+
+    def stream_jpeg(self, fps: float) -> Iterator[bytes]:
+        for encoded in self.camera.encoder.stream(fps):
+            yield encoded.jpeg
+
+    def camera_overlay(self, passive: bool = False) -> dict:
+        return self.camera.overlay_data(passive=passive)
+
+    def camera_emotion(self) -> Optional[str]:
+        return self.camera.capture_emotion()
+
+    def camera_stats(self) -> Optional[dict]:
+        if not CAMERA_ENABLED or self.camera is None or not hasattr(self.camera, "stats"):
+            return None
+        return self.camera.stats()
+
+    # --- Memory and exercises ---
+
+    def memory_stats(self) -> list[dict]:
+        return [s.to_dict() for s in self.brain.memories.stats()]
+
+    def mood_trend(self, days: int, profile: Optional[str] = None) -> dict:
+        # Read the timeline file directly unless the namespace is open: never opens ChromaDB
+        memory = self.brain.memories.peek(profile)
+        if memory is not None:
+            return memory.timeline.report(days)
+        from agent.memory import collection_name_for
+        from agent.mood_timeline import MoodTimeline, timeline_path_for
+
+        return MoodTimeline(timeline_path_for(collection_name_for(profile))).report(days)
+
+    def trigger_exercise(self) -> list:
+        self.brain._exercise_state["pending"] = True
+        logger.info("Manual exercise trigger activated")
+        return self.brain.exercise_manager.get_all_exercises()
+
+    def list_exercises(self) -> list:
+        return self.brain.exercise_manager.get_all_exercises()
+
+    def skip_exercise(self) -> None:
+        self.brain._exercise_state["pending"] = False
+        self.brain._exercise_state["active"] = False
+        self.brain._exercise_state["current_exercise"] = None
+        logger.info("Exercise skipped via frontend")
+
+    def start_exercise(self, name: str) -> Optional[dict]:
+        """Activate an exercise by name; None if there is no such exercise."""
+        exercise = self.brain.exercise_manager.get_exercise_by_name(name)
+        if exercise is None:
+            return None
+        self.brain._exercise_state["pending"] = False
+        self.brain._exercise_state["active"] = True
+        self.brain._exercise_state["current_exercise"] = exercise
+        logger.info(f"Starting exercise: {exercise.name}")
+        return exercise.to_dict()
+
+    def close(self) -> None:
+        self.health.stop()
+        self.idle.stop()
+        self.brain.load.close()
+        if self.camera is not None:
+            self.camera.release()
+
+
+def warming_status() -> dict:
+    """``/api/status`` payload while the BrainService is still being built."""
+    return {
+        "status": {"llm": False, "sentiment": False, "memory": False, "camera": False},
+        "health": {},
+        "camera_enabled": CAMERA_ENABLED,
+        "ollama_url": OLLAMA_BASE_URL,
+        "model": LLM_MODEL,
+        "load": None,
+        "fallbacks": None,
+        "warming": True,
+        "warmup": None,
+        "models": None,
+        "startup": profiler.summary(),
+    }
+
+
+class _ServiceSlot:
+    """The BrainService, built in the background while connections are already accepted."""
+
+    def __init__(self, service: Optional[BrainService] = None):
+        self.service = service
+        self.error: Optional[Exception] = None
+        self.ready = threading.Event()
+        if service is not None:
+            self.ready.set()
+        else:
+            threading.Thread(target=self._build, name="brain-service-warmup", daemon=True).start()
+
+    def _build(self) -> None:
+        try:
+            self.service = BrainService()
+        except Exception as e:
+            logger.error(f"Brain service failed to start: {e}", exc_info=True)
+            self.error = e
+        self.ready.set()
+        if profiler.imports_enabled:
+            profiler.disable_imports()
+            print(profiler.report(), file=sys.stderr)
+
+    def get(self) -> BrainService:
+        self.ready.wait()
+        if self.service is None:
+            raise ServiceError(f"Brain service failed to start: {self.error}")
+        return self.service
+
+
+def _handle(slot: _ServiceSlot, conn) -> None:
+    """Serve one worker connection: requests are (op, args, kwargs) tuples, answered in order."""
+    with conn:
+        while True:
+            try:
+                op, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                if op == "status" and not slot.ready.is_set():
+                    conn.send(("ok", warming_status()))
+                    continue
+                service = slot.get()
+                if op in BrainService.STREAM_OPS:
+                    events = getattr(service, op)(*args, **kwargs)
+                    try:
+                        for item in events:
+                            conn.send(("item", item))
+                    finally:
+                        events.close()
+                    conn.send(("end", None))
+                elif op in BrainService.OPS:
+                    conn.send(("ok", getattr(service, op)(*args, **kwargs)))
+                else:
+                    conn.send(("error", f"Unknown operation '{op}'"))
+            except (BrokenPipeError, ConnectionResetError, EOFError):
+                return  # Worker went away (e.g. the browser closed a stream)
+            except Exception as e:
+                logger.error(f"Error in brain service op '{op}': {e}", exc_info=True)
+                try:
+                    conn.send(("error", str(e)))
+                except OSError:
+                    return
+
+
+def serve(address: str = BRAIN_SERVICE_SOCKET, service: Optional[BrainService] = None) -> None:
+    """Accept worker connections on the Unix socket ``address`` forever.
+
+    Listens at once; the BrainService is built in the background, and
+    until it is ready ``status`` answers "warming" while other calls wait.
+    """
+    slot = _ServiceSlot(service)
+    if os.path.exists(address):
+        os.unlink(address)
+    old_umask = os.umask(0o177)  # Socket is only reachable by this user
+    try:
+        listener = Listener(address, family="AF_UNIX")
+    finally:
+        os.umask(old_umask)
+    logger.info(f"Brain service listening on {address}")
+    try:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_handle, args=(slot, conn), name="brain-service-conn", daemon=True).start()
+    finally:
+        listener.close()
+        if slot.service is not None:
+            slot.service.close()
+
+
+class ServiceClient:
+    """``BrainService`` proxy used by HTTP workers in multi-worker mode.
+
+    Every ``BrainService`` operation is available as a method with the same
+    signature. Connections are pooled per worker process; a streaming call
+    holds its connection until the stream is exhausted or closed.
+    """
+
+    def __init__(self, address: str = BRAIN_SERVICE_SOCKET, max_idle: int = BRAIN_SERVICE_MAX_IDLE):
+        self._address = address
+        self._max_idle = max_idle
+        self._idle: list = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        try:
+            return Client(self._address, family="AF_UNIX"), False
+        except OSError as e:
+            raise ServiceError(f"Brain service unavailable at {self._address}: {e}") from e
+
+    def _release(self, conn) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, op: str, args: tuple, kwargs: dict):
+        """Send a request; retry once on a fresh connection if a pooled one was stale.
+
+        A mutating operation whose request went out but got no answer is
+        not retried: the service may already have run it, and a chat turn
+        must not be stored twice.
+        """
+        conn, pooled = self._acquire()
+        sent = False
+        try:
+            conn.send((op, args, kwargs))
+            sent = True
+            return conn, conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            if not pooled or (sent and op in BrainService.MUTATING_OPS):
+                raise ServiceError(f"Brain service at {self._address} closed the connection")
+        with self._lock:
+            stale, self._idle = self._idle, []
+        for c in stale:
+            c.close()
+        return self._send(op, args, kwargs)
+
+    def call(self, op: str, *args, **kwargs):
+        conn, (kind, value) = self._send(op, args, kwargs)
+        self._release(conn)
+        if kind == "error":
+            raise ServiceError(value)
+        return value
+
+    def stream(self, op: str, *args, **kwargs) -> Iterator:
+        conn, (kind, value) = self._send(op, args, kwargs)
+        finished = False
+        try:
+            while kind == "item":
+                yield value
+                kind, value = conn.recv()
+            finished = True
+            if kind == "error":
+                raise ServiceError(value)
+        except (EOFError, OSError) as e:
+            raise ServiceError(f"Brain service stream interrupted: {e}") from e
+        finally:
+            # An abandoned stream still has items in flight; drop its connection
+            if finished:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def __getattr__(self, name: str):
+        if name in BrainService.STREAM_OPS:
+            return partial(self.stream, name)
+        if name in BrainService.OPS:
+            return partial(self.call, name)
+        raise AttributeError(name)
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stderr)],
+    )
+    parser = argparse.ArgumentParser(description="Run the shared brain service for multi-worker web deployments.")
+    parser.add_argument("--socket", default=BRAIN_SERVICE_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--profile-startup", action="store_true", help="Print import and init times once the service is ready")
+    args = parser.parse_args()
+    if args.profile_startup:
+        profiler.enable_imports()
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
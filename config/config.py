@@ -10,33 +10,156 @@ from pathlib import Path
 # --- Project Paths ---
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
-MEMORY_DIR = DATA_DIR / "memory"
+MEMORY_DIR = Path(os.getenv("MEMORY_DIR", str(DATA_DIR / "memory")))  # ChromaDB store (benchmarks point this at a scratch directory)
+CACHE_DIR = DATA_DIR / "cache"
+MOOD_DIR = Path(os.getenv("MOOD_DIR", str(DATA_DIR / "mood")))  # Mood timelines
+MODELS_DIR = DATA_DIR / "models"
+
+# --- Memory Footprint ---
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "standard")  # "standard", or "low" for 4 GB boards sharing RAM with other services
+LOW_MEMORY = MEMORY_PROFILE == "low"
+IDLE_CHECK_INTERVAL = 30.0  # Seconds between checks for idle models
+IDLE_UNLOAD_LLM = 900.0 if LOW_MEMORY else 7200.0  # Seconds without a chat turn before Ollama unloads the model (0 = never)
+IDLE_UNLOAD_EMBEDDINGS = 300.0 if LOW_MEMORY else 3600.0  # Seconds without a memory store/search before the embedder is dropped
+IDLE_UNLOAD_VISION = 120.0 if LOW_MEMORY else 1800.0  # Seconds without emotion/overlay/snapshot requests before the emotion model is dropped
 
 # --- LLM Configuration ---
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 LLM_MODEL = os.getenv("LLM_MODEL", "phi3:mini")
 LLM_TEMPERATURE = 0.3  # Lower for more focused, faster responses
 LLM_MAX_TOKENS = 60  # Brief responses optimized for CPU
-LLM_NUM_CTX = 1024  # Optimized context window for CPU inference
+LLM_NUM_CTX = 512 if LOW_MEMORY else 1024  # Optimized context window for CPU inference (smaller KV cache when low on RAM)
 LLM_NUM_THREAD = 4  # CPU threads for Raspberry Pi
 LLM_TIMEOUT = 300  # 5 min timeout for slow CPU inference
 LLM_STOP_SEQUENCES = ["\n\n", "User:", "Assistant:"]  # Stop at natural breaks
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "-1")  # How long Ollama keeps the model loaded after a request ("30m", seconds; -1 = always)
 
 # --- Sentiment Configuration ---
 SENTIMENT_THRESHOLDS = {
     "positive": 0.05,
     "negative": -0.05,
 }
+SENTIMENT_BATCH_WORKERS = os.cpu_count() or 1  # Process pool size for analyze_many()
+SENTIMENT_BATCH_CHUNK = 2000  # Messages per worker task
+LEXICON_CACHE_PATH = CACHE_DIR / "vader_lexicon.bin"  # Precompiled VADER lexicon
+SENTIMENT_LEXICON_CACHE = True  # Memory-map the precompiled lexicon (shared across processes)
+LEXICON_MEMO_SIZE = 4096  # Hot-word memo per mapped lexicon table
+SENTIMENT_SENTENCE_MODE = os.getenv("SENTIMENT_SENTENCE_MODE", "false").lower() == "true"  # Score turns as a word-weighted mean of cached per-sentence scores (opt-in: changes compound and drops neg/neu/pos)
+SENTIMENT_SENTENCE_CACHE_SIZE = 2048  # Cached sentence scores (LRU)
 
 # --- Memory / RAG Configuration ---
 MEMORY_COLLECTION = "conversations"
 MEMORY_TOP_K = 2  # Reduced for faster retrieval on CPU
+MEMORY_DEFAULT_NAMESPACE = os.getenv("MEMORY_NAMESPACE", "default")  # Per-user/profile memory
+MEMORY_NAMESPACE_IDLE_SECONDS = 1800  # Drop namespaces unused for 30 min from the process
+MOOD_BASELINE_DAYS = 7  # Multi-day mood baseline window from the mood timeline
+MOOD_FLUSH_INTERVAL = 30.0  # Seconds between background writes of changed mood timelines (also written at exit)
 
 # --- Camera Configuration ---
 # CAMERA_ENABLED = os.getenv("CAMERA_ENABLED", "false").lower() == "true"
 CAMERA_ENABLED = True
 CAMERA_INDEX = 0  # USB webcam capture device (video1 is metadata only)
+CAMERA_SOURCE = os.getenv("CAMERA_SOURCE", "webcam")  # "webcam", a video file, an image directory, or "synthetic"
+CAMERA_REPLAY_FPS = 15  # Playback rate for non-webcam sources
+CAMERA_REPLAY_LOOP = True  # Restart replay sources when they run out
+CAMERA_SYNTHETIC_SIZE = (640, 480)  # Frame size of the synthetic source
 CAMERA_SAMPLE_INTERVAL = 3  # Capture emotion every N turns (to reduce latency)
+CAMERA_CAPTURE_THREAD = True  # Grab frames continuously in a background thread
+CAMERA_GRAB_FPS = 10  # Frames per second decoded into the latest-frame buffer
+CAMERA_FRAME_MAX_AGE = 2.0  # Seconds before a buffered frame counts as stale (camera stalled)
+CAMERA_EMOTION_WORKER = True  # Run FER continuously in the background; capture_emotion() reads its state
+CAMERA_EMOTION_FPS = 1.0  # Background emotion inferences per second
+CAMERA_EMOTION_HALF_LIFE = 3.0  # Seconds for an observation's weight in the smoothed emotion to halve
+CAMERA_EMOTION_MIN_WEIGHT = 0.5  # Below this decayed weight the smoothed emotion is considered stale
+CAMERA_DETECTION_TTL = 1.0  # Seconds a detection result is shared by snapshot, emotion and chat consumers
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "fer")  # "fer" (Keras/TensorFlow) or "onnx" (no TensorFlow)
+EMOTION_ONNX_MODEL = MODELS_DIR / "emotion-ferplus-12-int8.onnx"  # int8-quantized FER+ from the ONNX model zoo
+EMOTION_ONNX_LABELS = {  # Model output order -> FER label
+    "neutral": "neutral",
+    "happiness": "happy",
+    "surprise": "surprise",
+    "sadness": "sad",
+    "anger": "angry",
+    "disgust": "disgust",
+    "fear": "fear",
+    "contempt": "disgust",
+}
+CAMERA_PRIMARY_FACE = "largest"  # Which face drives the user's emotion: "largest", "central" or "first"
+CAMERA_FACE_TRACKING = True  # Detect faces occasionally, track boxes in between, classify only face crops
+CAMERA_TRACK_SCALE = 0.5  # Downscale factor of the grayscale frame used for template tracking
+CAMERA_TRACK_MIN_SCORE = 0.6  # Template-match score below which a track counts as lost (re-detect)
+CAMERA_REDETECT_EVERY = 15  # Force a full-frame face detection after this many tracked frames
+CAMERA_MOTION_GATE = True  # Reuse the last detection while the scene is static
+CAMERA_MOTION_THRESHOLD = 4.0  # Mean gray-level change (0-255) on a 64x48 thumbnail that counts as motion
+CAMERA_MOTION_MAX_REUSE = 10.0  # Seconds a static-scene result may be reused before a forced refresh
+CAMERA_ABSENT_BACKOFF_MIN = 1.0  # Seconds between inferences right after no face was found
+CAMERA_ABSENT_BACKOFF_MAX = 16.0  # Backoff doubles per empty inference up to this many seconds
+CAMERA_PROCESS_WORKER = os.getenv("CAMERA_PROCESS_WORKER", "false").lower() == "true"  # Opt-in: run capture + inference in a separate process (shared-memory frames)
+VISION_RING_SLOTS = 4  # Frames kept in the shared-memory ring
+VISION_RING_SLOT_BYTES = 1280 * 720 * 3  # Max bytes per frame; larger frames are downscaled to fit
+VISION_WORKER_RESTART_DELAY = 5.0  # Min seconds between restarts of a crashed vision worker
+VISION_WORKER_START_TIMEOUT = 60.0  # Seconds to wait for the worker to open the camera and load the model
+CAMERA_STREAM_FPS = 5  # Max frames per second sent to each MJPEG viewer
+CAMERA_JPEG_QUALITY = 80  # JPEG quality for stream/snapshot frames (encoded once per frame)
+
+# --- Startup ---
+STARTUP_BACKGROUND_WARMUP = os.getenv("STARTUP_BACKGROUND_WARMUP", "true").lower() == "true"  # Web: build the brain in the background; serve the UI and a "warming" status meanwhile
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "false" if LOW_MEMORY else "true").lower() == "true"  # Pre-load the LLM, embedder and emotion model in parallel at start
+
+# --- Health Monitoring ---
+HEALTH_LLM_INTERVAL = 30.0  # Seconds between Ollama probes while it is healthy
+HEALTH_LLM_TIMEOUT = 2.0  # Timeout of one Ollama /api/tags probe
+HEALTH_PROBE_INTERVAL = 10.0  # Seconds between probes of local subsystems (camera, memory) while healthy
+HEALTH_RETRY_MIN = 2.0  # Seconds before re-probing a subsystem that just failed
+HEALTH_RETRY_MAX = 60.0  # Retry delay doubles per consecutive failure up to this
+
+# --- Load-aware Degradation ---
+DEGRADE_ENABLED = os.getenv("DEGRADE_ENABLED", "true").lower() == "true"  # Shed optional work when the device is saturated
+DEGRADE_TARGET_LATENCY = 10.0  # Seconds from request to first reply output the device should stay under
+DEGRADE_MAX_INFLIGHT = 2  # Concurrent chat turns tolerated before degrading (Ollama generates one at a time)
+DEGRADE_WINDOW = 6  # Recent turns whose latency drives the controller
+DEGRADE_MIN_SAMPLES = 2  # Turns needed before latency counts (one cold model load alone does not degrade)
+DEGRADE_SAMPLE_MAX_AGE = 120.0  # Seconds after which a turn's latency no longer counts
+DEGRADE_RAISE_AT = 1.0  # Step up a level when load pressure (latency / target, in-flight / max) exceeds this
+DEGRADE_RECOVER_AT = 0.6  # Step back down only once pressure falls below this
+DEGRADE_RAISE_DWELL = 5.0  # Min seconds between two step-ups
+DEGRADE_RECOVER_DWELL = 30.0  # Min seconds at a level before stepping down
+DEGRADE_MAX_TOKENS = 30  # num_predict while replies are shortened
+DEGRADE_MODEL = os.getenv("DEGRADE_MODEL", "")  # Smaller Ollama model for shortened replies ("" keeps LLM_MODEL)
+DEGRADE_WRITE_QUEUE = 256  # Deferred memory writes buffered; beyond this writes are synchronous again
+
+# --- Turn Deadlines ---
+TURN_DEADLINE = 90.0  # Seconds from request to first reply output; every stage budget is capped by what is left
+TURN_BUDGETS = {  # Seconds per stage; an overrunning or failing stage falls back
+    "vision": 1.0,  # Face emotion capture → continue without face emotion
+    "sentiment": 1.0,  # Text sentiment → neutral
+    "retrieval": 3.0,  # Memory retrieval (RAG) → no memories
+    "first_token": 60.0,  # First LLM token → TURN_FALLBACK_REPLY
+}
+TURN_TOKEN_STALL = 30.0  # Seconds without a new token before a started reply is cut short
+TURN_FALLBACK_REPLY = "I'm taking a little longer than usual to think right now, but I'm here with you. Could you tell me a bit more?"
+TURN_FALLBACK_LOG = 50  # Recent fallbacks kept for /api/status
+
+# --- Turn Profiling ---
+PROFILE_TURNS = os.getenv("PROFILE_TURNS", "false").lower() == "true"  # Sample-profile every chat turn (else only turns that ask for it)
+PROFILE_ALLOW_HEADER = os.getenv("PROFILE_ALLOW_HEADER", "false").lower() == "true"  # Honour the X-Profile-Turn request header (any client could otherwise trigger profiling)
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "collapsed")  # "collapsed" (flamegraph.pl / speedscope) or "speedscope" (JSON)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(DATA_DIR / "profiles")))  # Where turn profiles are written
+PROFILE_KEEP = 50  # Newest profiles kept; older ones are deleted
+PROFILE_INTERVAL = 0.01  # Seconds between stack samples
+PROFILE_MAX_SECONDS = 300.0  # Sampling stops after this long even if the turn has not finished
+
+# --- Multi-worker Deployment ---
+BRAIN_SERVICE = os.getenv("BRAIN_SERVICE", "local")  # "local" (brain inside the web process) or "socket" (shared brain_service.py)
+BRAIN_SERVICE_SOCKET = os.getenv("BRAIN_SERVICE_SOCKET", str(DATA_DIR / "brain.sock"))  # Unix socket of the brain service
+BRAIN_SERVICE_MAX_IDLE = 8  # Idle service connections pooled per web worker
+
+# --- Live WebSocket Channel ---
+WS_PUSH_INTERVAL = 0.25  # Seconds between camera-change checks per WebSocket client
+WS_STATUS_INTERVAL = 2.0  # Seconds between status-change checks per WebSocket client
+WS_SEND_QUEUE = 256  # Ordered events (tokens) buffered per client before the chat turn waits
+WS_SEND_TIMEOUT = 30.0  # Seconds a stalled client may hold up its chat turn before it is dropped
+WS_PING_INTERVAL = 25  # Seconds between WebSocket keep-alive pings
 
 # --- Display Configuration ---
 DISPLAY_MODE = os.getenv("DISPLAY_MODE", "terminal")  # "terminal" or "eink"
@@ -0,0 +1,148 @@
+"""
+Fake Ollama server for benchmarks and load tests.
+Implements the parts of Ollama's REST API the app uses (/api/tags,
+/api/chat, /api/generate) and streams canned tokens at a fixed rate, with
+a configurable number of parallel generation slots like OLLAMA_NUM_PARALLEL.
+A request with no prompt / messages only loads the model (or unloads it
+with ``keep_alive: 0``), as in Ollama; ``--load`` makes the first request
+after start or unload pay a simulated cold model load.
+
+Usage: python fake_ollama.py [--port 11435] [--tps 8] [--tokens 40] [--ttft 0.5] [--parallel 1] [--load 0]
+Then run the app with OLLAMA_BASE_URL=http://127.0.0.1:11435
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.config import LLM_MODEL
+
+REPLY = (
+    "That sounds like a lot to carry right now. I'm here with you, and it's okay to take "
+    "things one small step at a time. Would it help to talk about what feels heaviest today?"
+).split(" ")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # Clients hang up mid-stream; that's fine
+            super().handle_error(request, client_address)
+
+
+class FakeOllama:
+    """A fake Ollama server running in a background thread."""
+
+    def __init__(self, port: int = 0, tps: float = 8.0, tokens: int = 40, ttft: float = 0.5, parallel: int = 1, load: float = 0.0):
+        self.tps = tps
+        self.tokens = tokens
+        self.ttft = ttft  # Seconds of simulated prompt evaluation before the first token
+        self.load = load  # Seconds the first request spends loading the model
+        self._slots = threading.Semaphore(parallel)
+        self._load_lock = threading.Lock()
+        self.loaded = False
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, body: dict) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._json({"models": [{"name": LLM_MODEL}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self.send_error(404)
+                    return
+                fake.requests += 1
+                if body.get("keep_alive") == 0 and not body.get("prompt") and not body.get("messages"):
+                    fake.loaded = False
+                    self._json({"model": body.get("model"), "done": True, "done_reason": "unload"})
+                    return
+                load_duration = fake._ensure_loaded()
+                if not body.get("prompt") and not body.get("messages"):  # Load-only request (preload)
+                    self._json({"model": body.get("model"), "done": True, "done_reason": "load", "load_duration": int(load_duration * 1e9)})
+                    return
+                limit = min(fake.tokens, body.get("options", {}).get("num_predict", fake.tokens))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                with fake._slots:  # Generation is serialized like a single-slot Ollama
+                    time.sleep(fake.ttft)
+                    for i in range(max(0, limit)):
+                        token = REPLY[i % len(REPLY)] + " "
+                        chunk = {"message": {"role": "assistant", "content": token}} if self.path == "/api/chat" else {"response": token}
+                        self._chunk({**chunk, "done": False})
+                        time.sleep(1.0 / fake.tps if fake.tps > 0 else 0)
+                    self._chunk({"done": True})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, body: dict) -> None:
+                data = json.dumps(body).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        self._server = _Server(("127.0.0.1", port), Handler)
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+
+    def _ensure_loaded(self) -> float:
+        """Simulate the cold model load once; returns the seconds this call spent on it."""
+        with self._load_lock:
+            if self.loaded:
+                return 0.0
+            time.sleep(self.load)
+            self.loaded = True
+            return self.load
+
+    def start(self) -> "FakeOllama":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tps", type=float, default=8.0, help="Tokens per second per generation")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens per reply (capped by num_predict)")
+    parser.add_argument("--ttft", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--parallel", type=int, default=1, help="Concurrent generations")
+    parser.add_argument("--load", type=float, default=0.0, help="Seconds of simulated model load (first request, and after an unload)")
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.port, args.tps, args.tokens, args.ttft, args.parallel, args.load).start()
+    print(f"Fake Ollama serving {LLM_MODEL} at {fake.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,512 @@ Laptop webcam implementation for development.
 Replace with Raspberry Pi camera module for deployment — only this file changes.
 """
 
+import gc
 import logging
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
-
-from config.config import CAMERA_ENABLED, CAMERA_INDEX
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from config.config import (
+    CAMERA_ENABLED,
+    CAMERA_INDEX,
+    CAMERA_SOURCE,
+    CAMERA_CAPTURE_THREAD,
+    CAMERA_GRAB_FPS,
+    CAMERA_FRAME_MAX_AGE,
+    CAMERA_EMOTION_WORKER,
+    CAMERA_EMOTION_FPS,
+    CAMERA_EMOTION_HALF_LIFE,
+    CAMERA_EMOTION_MIN_WEIGHT,
+    CAMERA_DETECTION_TTL,
+    CAMERA_FACE_TRACKING,
+    CAMERA_PRIMARY_FACE,
+    CAMERA_MOTION_GATE,
+    CAMERA_MOTION_THRESHOLD,
+    CAMERA_MOTION_MAX_REUSE,
+    CAMERA_ABSENT_BACKOFF_MIN,
+    CAMERA_ABSENT_BACKOFF_MAX,
+    CAMERA_STREAM_FPS,
+    CAMERA_JPEG_QUALITY,
+    CAMERA_PROCESS_WORKER,
+)
+from interface.emotion_backends import FER_LABELS, create_emotion_backend
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CapturedFrame:
+    """A camera frame with its capture sequence number and timestamp."""
+
+    frame: "numpy.ndarray"  # BGR, treat as read-only (copy before drawing on it)
+    seq: int
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the frame was captured."""
+        return time.time() - self.timestamp
+
+
+@dataclass
+class EncodedFrame:
+    """A JPEG-encoded frame shared by every viewer."""
+
+    jpeg: bytes
+    seq: int
+    timestamp: float
+    etag: str
+
+
+class FrameEncoder:
+    """Encodes each camera frame to JPEG at most once and shares the bytes.
+
+    The MJPEG stream, the raw snapshot endpoint and any number of viewers
+    all get the same ``EncodedFrame`` for a given frame sequence number.
+    """
+
+    def __init__(self, camera: "BaseCamera", quality: int = CAMERA_JPEG_QUALITY):
+        self._camera = camera
+        self._quality = quality
+        self._epoch = format(int(time.time()), "x")  # Keeps ETags unique across restarts
+        self._lock = threading.Lock()
+        self._last: Optional[EncodedFrame] = None
+        self.encodes = 0
+        self.reuses = 0
+
+    def latest(self) -> Optional[EncodedFrame]:
+        """JPEG of the freshest frame, encoding it only if no viewer has yet."""
+        captured = self._camera.latest_frame()
+        if captured is None:
+            return None
+        with self._lock:
+            if self._last is not None and self._last.seq == captured.seq:
+                self.reuses += 1
+                return self._last
+            import cv2
+
+            ok, buffer = cv2.imencode(
+                ".jpg", captured.frame, [cv2.IMWRITE_JPEG_QUALITY, self._quality]
+            )
+            if not ok:
+                return None
+            self._last = EncodedFrame(
+                buffer.tobytes(),
+                captured.seq,
+                captured.timestamp,
+                f'"{self._epoch}-{captured.seq}"',
+            )
+            self.encodes += 1
+            return self._last
+
+    def stream(self, fps: float = CAMERA_STREAM_FPS, max_stall: float = CAMERA_FRAME_MAX_AGE) -> Iterator[EncodedFrame]:
+        """Yield each new frame (at most ``fps`` per second) for one viewer.
+
+        Ends once no new frame has arrived for ``max_stall`` seconds (camera
+        stalled or released): the generator only notices a disconnected
+        viewer when it yields, so it must not wait for frames forever.
+        """
+        interval = 1.0 / fps if fps > 0 else 0.2
+        last_seq = None
+        last_new = time.time()
+        while True:
+            started = time.time()
+            encoded = self.latest()
+            if encoded is not None and encoded.seq != last_seq:
+                last_seq, last_new = encoded.seq, started
+                yield encoded
+            elif started - last_new > max_stall:
+                logger.info("No new camera frame for %.1f s; ending MJPEG stream.", started - last_new)
+                return
+            time.sleep(max(0.0, interval - (time.time() - started)))
+
+
+class FrameGrabber:
+    """Background thread that keeps the freshest camera frame in a single slot.
+
+    The thread drains the driver's buffer with ``grab()`` and decodes
+    (``retrieve()``) at most ``fps`` frames per second into a lock-protected
+    slot, so readers always get a recent frame without touching the device.
+    """
+
+    def __init__(self, cap, fps: float = CAMERA_GRAB_FPS):
+        self._cap = cap
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._first_frame = threading.Event()
+        self._stop = threading.Event()
+        self._latest: Optional[CapturedFrame] = None
+        self._seq = 0
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self._thread = threading.Thread(target=self._run, name="camera-grabber", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        last_decode = 0.0
+        while not self._stop.is_set():
+            try:
+                if not self._cap.grab():
+                    time.sleep(0.05)
+                    continue
+                self.frames_grabbed += 1
+                now = time.time()
+                if now - last_decode < self._interval:
+                    continue
+                ok, frame = self._cap.retrieve()
+                if not ok or frame is None:
+                    continue
+                last_decode = now
+                with self._lock:
+                    self._seq += 1
+                    self._latest = CapturedFrame(frame, self._seq, now)
+                self.frames_decoded += 1
+                self._first_frame.set()
+            except Exception as e:
+                logger.error("Frame grabber error: %s", e)
+                time.sleep(0.5)
+
+    def latest(self, wait_first: float = 1.0) -> Optional[CapturedFrame]:
+        """Return the freshest frame without blocking (except for the very first one)."""
+        if not self._first_frame.is_set():
+            self._first_frame.wait(wait_first)
+        with self._lock:
+            return self._latest
+
+
+EMOTION_CONFIDENCE_THRESHOLD = 0.3  # Dominant emotions below this are discarded
+
+
+def draw_face_box(frame, face: dict, color: tuple[int, int, int] = (0, 255, 0)) -> str:
+    """Draw a face's box and dominant-emotion label onto ``frame``; return the label."""
+    import cv2
+
+    emotions = face["emotions"]
+    emotion = max(emotions, key=emotions.get)
+    confidence = emotions[emotion]
+    x, y, w, h = (int(v) for v in face["box"])
+    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+    text = f"{emotion}: {confidence:.2f}"
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    text_size = cv2.getTextSize(text, font, 0.6, 2)[0]
+    cv2.rectangle(frame, (x, y - 30), (x + text_size[0] + 10, y), color, -1)
+    cv2.putText(frame, text, (x + 5, y - 10), font, 0.6, (0, 0, 0), 2)
+    return emotion
+
+
+def draw_faces(frame, faces: list[dict]) -> Optional[str]:
+    """Draw every face (primary in green, others in amber); return the primary label."""
+    for face in faces[1:]:
+        draw_face_box(frame, face, color=(0, 191, 255))
+    return draw_face_box(frame, faces[0]) if faces else None
+
+
+def order_faces(faces: list[dict], frame_shape: tuple, policy: str = CAMERA_PRIMARY_FACE) -> list[dict]:
+    """Return ``faces`` with the primary face first.
+
+    ``policy``: "largest" (biggest box), "central" (box centre closest to
+    the frame centre) or "first" (detector order).
+    """
+    if len(faces) < 2 or policy == "first":
+        return faces
+    if policy == "central":
+        cy, cx = frame_shape[0] / 2, frame_shape[1] / 2
+
+        def key(face):
+            x, y, w, h = face["box"]
+            return (x + w / 2 - cx) ** 2 + (y + h / 2 - cy) ** 2
+    else:
+        def key(face):
+            _, _, w, h = face["box"]
+            return -(w * h)
+    primary = min(range(len(faces)), key=lambda i: key(faces[i]))
+    return [faces[primary]] + faces[:primary] + faces[primary + 1:]
+
+
+class EmotionSmoother:
+    """Time-decayed average of FER probability vectors.
+
+    Each observation's weight halves every ``half_life`` seconds, so the
+    label follows real changes within a few samples while single noisy
+    frames cannot flip it.
+    """
+
+    def __init__(
+        self,
+        half_life: float = CAMERA_EMOTION_HALF_LIFE,
+        min_weight: float = CAMERA_EMOTION_MIN_WEIGHT,
+    ):
+        import numpy as np
+
+        self._np = np
+        self._half_life = half_life
+        self._min_weight = min_weight
+        self._sum = np.zeros(len(FER_LABELS), dtype=np.float64)
+        self._weight = 0.0
+        self._updated = 0.0
+        self._lock = threading.Lock()
+        self.observations = 0
+
+    def _decay(self, now: float) -> float:
+        return 0.5 ** (max(0.0, now - self._updated) / self._half_life)
+
+    def update(self, emotions: dict[str, float], timestamp: Optional[float] = None) -> None:
+        """Fold one face's emotion scores into the running average."""
+        now = timestamp if timestamp is not None else time.time()
+        vector = self._np.fromiter(
+            (emotions.get(label, 0.0) for label in FER_LABELS),
+            dtype=self._np.float64,
+            count=len(FER_LABELS),
+        )
+        with self._lock:
+            decay = self._decay(now) if self._weight else 0.0
+            self._sum = self._sum * decay + vector
+            self._weight = self._weight * decay + 1.0
+            self._updated = now
+            self.observations += 1
+
+    def current(self) -> Optional[dict[str, float]]:
+        """Smoothed probabilities, or None if there is no recent observation."""
+        with self._lock:
+            if self._weight * self._decay(time.time()) < self._min_weight:
+                return None
+            probs = self._sum / self._weight
+        return {label: round(float(p), 3) for label, p in zip(FER_LABELS, probs)}
+
+    def dominant(self) -> tuple[Optional[str], float]:
+        """(label, probability) of the smoothed distribution, or (None, 0.0)."""
+        probs = self.current()
+        if probs is None:
+            return None, 0.0
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+
+@dataclass
+class CachedDetection:
+    """Detection result for one frame."""
+
+    seq: int
+    frame_timestamp: float
+    faces: list[dict]
+
+
+class DetectionCache:
+    """Shares one detection per frame window between concurrent consumers.
+
+    A cached result is reused for the same frame sequence number, or for a
+    newer frame while the cached frame is younger than ``ttl`` seconds.
+    While one caller runs the detector, others wait for its result instead
+    of starting a second inference.
+    """
+
+    def __init__(self, ttl: float = CAMERA_DETECTION_TTL):
+        self._ttl = ttl
+        self._entry: Optional[CachedDetection] = None
+        self._inflight: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def _fresh(self, captured: CapturedFrame) -> Optional[list[dict]]:
+        entry = self._entry
+        if entry is None:
+            return None
+        if entry.seq == captured.seq or time.time() - entry.frame_timestamp < self._ttl:
+            return entry.faces
+        return None
+
+    def get_or_detect(self, captured: CapturedFrame, detect) -> list[dict]:
+        """Return a shared result for ``captured`` or run ``detect(captured)``."""
+        with self._lock:
+            faces = self._fresh(captured)
+            if faces is not None:
+                self.hits += 1
+                return faces
+            inflight = self._inflight
+            if inflight is None:
+                self._inflight = threading.Event()
+
+        if inflight is not None:
+            inflight.wait(10.0)
+            with self._lock:
+                self.waits += 1
+                faces = self._fresh(captured)
+                if faces is not None:
+                    self.hits += 1
+                    return faces
+            return self.get_or_detect(captured, detect)
+
+        try:
+            faces = detect(captured)
+            with self._lock:
+                self.misses += 1
+                self._entry = CachedDetection(captured.seq, captured.timestamp, faces)
+            return faces
+        finally:
+            with self._lock:
+                self._inflight.set()
+                self._inflight = None
+
+    @property
+    def latest(self) -> Optional[CachedDetection]:
+        """Most recent detection result, if any."""
+        return self._entry
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "ttl": self._ttl,
+        }
+
+
+class MotionGate:
+    """Skips emotion inference when it would see (almost) the same frame.
+
+    Frames are compared as 64x48 grayscale thumbnails against the frame of
+    the last inference; motion is the larger of the whole-frame mean change
+    and the mean change inside any previously found face box, so small
+    expression changes are not averaged away. A static scene reuses the
+    last result for up to ``max_reuse`` seconds. When no face was found,
+    inference backs off exponentially (``backoff_min`` doubling up to
+    ``backoff_max``) unless motion is seen.
+    """
+
+    SIZE = (64, 48)
+
+    def __init__(
+        self,
+        threshold: float = CAMERA_MOTION_THRESHOLD,
+        max_reuse: float = CAMERA_MOTION_MAX_REUSE,
+        backoff_min: float = CAMERA_ABSENT_BACKOFF_MIN,
+        backoff_max: float = CAMERA_ABSENT_BACKOFF_MAX,
+    ):
+        self._threshold = threshold
+        self._max_reuse = max_reuse
+        self._backoff_min = backoff_min
+        self._backoff_max = backoff_max
+        self._reference = None
+        self._scale = (1.0, 1.0)
+        self._faces: Optional[list[dict]] = None
+        self._inferred_at = 0.0
+        self._backoff = 0.0
+        self.inferences = 0
+        self.skipped_static = 0
+        self.skipped_absent = 0
+
+    def _thumbnail(self, frame):
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        self._scale = (self.SIZE[0] / frame.shape[1], self.SIZE[1] / frame.shape[0])
+        return cv2.resize(gray, self.SIZE, interpolation=cv2.INTER_AREA)
+
+    def _motion(self, thumb) -> float:
+        import cv2
+
+        diff = cv2.absdiff(thumb, self._reference)
+        motion = float(diff.mean())
+        sx, sy = self._scale
+        for face in self._faces or []:
+            x, y, w, h = face["box"]
+            region = diff[int(y * sy):int((y + h) * sy) + 1, int(x * sx):int((x + w) * sx) + 1]
+            if region.size:
+                motion = max(motion, float(region.mean()))
+        return motion
+
+    def check(self, frame, now: Optional[float] = None) -> tuple[Optional[list[dict]], object]:
+        """(reusable faces or None, thumbnail to pass to ``record``) for ``frame``."""
+        now = now if now is not None else time.time()
+        thumb = self._thumbnail(frame)
+        if self._reference is None or self._faces is None:
+            return None, thumb
+        moved = self._motion(thumb) >= self._threshold
+        if self._faces:
+            if not moved and now - self._inferred_at < self._max_reuse:
+                self.skipped_static += 1
+                return self._faces, thumb
+        elif not moved and now - self._inferred_at < self._backoff:
+            self.skipped_absent += 1
+            return self._faces, thumb
+        return None, thumb
+
+    def record(self, thumb, faces: list[dict], now: Optional[float] = None) -> None:
+        """Remember an inference result and the frame it was computed on."""
+        self.inferences += 1
+        self._reference = thumb
+        self._faces = faces
+        self._inferred_at = now if now is not None else time.time()
+        if faces:
+            self._backoff = 0.0
+        else:
+            self._backoff = min(self._backoff_max, max(self._backoff_min, self._backoff * 2))
+
+    def stats(self) -> dict:
+        """Inference and skip counters for monitoring."""
+        checks = self.inferences + self.skipped_static + self.skipped_absent
+        return {
+            "inferences": self.inferences,
+            "skipped_static": self.skipped_static,
+            "skipped_absent": self.skipped_absent,
+            "skip_rate": round((checks - self.inferences) / checks, 3) if checks else 0.0,
+            "absent_backoff": self._backoff,
+        }
+
+
+class EmotionWorker:
+    """Background thread that samples frames and feeds an EmotionSmoother."""
+
+    def __init__(self, camera: "WebcamCamera", fps: float = CAMERA_EMOTION_FPS, smoother: Optional[EmotionSmoother] = None):
+        self._camera = camera
+        self._interval = 1.0 / fps if fps > 0 else 1.0
+        self.smoother = smoother or EmotionSmoother()
+        self._stop = threading.Event()
+        self._last_seq = -1
+        self.inferences = 0
+        self.faces_seen = 0
+        self._thread = threading.Thread(target=self._run, name="emotion-worker", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                captured = self._camera.latest_frame()
+                if captured is None or captured.seq == self._last_seq:
+                    continue
+                self._last_seq = captured.seq
+                faces = self._camera._detect(captured)
+                self.inferences += 1
+                if faces:
+                    self.faces_seen += 1
+                    self.smoother.update(faces[0]["emotions"], captured.timestamp)
+            except Exception as e:
+                logger.error("Emotion worker error: %s", e)
+
+
 class BaseCamera(ABC):
     """Abstract camera interface."""
 
@@ -31,25 +528,104 @@ class BaseCamera(ABC):
     @abstractmethod
     def capture_snapshot_with_overlay(self) -> tuple[Optional[bytes], Optional[str]]: ...
 
+    def latest_frame(self) -> Optional[CapturedFrame]:
+        """Freshest frame with sequence number and timestamp (default: capture one now)."""
+        frame = self.capture_frame()
+        if frame is None:
+            return None
+        self._frame_seq = getattr(self, "_frame_seq", 0) + 1
+        return CapturedFrame(frame, self._frame_seq, time.time())
+
+    def warm_up(self) -> bool:
+        """Load and exercise the emotion model once; False if there is none."""
+        return False
+
+    model_last_used = 0.0  # Unix time of the last request that needed the emotion model
+
+    @property
+    def model_loaded(self) -> bool:
+        return False
+
+    def unload_model(self) -> bool:
+        """Free the emotion model's memory until it is needed again; False if nothing was loaded."""
+        return False
+
+    @property
+    def encoder(self) -> FrameEncoder:
+        """Shared JPEG encoder for streaming and snapshot endpoints."""
+        if getattr(self, "_encoder", None) is None:
+            self._encoder = FrameEncoder(self)
+        return self._encoder
+
+    def overlay_data(self, passive: bool = False) -> dict:
+        """Face boxes and emotion for the latest frame, without image data.
+
+        ``passive`` polls (server-side change checks) do not count as use
+        of the emotion model, so they neither reload it nor keep it loaded.
+        """
+        captured = self.latest_frame()
+        return {
+            "seq": captured.seq if captured else None,
+            "width": captured.frame.shape[1] if captured else None,
+            "height": captured.frame.shape[0] if captured else None,
+            "emotion": None,
+            "confidence": None,
+            "faces": [],
+        }
 
-class WebcamCamera(BaseCamera):
-    """Laptop webcam implementation with FER emotion detection."""
 
-    def __init__(self):
+class WebcamCamera(BaseCamera):
+    """Laptop webcam implementation with pluggable emotion recognition."""
+
+    def __init__(
+        self,
+        capture_thread: bool = CAMERA_CAPTURE_THREAD,
+        emotion_worker: bool = CAMERA_EMOTION_WORKER,
+        face_tracking: bool = CAMERA_FACE_TRACKING,
+        motion_gate: bool = CAMERA_MOTION_GATE,
+        emotion_model: bool = True,
+    ):
         self._cap = None
         self._detector = None
+        self._tracker = None
+        self._motion_gate = MotionGate() if motion_gate else None
         self._initialized = False
+        self._grabber: Optional[FrameGrabber] = None
+        self._emotion_worker: Optional[EmotionWorker] = None
+        self._detection_cache = DetectionCache()
+        self._detector_lock = threading.Lock()  # Detections are single-flight already; this keeps warm_up() out of their way
+        self._read_lock = threading.Lock()  # Serializes on-demand reads when no grabber runs
+        self._read_seq = 0
+        self._face_tracking = face_tracking
+        self._run_emotion_worker = emotion_worker
+        self._model_lock = threading.Lock()  # One load / unload of the emotion model at a time
+        self._model_loading = False
+        self._model_unloaded = not emotion_model  # Reload on demand only what was unloaded (not a missing backend)
+        self.model_last_used = time.time()  # Last request that needed the emotion model
         
         if CAMERA_ENABLED:
             self._initialize()
+            if self._initialized and capture_thread:
+                import cv2
+
+                self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep the driver queue short
+                self._grabber = FrameGrabber(self._cap)
+                self._grabber.start()
+                logger.info("Background frame capture started (%d fps).", CAMERA_GRAB_FPS)
+            if emotion_model:
+                self.load_model()
+
+    def _open_capture(self):
+        """Open the capture device (replay cameras override this)."""
+        import cv2
+
+        logger.info(f"Attempting to open camera at index {CAMERA_INDEX}")
+        return cv2.VideoCapture(CAMERA_INDEX)
 
     def _initialize(self) -> None:
-        """Lazy initialization of camera and FER detector."""
+        """Lazy initialization of camera and emotion backend."""
         try:
-            import cv2
-
-            logger.info(f"Attempting to open camera at index {CAMERA_INDEX}")
-            self._cap = cv2.VideoCapture(CAMERA_INDEX)
+            self._cap = self._open_capture()
             if not self._cap.isOpened():
                 logger.warning(f"Failed to open webcam at index {CAMERA_INDEX}.")
                 self._cap = None
@@ -58,18 +634,6 @@ class WebcamCamera(BaseCamera):
             # Camera initialized successfully
             self._initialized = True
             logger.info(f"Webcam initialized on camera index {CAMERA_INDEX}.")
-            
-            # Try to initialize FER (optional)
-            try:
-                from fer import FER
-                self._detector = FER(mtcnn=False)
-                logger.info("FER emotion detection enabled.")
-            except ImportError as e:
-                logger.warning("FER not available (missing dependency): %s. Camera will work without emotion detection.", e)
-                self._detector = None
-            except Exception as e:
-                logger.warning("FER initialization failed: %s. Camera will work without emotion detection.", e)
-                self._detector = None
                 
         except ImportError as e:
             logger.error("OpenCV not available: %s", e)
@@ -82,22 +646,115 @@ class WebcamCamera(BaseCamera):
             self._detector = None
             self._initialized = False
 
+    def load_model(self) -> bool:
+        """Load the emotion backend (with face tracker and background worker); True if it is loaded.
+
+        Emotion recognition is optional: the camera works without it.
+        """
+        with self._model_lock:
+            if self._detector is None and self._initialized:
+                detector = create_emotion_backend()
+                if detector is not None:
+                    tracker = None
+                    if self._face_tracking:
+                        from interface.face_tracking import FaceTracker
+
+                        tracker = FaceTracker()
+                    with self._detector_lock:
+                        self._detector, self._tracker = detector, tracker
+                    if self._run_emotion_worker:
+                        self._emotion_worker = EmotionWorker(self)
+                        self._emotion_worker.start()
+                        logger.info("Background emotion inference started (%.1f/s).", CAMERA_EMOTION_FPS)
+            self._model_loading = False
+            self._model_unloaded = False
+            return self._detector is not None
+
+    def unload_model(self) -> bool:
+        """Drop the emotion backend to free its memory; the next request that needs it reloads it."""
+        with self._model_lock:
+            if self._detector is None:
+                return False
+            if self._emotion_worker is not None:
+                self._emotion_worker.stop()
+                self._emotion_worker = None
+            with self._detector_lock:
+                self._detector = self._tracker = None
+            self._model_unloaded = True
+            if "tensorflow" in sys.modules:  # Keras keeps graph state until the session is cleared
+                try:
+                    sys.modules["tensorflow"].keras.backend.clear_session()
+                except Exception as e:
+                    logger.debug("Keras session not cleared: %s", e)
+            gc.collect()
+        logger.info("Emotion model unloaded.")
+        return True
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._detector is not None
+
+    def _want_model(self) -> None:
+        """Note a request that needs the emotion model; reload it in the background if it was unloaded."""
+        self.model_last_used = time.time()
+        if self._model_unloaded and self._initialized and not self._model_loading:
+            with self._model_lock:
+                if not self._model_unloaded or self._model_loading:
+                    return
+                self._model_loading = True
+            threading.Thread(target=self.load_model, name="emotion-model-load", daemon=True).start()
+
+    def _detect(self, captured: CapturedFrame) -> list[dict]:
+        """FER-style result ({box, emotions} per face) for a frame, shared via the detection cache."""
+        return self._detection_cache.get_or_detect(captured, self._run_detector)
+
+    def _run_detector(self, captured: CapturedFrame) -> list[dict]:
+        # Runs only inside the detection cache's single flight, so the
+        # tracker is never updated concurrently.
+        thumb = None
+        if self._motion_gate is not None:
+            faces, thumb = self._motion_gate.check(captured.frame)
+            if faces is not None:
+                return faces
+
+        with self._detector_lock:
+            if self._detector is None:  # Unloaded since the caller checked
+                return []
+            if self._tracker is None:
+                faces = self._detector.detect(captured.frame)
+            else:
+                boxes = self._tracker.update(captured.frame, self._detector.find_faces)
+                faces = self._detector.classify(captured.frame, boxes)
+        faces = order_faces(faces, captured.frame.shape)
+
+        if self._motion_gate is not None:
+            self._motion_gate.record(thumb, faces)
+        return faces
+
     def capture_emotion(self) -> Optional[str]:
-        """Capture frame and detect dominant emotion. Returns emotion label or None."""
+        """Return the dominant emotion label or None.
+
+        With the background emotion worker this returns its smoothed state
+        immediately; otherwise the emotion backend runs on the freshest frame now.
+        """
+        self._want_model()
         if not CAMERA_ENABLED or not self._initialized or self._detector is None:
             return None
 
-        try:
-            import cv2
+        if self._emotion_worker is not None:
+            emotion, confidence = self._emotion_worker.smoother.dominant()
+            if emotion is None or confidence < EMOTION_CONFIDENCE_THRESHOLD:
+                return None
+            logger.info("Smoothed emotion: %s (%.2f)", emotion, confidence)
+            return emotion
 
-            ret, frame = self._cap.read()
-            if not ret or frame is None:
+        try:
+            captured = self.latest_frame()
+            if captured is None:
                 logger.warning("Failed to capture frame from webcam.")
                 return None
 
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            result = self._detector.detect_emotions(rgb_frame)
+            result = self._detect(captured)
             
             if not result or len(result) == 0:
                 logger.warning("No face detected in frame. Make sure your face is visible to the camera.")
@@ -107,7 +764,7 @@ class WebcamCamera(BaseCamera):
             dominant_emotion = max(emotions, key=emotions.get)
             confidence = emotions[dominant_emotion]
 
-            if confidence < 0.3:
+            if confidence < EMOTION_CONFIDENCE_THRESHOLD:
                 logger.warning("Low confidence emotion detection: %s (%.2f). Try better lighting or move closer.", dominant_emotion, confidence)
                 return None
 
@@ -135,47 +792,121 @@ class WebcamCamera(BaseCamera):
             logger.warning("opencv-python not installed; camera unavailable.")
             return False
 
-    def capture_frame(self):
-        """Capture a single raw frame from the camera. Returns frame or None."""
+    def latest_frame(self) -> Optional[CapturedFrame]:
+        """Freshest frame: from the grabber's buffer if running, else read now."""
         if not self._initialized or self._cap is None:
             return None
-        try:
-            import cv2
-            ret, frame = self._cap.read()
-            if not ret or frame is None:
+        if self._grabber is not None:
+            captured = self._grabber.latest()
+            if captured is None or captured.age > CAMERA_FRAME_MAX_AGE:
                 return None
-            return frame
+            return captured
+        try:
+            with self._read_lock:
+                ret, frame = self._cap.read()
+                if not ret or frame is None:
+                    return None
+                self._read_seq += 1
+                return CapturedFrame(frame, self._read_seq, time.time())
         except Exception as e:
             logger.error("Frame capture error: %s", e)
             return None
 
+    def overlay_data(self, passive: bool = False) -> dict:
+        """Face boxes and emotion for the latest frame (from the shared detection)."""
+        data = super().overlay_data()
+        if not passive:
+            self._want_model()
+        if data["seq"] is None or self._detector is None:
+            return data
+        try:
+            faces = self._detect(self.latest_frame())
+        except Exception as e:
+            logger.warning("Emotion detection failed for overlay: %s", e)
+            faces = []
+        for i, face in enumerate(faces):
+            emotions = face["emotions"]
+            label = max(emotions, key=emotions.get)
+            data["faces"].append({
+                "box": [int(v) for v in face["box"]],
+                "emotion": label,
+                "confidence": emotions[label],
+                "primary": i == 0,
+            })
+        emotion, confidence = None, 0.0
+        if self._emotion_worker is not None:
+            emotion, confidence = self._emotion_worker.smoother.dominant()
+        if emotion is None and data["faces"]:
+            emotion, confidence = data["faces"][0]["emotion"], data["faces"][0]["confidence"]
+        if emotion is not None and confidence >= EMOTION_CONFIDENCE_THRESHOLD:
+            data["emotion"], data["confidence"] = emotion, round(confidence, 3)
+        return data
+
+    def warm_up(self) -> bool:
+        detector = self._detector
+        if detector is None:
+            return False
+        with self._detector_lock:
+            detector.warm_up()
+        return True
+
+    @property
+    def emotion_enabled(self) -> bool:
+        """True if an emotion backend is loaded."""
+        return self._detector is not None
+
+    def last_detection(self) -> Optional[CachedDetection]:
+        """Most recent detection (frame seq, timestamp, faces), without running one."""
+        return self._detection_cache.latest
+
+    def smoothed_emotions(self) -> Optional[dict[str, float]]:
+        """Smoothed 7-class probabilities from the background worker, if running."""
+        if self._emotion_worker is None:
+            return None
+        return self._emotion_worker.smoother.current()
+
+    def stats(self) -> dict:
+        """Capture, inference and cache counters for monitoring."""
+        stats = {"detection_cache": self._detection_cache.stats()}
+        if self._grabber is not None:
+            stats["grabber"] = {
+                "frames_grabbed": self._grabber.frames_grabbed,
+                "frames_decoded": self._grabber.frames_decoded,
+            }
+        if self._motion_gate is not None:
+            stats["motion_gate"] = self._motion_gate.stats()
+        if self._tracker is not None:
+            stats["face_tracker"] = self._tracker.stats()
+        if getattr(self, "_encoder", None) is not None:
+            stats["encoder"] = {"encodes": self._encoder.encodes, "reuses": self._encoder.reuses}
+        if self._emotion_worker is not None:
+            stats["emotion_worker"] = {
+                "inferences": self._emotion_worker.inferences,
+                "faces_seen": self._emotion_worker.faces_seen,
+            }
+        return stats
+
+    def capture_frame(self):
+        """Return the freshest raw frame from the camera, or None."""
+        captured = self.latest_frame()
+        return captured.frame if captured is not None else None
+
     def capture_snapshot_with_overlay(self) -> tuple[Optional[bytes], Optional[str]]:
         """Capture frame, run emotion detection, draw overlay, return (jpeg_bytes, emotion)."""
         if not self._initialized or self._cap is None:
             return None, None
+        self._want_model()
         try:
             import cv2
-            ret, frame = self._cap.read()
-            if not ret or frame is None:
+            captured = self.latest_frame()
+            if captured is None:
                 return None, None
+            frame = captured.frame.copy()  # Shared buffer frame; draw on a copy
 
             emotion = None
             if self._detector is not None:
                 try:
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    result = self._detector.detect_emotions(rgb_frame)
-                    if result and len(result) > 0:
-                        emotions = result[0]["emotions"]
-                        emotion = max(emotions, key=emotions.get)
-                        confidence = emotions[emotion]
-                        box = result[0]["box"]
-                        x, y, w, h = box
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                        text = f"{emotion}: {confidence:.2f}"
-                        font = cv2.FONT_HERSHEY_SIMPLEX
-                        text_size = cv2.getTextSize(text, font, 0.6, 2)[0]
-                        cv2.rectangle(frame, (x, y - 30), (x + text_size[0] + 10, y), (0, 255, 0), -1)
-                        cv2.putText(frame, text, (x + 5, y - 10), font, 0.6, (0, 0, 0), 2)
+                    emotion = draw_faces(frame, self._detect(captured))
                 except Exception as e:
                     logger.warning("Emotion detection failed during snapshot: %s", e)
 
@@ -186,14 +917,34 @@ class WebcamCamera(BaseCamera):
             return None, None
 
     def release(self) -> None:
+        if self._emotion_worker is not None:
+            self._emotion_worker.stop()
+            self._emotion_worker = None
+        if self._grabber is not None:
+            self._grabber.stop()
+            self._grabber = None
         if self._cap is not None:
             self._cap.release()
             self._cap = None
         self._detector = None
+        self._tracker = None
         self._initialized = False
         logger.info("Camera released.")
 
 
+def create_local_camera(**kwargs) -> BaseCamera:
+    """In-process camera for ``CAMERA_SOURCE`` (webcam, video file, image directory or synthetic)."""
+    if CAMERA_SOURCE != "webcam":
+        from interface.replay import ReplayCamera
+
+        return ReplayCamera(**kwargs)
+    return WebcamCamera(**kwargs)
+
+
 def create_camera() -> BaseCamera:
     """Factory function — returns the appropriate camera for the current config."""
-    return WebcamCamera()
+    if CAMERA_ENABLED and CAMERA_PROCESS_WORKER:
+        from interface.vision_worker import VisionClient
+
+        return VisionClient()
+    return create_local_camera()
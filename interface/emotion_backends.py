@@ -0,0 +1,196 @@
+"""
+Emotion recognition backends.
+Every backend finds faces in a BGR frame and returns FER-style results
+({"box": [x, y, w, h], "emotions": {label: probability}}) over the same
+seven labels, so the camera layer does not care which model runs.
+
+- "fer": FER's Keras CNN (pulls in full TensorFlow)
+- "onnx": Haar face detection + a (quantized) ONNX classifier, run with
+  ONNX Runtime if installed, otherwise OpenCV's DNN module
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.config import EMOTION_BACKEND, EMOTION_ONNX_MODEL, EMOTION_ONNX_LABELS
+
+logger = logging.getLogger(__name__)
+
+FER_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+
+class EmotionBackend(ABC):
+    """Face detection + emotion classification on BGR frames."""
+
+    name = "base"
+
+    @abstractmethod
+    def find_faces(self, frame) -> list[tuple[int, int, int, int]]:
+        """Full-frame face boxes (x, y, w, h)."""
+        ...
+
+    @abstractmethod
+    def classify(self, frame, boxes: list) -> list[dict]:
+        """FER-style results for the given face boxes (full-frame coordinates)."""
+        ...
+
+    def detect(self, frame) -> list[dict]:
+        """Find faces and classify them."""
+        return self.classify(frame, self.find_faces(frame))
+
+    def warm_up(self) -> None:
+        """Run the detector and one dummy face through the model (first runs build the graph / session)."""
+        frame = np.zeros((96, 96, 3), dtype=np.uint8)
+        self.find_faces(frame)
+        self.classify(frame, [(16, 16, 64, 64)])
+
+
+class FERBackend(EmotionBackend):
+    """FER (Keras CNN on TensorFlow) with its Haar face detector."""
+
+    name = "fer"
+
+    def __init__(self):
+        from fer import FER
+
+        self._fer = FER(mtcnn=False)
+
+    def find_faces(self, frame) -> list[tuple[int, int, int, int]]:
+        return [tuple(int(v) for v in box) for box in self._fer.find_faces(frame, bgr=True)]
+
+    def classify(self, frame, boxes: list) -> list[dict]:
+        """Classify all faces in one call on a crop around them; boxes stay full-frame.
+
+        FER stacks the face rectangles it is given into a single forward pass.
+        """
+        import cv2
+        from interface.face_tracking import crop_roi
+
+        if not boxes:
+            return []
+        crop, local_boxes, (x0, y0) = crop_roi(frame, boxes)
+        rgb_crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        results = self._fer.detect_emotions(rgb_crop, face_rectangles=local_boxes)
+        for face in results:
+            x, y, w, h = face["box"]
+            face["box"] = [int(x) + x0, int(y) + y0, int(w), int(h)]
+        return results
+
+    def detect(self, frame) -> list[dict]:
+        import cv2
+
+        return self._fer.detect_emotions(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+class OnnxBackend(EmotionBackend):
+    """Haar cascade + an ONNX emotion classifier (e.g. int8 FER+).
+
+    The model takes a 1x1xHxW grayscale face and returns one score per
+    entry of ``labels``; each model label is mapped onto a FER label (for
+    FER+ "contempt" folds into "disgust"). No TensorFlow is imported.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: Path = EMOTION_ONNX_MODEL, labels: dict = EMOTION_ONNX_LABELS):
+        import cv2
+
+        model_path = Path(model_path)
+        if not model_path.exists():
+            raise FileNotFoundError(f"ONNX emotion model not found: {model_path}")
+        self._cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self._mapping = np.zeros((len(labels), len(FER_LABELS)))  # Model label -> FER label
+        for i, label in enumerate(labels):
+            self._mapping[i, FER_LABELS.index(labels[label])] = 1.0
+        try:
+            import onnxruntime as ort
+
+            self._session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+            self._input = self._session.get_inputs()[0]
+            shape = self._input.shape
+            self._size = tuple(shape[2:4]) if all(isinstance(d, int) for d in shape[2:4]) else (64, 64)
+            self._batched = not (isinstance(shape[0], int) and shape[0] == 1)  # Dynamic batch dim
+            self._net = None
+            self.runtime = "onnxruntime"
+        except ImportError:
+            self._net = cv2.dnn.readNetFromONNX(str(model_path))
+            self._session = None
+            self._size = (64, 64)
+            self._batched = True  # OpenCV DNN reshapes; falls back on first failure
+            self.runtime = "opencv-dnn"
+
+    def find_faces(self, frame) -> list[tuple[int, int, int, int]]:
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        faces = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(50, 50))
+        return [tuple(int(v) for v in box) for box in faces]
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Raw scores for an (N, 1, H, W) float32 blob, shape (N, labels)."""
+        if self._session is not None:
+            return self._session.run(None, {self._input.name: blob})[0]
+        self._net.setInput(blob)
+        return self._net.forward()
+
+    def _scores(self, faces: np.ndarray) -> np.ndarray:
+        blob = faces.astype(np.float32)[:, np.newaxis]
+        if self._batched:
+            try:
+                return self._forward(blob)
+            except Exception as e:
+                logger.info("ONNX model does not accept batches (%s); classifying faces one by one.", e)
+                self._batched = False
+        return np.concatenate([self._forward(blob[i:i + 1]) for i in range(len(blob))])
+
+    def classify(self, frame, boxes: list) -> list[dict]:
+        """Classify all faces in a single batched forward pass."""
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        kept, faces = [], []
+        for x, y, w, h in boxes:
+            face = gray[max(0, y):y + h, max(0, x):x + w]
+            if face.size == 0:
+                continue
+            kept.append((int(x), int(y), int(w), int(h)))
+            faces.append(cv2.resize(face, self._size[::-1], interpolation=cv2.INTER_AREA))
+        if not faces:
+            return []
+
+        scores = self._scores(np.stack(faces)).astype(np.float64)
+        probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        merged = probs @ self._mapping
+        return [
+            {
+                "box": list(box),
+                "emotions": {label: round(float(p), 4) for label, p in zip(FER_LABELS, row)},
+            }
+            for box, row in zip(kept, merged)
+        ]
+
+
+BACKENDS = {"fer": FERBackend, "onnx": OnnxBackend}
+
+
+def create_emotion_backend(name: str = EMOTION_BACKEND) -> Optional[EmotionBackend]:
+    """Instantiate the configured backend; None if it cannot be loaded."""
+    cls = BACKENDS.get(name)
+    if cls is None:
+        logger.warning("Unknown emotion backend '%s'; choose one of %s.", name, ", ".join(BACKENDS))
+        return None
+    try:
+        backend = cls()
+    except ImportError as e:
+        logger.warning("Emotion backend '%s' unavailable (missing dependency): %s. Camera will work without emotion detection.", name, e)
+        return None
+    except Exception as e:
+        logger.warning("Emotion backend '%s' failed to initialize: %s. Camera will work without emotion detection.", name, e)
+        return None
+    logger.info("Emotion backend '%s' enabled.", name)
+    return backend
@@ -0,0 +1,173 @@
+"""
+Face-ROI tracking.
+Detects faces on the full frame only occasionally and follows each box
+between detections with template matching on a downscaled grayscale frame,
+so the emotion CNN only ever sees small face crops.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from config.config import (
+    CAMERA_TRACK_SCALE,
+    CAMERA_TRACK_MIN_SCORE,
+    CAMERA_REDETECT_EVERY,
+)
+
+logger = logging.getLogger(__name__)
+
+Box = tuple[int, int, int, int]  # x, y, w, h in full-frame pixels
+ROI_MARGIN = 0.25  # Crop margin around a face box, as a fraction of its size
+
+
+@dataclass
+class _Track:
+    box: Box
+    template: np.ndarray  # Downscaled grayscale patch of the face
+
+
+def crop_roi(frame: np.ndarray, boxes: list[Box], margin: float = ROI_MARGIN) -> tuple[np.ndarray, list[Box], tuple[int, int]]:
+    """Crop the region around all ``boxes`` (plus a margin) from ``frame``.
+
+    Returns (crop, boxes relative to the crop, crop origin) so results
+    computed on the crop can be mapped back to full-frame coordinates.
+    """
+    x0 = y0 = None
+    x1 = y1 = 0
+    for x, y, w, h in boxes:
+        mx, my = int(w * margin), int(h * margin)
+        x0 = x - mx if x0 is None else min(x0, x - mx)
+        y0 = y - my if y0 is None else min(y0, y - my)
+        x1, y1 = max(x1, x + w + mx), max(y1, y + h + my)
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(frame.shape[1], x1), min(frame.shape[0], y1)
+    local = [(x - x0, y - y0, w, h) for x, y, w, h in boxes]
+    return frame[y0:y1, x0:x1], local, (x0, y0)
+
+
+class FaceTracker:
+    """Detect-then-track face boxes.
+
+    ``update()`` runs the full-frame ``detect_faces`` callable when there is
+    nothing to track, every ``redetect_every`` frames, or when any track's
+    template match falls below ``min_score``; otherwise boxes are moved by
+    matching each face template inside a small search window.
+    """
+
+    def __init__(
+        self,
+        scale: float = CAMERA_TRACK_SCALE,
+        min_score: float = CAMERA_TRACK_MIN_SCORE,
+        redetect_every: int = CAMERA_REDETECT_EVERY,
+        search_margin: float = 0.5,
+    ):
+        self._scale = scale
+        self._min_score = min_score
+        self._redetect_every = redetect_every
+        self._search_margin = search_margin
+        self._tracks: list[_Track] = []
+        self._since_detect = 0
+        self.detections = 0
+        self.tracked = 0
+        self.losses = 0
+        self.detect_seconds = 0.0
+        self.track_seconds = 0.0
+
+    def _small_gray(self, frame: np.ndarray) -> np.ndarray:
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if self._scale == 1.0:
+            return gray
+        return cv2.resize(gray, None, fx=self._scale, fy=self._scale, interpolation=cv2.INTER_AREA)
+
+    def _to_small(self, box: Box) -> Box:
+        s = self._scale
+        return tuple(max(1, int(round(v * s))) for v in box)
+
+    def _template(self, small: np.ndarray, box: Box) -> Optional[np.ndarray]:
+        x, y, w, h = self._to_small(box)
+        patch = small[y:y + h, x:x + w]
+        if patch.shape[0] < 4 or patch.shape[1] < 4:
+            return None
+        return patch.copy()
+
+    def _detect(self, frame: np.ndarray, small: np.ndarray, detect_faces: Callable) -> list[Box]:
+        start = time.perf_counter()
+        boxes = [tuple(int(v) for v in b) for b in detect_faces(frame)]
+        self.detect_seconds += time.perf_counter() - start
+        self.detections += 1
+        self._since_detect = 0
+        self._tracks = []
+        for box in boxes:
+            template = self._template(small, box)
+            if template is not None:
+                self._tracks.append(_Track(box, template))
+        return boxes
+
+    def _follow(self, small: np.ndarray, track: _Track) -> Optional[Box]:
+        """New full-frame box for a track, or None if the match is too weak."""
+        import cv2
+
+        th, tw = track.template.shape
+        x, y, _, _ = self._to_small(track.box)
+        mx, my = int(tw * self._search_margin) + 1, int(th * self._search_margin) + 1
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(small.shape[1], x + tw + mx), min(small.shape[0], y + th + my)
+        window = small[y0:y1, x0:x1]
+        if window.shape[0] < th or window.shape[1] < tw:
+            return None
+
+        scores = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if score < self._min_score:
+            return None
+
+        nx, ny = x0 + dx, y0 + dy
+        track.template = window[dy:dy + th, dx:dx + tw].copy()
+        _, _, w, h = track.box
+        track.box = (int(nx / self._scale), int(ny / self._scale), w, h)
+        return track.box
+
+    def update(self, frame: np.ndarray, detect_faces: Callable[[np.ndarray], list]) -> list[Box]:
+        """Face boxes for ``frame`` (BGR), re-detecting only when needed."""
+        small = self._small_gray(frame)
+        if not self._tracks or self._since_detect >= self._redetect_every:
+            return self._detect(frame, small, detect_faces)
+
+        start = time.perf_counter()
+        boxes = []
+        for track in self._tracks:
+            box = self._follow(small, track)
+            if box is None:
+                break
+            boxes.append(box)
+        self.track_seconds += time.perf_counter() - start
+
+        if len(boxes) < len(self._tracks):
+            self.losses += 1
+            logger.debug("Face track lost; re-detecting on the full frame.")
+            return self._detect(frame, small, detect_faces)
+
+        self._since_detect += 1
+        self.tracked += 1
+        return boxes
+
+    def reset(self) -> None:
+        """Drop all tracks so the next update re-detects."""
+        self._tracks = []
+
+    def stats(self) -> dict:
+        """Detection/tracking counters and mean per-frame cost in milliseconds."""
+        return {
+            "detections": self.detections,
+            "tracked": self.tracked,
+            "losses": self.losses,
+            "active_tracks": len(self._tracks),
+            "detect_ms": round(1000 * self.detect_seconds / self.detections, 2) if self.detections else None,
+            "track_ms": round(1000 * self.track_seconds / self.tracked, 2) if self.tracked else None,
+        }
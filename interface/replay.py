@@ -0,0 +1,157 @@
+"""
+Replay and synthetic camera sources.
+Plays back a video file, an image directory or a generated scene at a
+fixed frame rate through the same code path as a webcam, so camera and
+emotion code can run (and be benchmarked) without hardware.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.config import (
+    CAMERA_SOURCE,
+    CAMERA_REPLAY_FPS,
+    CAMERA_REPLAY_LOOP,
+    CAMERA_SYNTHETIC_SIZE,
+)
+from interface.camera import WebcamCamera
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def synthetic_frame(index: int, size: tuple[int, int] = CAMERA_SYNTHETIC_SIZE, seed: int = 0, faces: int = 1) -> np.ndarray:
+    """Deterministic BGR test scene: gradient background, drifting face-like blobs, sensor noise."""
+    import cv2
+
+    width, height = size
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:, :, 0] = (x * 0.4 + 40).astype(np.uint8)
+    frame[:, :, 1] = (x * 0.3 + 60).astype(np.uint8)
+    frame[:, :, 2] = 90
+
+    cols = int(np.ceil(np.sqrt(faces)))
+    rows = int(np.ceil(faces / cols))
+    cell_w, cell_h = width // cols, height // rows
+    axes = (cell_w // 5, cell_h // 3) if faces > 1 else (width // 10, height // 6)
+    for k in range(faces):
+        base_x = cell_w * (k % cols) + cell_w // 2
+        base_y = cell_h * (k // cols) + cell_h // 2
+        cx = int(base_x + cell_w / 6 * np.sin((index + 7 * k) / 30))
+        cy = int(base_y + cell_h / 12 * np.cos((index + 7 * k) / 45))
+        cv2.ellipse(frame, (cx, cy), axes, 0, 0, 360, (150, 180, 220), -1)
+        eye_dx, eye_dy = axes[0] // 2, axes[1] // 3
+        for ex in (cx - eye_dx, cx + eye_dx):
+            cv2.circle(frame, (ex, cy - eye_dy), max(2, axes[0] // 7), (40, 40, 40), -1)
+        cv2.ellipse(frame, (cx, cy + axes[1] // 2), (axes[0] // 2, axes[1] // 6), 0, 0, 180, (60, 60, 140), 3)
+
+    noise = np.random.default_rng(seed + index).integers(-6, 7, frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+class ReplaySource:
+    """``cv2.VideoCapture``-compatible source paced to ``fps``.
+
+    ``source`` is a video file, an image directory, or "synthetic".
+    ``grab()`` blocks until the next frame is due, like a real camera.
+    """
+
+    def __init__(self, source: str, fps: float = CAMERA_REPLAY_FPS, loop: bool = CAMERA_REPLAY_LOOP):
+        import cv2
+
+        self._source = str(source)
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+        self._loop = loop
+        self._index = -1
+        self._next_due = 0.0
+        self._video = None
+        self._images: list[Path] = []
+        path = Path(self._source)
+        if self._source == "synthetic":
+            self.kind = "synthetic"
+        elif path.is_dir():
+            self.kind = "images"
+            self._images = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        else:
+            self.kind = "video"
+            self._video = cv2.VideoCapture(self._source)
+        self._opened = self.kind == "synthetic" or bool(self._images) or (
+            self._video is not None and self._video.isOpened()
+        )
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop, value) -> bool:
+        return False  # Driver properties don't apply to replay
+
+    def _wait_until_due(self) -> None:
+        now = time.time()
+        if self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due = max(self._next_due, now) + self._interval
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        self._wait_until_due()
+        self._index += 1
+        if self.kind == "images" and self._index >= len(self._images):
+            if not self._loop:
+                return False
+            self._index = 0
+        if self.kind == "video" and not self._video.grab():
+            if not self._loop:
+                return False
+            import cv2
+
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._index = 0
+            return self._video.grab()
+        return True
+
+    def retrieve(self) -> tuple[bool, Optional[np.ndarray]]:
+        if self.kind == "synthetic":
+            return True, synthetic_frame(self._index)
+        if self.kind == "images":
+            import cv2
+
+            frame = cv2.imread(str(self._images[self._index]))
+            return frame is not None, frame
+        return self._video.retrieve()
+
+    def read(self) -> tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self) -> None:
+        if self._video is not None:
+            self._video.release()
+        self._opened = False
+
+
+class ReplayCamera(WebcamCamera):
+    """``WebcamCamera`` fed by a ``ReplaySource`` instead of a device.
+
+    Everything downstream (grabber, emotion worker, tracking, gating,
+    streaming) runs unchanged.
+    """
+
+    def __init__(self, source: str = CAMERA_SOURCE, fps: float = CAMERA_REPLAY_FPS, **kwargs):
+        self._source = source
+        self._fps = fps
+        super().__init__(**kwargs)
+
+    def _open_capture(self):
+        logger.info("Replaying camera source '%s' at %.1f fps.", self._source, self._fps)
+        return ReplaySource(self._source, self._fps)
+
+    def is_available(self) -> bool:
+        return self._initialized and self._cap is not None and self._cap.isOpened()
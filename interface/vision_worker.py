@@ -0,0 +1,514 @@
+"""
+Process-isolated vision worker.
+A separate Python process owns the camera and the emotion backend and
+publishes frames and detections through shared memory; ``VisionClient``
+exposes the usual ``BaseCamera`` API on top of it. Capture, colour
+conversion and inference no longer compete with the web server for the
+GIL, and a crash in native vision code only kills (and restarts) the
+worker.
+
+Run by ``VisionClient``:  python -m interface.vision_worker <ring> <board> [--no-emotion]
+"""
+
+import atexit
+import json
+import logging
+import struct
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+
+from config.config import (
+    PROJECT_ROOT,
+    CAMERA_GRAB_FPS,
+    CAMERA_FRAME_MAX_AGE,
+    VISION_RING_SLOTS,
+    VISION_RING_SLOT_BYTES,
+    VISION_WORKER_RESTART_DELAY,
+    VISION_WORKER_START_TIMEOUT,
+)
+from interface.camera import (
+    BaseCamera,
+    CapturedFrame,
+    EMOTION_CONFIDENCE_THRESHOLD,
+    draw_faces,
+)
+
+logger = logging.getLogger(__name__)
+
+RING_MAGIC = b"VRINGv1\0"
+_RING_HEADER = struct.Struct("<8sIIQ")   # magic, slot count, slot capacity, latest seq
+_SLOT_HEADER = struct.Struct("<QQdIII4x")  # begin seq, end seq, timestamp, height, width, channels
+_BOARD_HEADER = struct.Struct("<QQI4x")  # begin version, end version, payload length
+BOARD_BYTES = 64 * 1024
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process's tracker unlink it."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class FrameRing:
+    """Fixed-size ring of frame slots in shared memory (one writer, many readers).
+
+    Each slot is guarded by a seqlock: the writer stamps ``begin``, copies
+    the pixels, then stamps ``end``; a reader accepts a copy only if both
+    stamps still match the sequence number it expected.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        magic, self.slots, self.capacity, _ = _RING_HEADER.unpack_from(shm.buf, 0)
+        if magic != RING_MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self._slot_size = _SLOT_HEADER.size + self.capacity
+        self.frames_written = 0
+
+    @classmethod
+    def create(cls, slots: int = VISION_RING_SLOTS, capacity: int = VISION_RING_SLOT_BYTES) -> "FrameRing":
+        size = _RING_HEADER.size + slots * (_SLOT_HEADER.size + capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        _RING_HEADER.pack_into(shm.buf, 0, RING_MAGIC, slots, capacity, 0)
+        for i in range(slots):
+            _SLOT_HEADER.pack_into(shm.buf, _RING_HEADER.size + i * (_SLOT_HEADER.size + capacity), 0, 0, 0.0, 0, 0, 0)
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        return cls(_attach(name))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _slot_offset(self, seq: int) -> int:
+        return _RING_HEADER.size + (seq % self.slots) * self._slot_size
+
+    def latest_seq(self) -> int:
+        return _RING_HEADER.unpack_from(self._shm.buf, 0)[3]
+
+    def write(self, frame: np.ndarray, seq: int, timestamp: float) -> None:
+        """Publish ``frame`` (uint8 HxWxC) as sequence number ``seq`` (> 0)."""
+        if frame.nbytes > self.capacity:
+            import cv2
+
+            scale = (self.capacity / frame.nbytes) ** 0.5
+            frame = cv2.resize(frame, None, fx=scale * 0.99, fy=scale * 0.99, interpolation=cv2.INTER_AREA)
+        frame = np.ascontiguousarray(frame)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        offset = self._slot_offset(seq)
+        buf = self._shm.buf
+        struct.pack_into("<Q", buf, offset, seq)  # begin
+        data = np.ndarray(frame.nbytes, dtype=np.uint8, buffer=buf, offset=offset + _SLOT_HEADER.size)
+        data[:] = frame.reshape(-1)
+        _SLOT_HEADER.pack_into(buf, offset, seq, seq, timestamp, height, width, channels)
+        _RING_HEADER.pack_into(buf, 0, RING_MAGIC, self.slots, self.capacity, seq)
+        self.frames_written += 1
+
+    def read(self, seq: int) -> Optional[CapturedFrame]:
+        """Copy of frame ``seq`` if it is still in the ring and was not torn."""
+        offset = self._slot_offset(seq)
+        buf = self._shm.buf
+        _, end, timestamp, height, width, channels = _SLOT_HEADER.unpack_from(buf, offset)
+        if end != seq:
+            return None
+        nbytes = height * width * channels
+        pixels = np.ndarray(nbytes, dtype=np.uint8, buffer=buf, offset=offset + _SLOT_HEADER.size).copy()
+        begin = struct.unpack_from("<Q", buf, offset)[0]
+        if begin != seq:
+            return None
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        return CapturedFrame(pixels.reshape(shape), seq, timestamp)
+
+    def read_latest(self) -> Optional[CapturedFrame]:
+        """Newest readable frame (retries if the writer lapped the reader)."""
+        for _ in range(3):
+            seq = self.latest_seq()
+            if seq == 0:
+                return None
+            captured = self.read(seq)
+            if captured is not None:
+                return captured
+        return None
+
+    def close(self, unlink: bool = False) -> None:
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class DetectionBoard:
+    """Latest worker state (detections, smoothed emotion, stats) as JSON in shared memory."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        self._version = 0
+
+    @classmethod
+    def create(cls, size: int = BOARD_BYTES) -> "DetectionBoard":
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        _BOARD_HEADER.pack_into(shm.buf, 0, 0, 0, 0)
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name: str) -> "DetectionBoard":
+        return cls(_attach(name))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write(self, state: dict) -> None:
+        payload = json.dumps(state).encode()
+        if _BOARD_HEADER.size + len(payload) > self._shm.size:
+            logger.warning("Vision state (%d bytes) does not fit the board; dropped.", len(payload))
+            return
+        self._version += 1
+        buf = self._shm.buf
+        struct.pack_into("<Q", buf, 0, self._version)  # begin
+        buf[_BOARD_HEADER.size:_BOARD_HEADER.size + len(payload)] = payload
+        _BOARD_HEADER.pack_into(buf, 0, self._version, self._version, len(payload))
+
+    def read(self) -> Optional[dict]:
+        buf = self._shm.buf
+        for _ in range(3):
+            begin, end, length = _BOARD_HEADER.unpack_from(buf, 0)
+            if end == 0:
+                return None
+            if begin != end:
+                time.sleep(0.001)  # Writer mid-update
+                continue
+            payload = bytes(buf[_BOARD_HEADER.size:_BOARD_HEADER.size + length])
+            if struct.unpack_from("<Q", buf, 0)[0] == end:
+                return json.loads(payload)
+        return None
+
+    def close(self, unlink: bool = False) -> None:
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def _plain_faces(faces: list[dict]) -> list[dict]:
+    """FER-style results with plain ints/floats (JSON-serializable)."""
+    return [
+        {
+            "box": [int(v) for v in face["box"]],
+            "emotions": {label: float(p) for label, p in face["emotions"].items()},
+        }
+        for face in faces
+    ]
+
+
+def run_worker(ring_name: str, board_name: str, emotion_model: bool = True) -> None:
+    """Worker process body: own the camera, publish frames and detections."""
+    from interface.camera import create_local_camera
+
+    ring = FrameRing.attach(ring_name)
+    board = DetectionBoard.attach(board_name)
+    camera = create_local_camera(emotion_worker=True, emotion_model=emotion_model)
+    try:
+        camera.warm_up()  # Before the first state is published, so a ready client means a warm model
+    except Exception as e:
+        logger.warning("Emotion model warm-up failed: %s", e)
+
+    stop = threading.Event()
+
+    def watch_parent():
+        sys.stdin.read()  # EOF when the client closes the pipe or dies
+        stop.set()
+
+    threading.Thread(target=watch_parent, name="parent-watch", daemon=True).start()
+
+    interval = 1.0 / CAMERA_GRAB_FPS if CAMERA_GRAB_FPS > 0 else 0.1
+    last_seq = None
+    try:
+        while not stop.is_set():
+            captured = camera.latest_frame()
+            if captured is not None and captured.seq != last_seq:
+                ring.write(captured.frame, captured.seq, captured.timestamp)
+                last_seq = captured.seq
+            detection = camera.last_detection()
+            board.write({
+                "available": camera.is_available(),
+                "emotion_enabled": camera.emotion_enabled,
+                "detection": {
+                    "seq": detection.seq,
+                    "timestamp": detection.frame_timestamp,
+                    "faces": _plain_faces(detection.faces),
+                } if detection is not None else None,
+                "smoothed": camera.smoothed_emotions(),
+                "stats": camera.stats(),
+                "heartbeat": time.time(),
+            })
+            stop.wait(interval)
+    finally:
+        camera.release()
+        ring.close()
+        board.close()
+
+
+class VisionClient(BaseCamera):
+    """``BaseCamera`` backed by a vision worker process.
+
+    Frames are read from the shared-memory ring and detections from the
+    board; no capture or inference runs in this process. A worker that
+    exits is restarted, at most once every ``restart_delay`` seconds.
+    Unloading the emotion model restarts the worker without it, which
+    returns TensorFlow's memory to the OS; the next request that needs
+    emotions starts a worker with the model again.
+    """
+
+    def __init__(self, restart_delay: float = VISION_WORKER_RESTART_DELAY):
+        self._ring = FrameRing.create()
+        self._board = DetectionBoard.create()
+        self._restart_delay = restart_delay
+        self._proc: Optional[subprocess.Popen] = None
+        self._started_at = 0.0
+        self._lock = threading.Lock()
+        self._ready = False
+        self._released = False
+        self._emotion_model = True
+        self.model_last_used = time.time()  # Last request that needed the emotion model
+        self.restarts = 0
+        self._start_worker()
+        atexit.register(self.release)  # The web app never releases its camera explicitly
+
+    def _start_worker(self) -> None:
+        args = [sys.executable, "-m", "interface.vision_worker", self._ring.name, self._board.name]
+        if not self._emotion_model:
+            args.append("--no-emotion")
+        self._proc = subprocess.Popen(args, stdin=subprocess.PIPE, cwd=str(PROJECT_ROOT))
+        self._started_at = time.time()
+        logger.info("Vision worker started (pid %d%s).", self._proc.pid, "" if self._emotion_model else ", no emotion model")
+
+    @staticmethod
+    def _stop_worker(proc: subprocess.Popen) -> None:
+        try:
+            proc.stdin.close()  # Worker stops on EOF
+            proc.wait(5.0)
+        except Exception:
+            proc.kill()
+
+    def _restart_worker(self) -> None:
+        """Replace the worker (to load or drop the emotion model); frames pause meanwhile."""
+        with self._lock:
+            if self._released:
+                return
+            proc, self._proc = self._proc, None
+        if proc is not None:
+            self._stop_worker(proc)
+        with self._lock:
+            if self._released:
+                return
+            self._encoder = None  # Frame numbering restarts; don't reuse old ETags
+            self._ready = False
+            self._start_worker()
+
+    def _set_emotion_model(self, enabled: bool) -> bool:
+        with self._lock:
+            if self._emotion_model == enabled or self._released:
+                return False
+            self._emotion_model = enabled
+        self._restart_worker()
+        return True
+
+    def load_model(self) -> bool:
+        return self._set_emotion_model(True)
+
+    def unload_model(self) -> bool:
+        if not self._set_emotion_model(False):
+            return False
+        logger.info("Emotion model unloaded (vision worker restarted without it).")
+        return True
+
+    @property
+    def model_loaded(self) -> bool:
+        if not self._emotion_model:
+            return False
+        state = self._board.read()
+        return bool(state and state["emotion_enabled"])
+
+    @property
+    def worker_pid(self) -> Optional[int]:
+        proc = self._proc
+        return proc.pid if proc is not None else None
+
+    def _want_model(self) -> None:
+        """Note a request that needs the emotion model; restart the worker with it if it was unloaded."""
+        self.model_last_used = time.time()
+        if not self._emotion_model and not self._released:
+            threading.Thread(target=self.load_model, name="vision-model-load", daemon=True).start()
+
+    def _ensure_worker(self) -> bool:
+        """True if the worker is running; restarts a dead one (rate-limited)."""
+        with self._lock:
+            if self._proc is None:
+                return False
+            code = self._proc.poll()
+            if code is None:
+                return True
+            if time.time() - self._started_at < self._restart_delay:
+                return False
+            logger.error("Vision worker exited with code %s; restarting.", code)
+            self.restarts += 1
+            self._encoder = None  # Frame numbering restarts; don't reuse old ETags
+            self._ready = False  # The new worker has published nothing yet
+            self._start_worker()
+            return True
+
+    def _state(self) -> Optional[dict]:
+        if not self._ensure_worker():
+            return None
+        state = self._board.read()
+        if state is None or time.time() - state["heartbeat"] > CAMERA_FRAME_MAX_AGE:
+            return None
+        return state
+
+    def latest_frame(self) -> Optional[CapturedFrame]:
+        if not self._ensure_worker():
+            return None
+        captured = self._ring.read_latest()
+        if captured is None or captured.age > CAMERA_FRAME_MAX_AGE:
+            return None
+        return captured
+
+    def capture_frame(self):
+        captured = self.latest_frame()
+        return captured.frame if captured is not None else None
+
+    def smoothed_emotions(self) -> Optional[dict[str, float]]:
+        state = self._state()
+        return state["smoothed"] if state else None
+
+    def last_faces(self) -> list[dict]:
+        """Faces from the worker's most recent detection."""
+        state = self._state()
+        if not state or not state["detection"]:
+            return []
+        return state["detection"]["faces"]
+
+    def capture_emotion(self) -> Optional[str]:
+        self._want_model()
+        state = self._state()
+        if not state:
+            return None
+        emotions = state["smoothed"]
+        if emotions is None and state["detection"] and state["detection"]["faces"]:
+            emotions = state["detection"]["faces"][0]["emotions"]
+        if not emotions:
+            return None
+        emotion = max(emotions, key=emotions.get)
+        if emotions[emotion] < EMOTION_CONFIDENCE_THRESHOLD:
+            return None
+        return emotion
+
+    def _wait_ready(self, timeout: float = VISION_WORKER_START_TIMEOUT) -> None:
+        """Block until the worker has published its first state (camera + model loaded).
+
+        Returns early if the worker exits while starting.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            proc = self._proc
+            if proc is None:
+                return
+            state = self._board.read()
+            if state is not None and state["heartbeat"] >= self._started_at:  # Not a previous worker's state
+                self._ready = True
+                return
+            code = proc.poll()
+            if code is not None:
+                logger.warning("Vision worker exited with code %s before it was ready.", code)
+                return
+            time.sleep(0.1)
+        logger.warning("Vision worker not ready after %.0fs.", timeout)
+
+    def warm_up(self) -> bool:
+        """The worker warms its model before it publishes; wait for that."""
+        if not self._ready:
+            self._wait_ready()
+        state = self._board.read()
+        return bool(state and state["emotion_enabled"])
+
+    def is_available(self) -> bool:
+        if not self._ready:
+            self._wait_ready()
+        state = self._state()
+        return bool(state and state["available"])
+
+    def overlay_data(self, passive: bool = False) -> dict:
+        if not passive:
+            self._want_model()
+        data = super().overlay_data()
+        for i, face in enumerate(self.last_faces()):
+            emotions = face["emotions"]
+            label = max(emotions, key=emotions.get)
+            data["faces"].append(
+                {"box": face["box"], "emotion": label, "confidence": emotions[label], "primary": i == 0}
+            )
+        emotion = self.capture_emotion()
+        if emotion is not None:
+            smoothed = self.smoothed_emotions() or {}
+            data["emotion"] = emotion
+            data["confidence"] = round(smoothed.get(emotion, data["faces"][0]["confidence"] if data["faces"] else 0.0), 3)
+        return data
+
+    def capture_snapshot_with_overlay(self) -> tuple[Optional[bytes], Optional[str]]:
+        import cv2
+
+        self._want_model()
+        state = self._state()
+        detection = state["detection"] if state else None
+        # Boxes are only drawn on the frame they were detected in; if that
+        # frame has left the ring, the newest frame is sent without them
+        captured = self._ring.read(detection["seq"]) if detection else None
+        faces = detection["faces"] if captured is not None else []
+        if captured is None or captured.age > CAMERA_FRAME_MAX_AGE:
+            captured, faces = self.latest_frame(), []
+        if captured is None:
+            return None, None
+        frame = captured.frame  # Already a private copy of the ring slot
+        emotion = draw_faces(frame, faces) if faces else self.capture_emotion()
+        _, buffer = cv2.imencode(".jpg", frame)
+        return buffer.tobytes(), emotion
+
+    def stats(self) -> dict:
+        state = self._board.read() or {}
+        return {
+            "worker": {
+                "pid": self._proc.pid if self._proc else None,
+                "alive": self._proc is not None and self._proc.poll() is None,
+                "restarts": self.restarts,
+                "frames_published": self._ring.latest_seq(),
+            },
+            **state.get("stats", {}),
+        }
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            proc, self._proc = self._proc, None
+        if proc is not None:
+            self._stop_worker(proc)
+        self._ring.close(unlink=True)
+        self._board.close(unlink=True)
+        logger.info("Vision worker stopped.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+    run_worker(sys.argv[1], sys.argv[2], emotion_model="--no-emotion" not in sys.argv[3:])
@@ -0,0 +1,227 @@
+"""
+Live WebSocket channel for the web UI.
+One persistent connection per browser carries chat token streams,
+exercise offers, camera emotion/face updates and status changes, instead
+of a POST + SSE per message and separate overlay and status polls.
+
+Client → server messages (JSON):
+  {"type": "chat", "id": 1, "message": "...", "capture_emotion": true, "profile": null}
+  {"type": "camera_on"} / {"type": "camera_off"}   start / stop overlay pushes (off by default)
+  {"type": "trigger_exercise"}
+  {"type": "ping"}
+
+Server → client messages (JSON):
+  chat events tagged with the request id: token / emotion / exercise_offer / done / error
+  {"type": "overlay", ...}   camera faces + emotion, pushed only when they change, after camera_on
+  {"type": "status", ...}    /api/status payload, pushed on connect and when it changes
+  {"type": "exercise_offer", "exercises": [...]}, {"type": "pong"}
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from config.config import (
+    WS_PUSH_INTERVAL,
+    WS_STATUS_INTERVAL,
+    WS_SEND_QUEUE,
+    WS_SEND_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelClosed(Exception):
+    """The WebSocket went away (or stalled past WS_SEND_TIMEOUT)."""
+
+
+class LiveChannel:
+    """Server side of one browser's WebSocket session.
+
+    A single sender thread owns ``ws.send``. Ordered events (chat tokens,
+    exercise offers, replies) go through a bounded queue: when a slow
+    client lets it fill up, the producing chat turn waits, which is the
+    backpressure. State events (overlay, status) are coalesced — only the
+    newest of each kind is kept, so a stalled client never builds up a
+    backlog of stale camera updates.
+    """
+
+    def __init__(
+        self,
+        ws,
+        backend,
+        push_interval: float = WS_PUSH_INTERVAL,
+        status_interval: float = WS_STATUS_INTERVAL,
+        queue_size: int = WS_SEND_QUEUE,
+        send_timeout: float = WS_SEND_TIMEOUT,
+    ):
+        self._ws = ws
+        self._backend = backend
+        self._push_interval = push_interval
+        self._status_interval = status_interval
+        self._send_timeout = send_timeout
+        self._events: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._latest: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._overlay_wanted = threading.Event()  # Set by the client's camera_on
+        self.sent = 0
+        self.coalesced = 0
+
+    # --- Outgoing ---
+
+    def send_event(self, event: dict) -> None:
+        """Queue an ordered event; blocks while the client is behind."""
+        if self._closed.is_set():
+            raise ChannelClosed()
+        try:
+            self._events.put(event, timeout=self._send_timeout)
+        except queue.Full:
+            logger.warning("WebSocket client stalled; closing channel.")
+            self.close()
+            raise ChannelClosed()
+        self._wake.set()
+
+    def push_state(self, kind: str, event: dict) -> None:
+        """Queue a state event, replacing any unsent one of the same kind."""
+        with self._lock:
+            if kind in self._latest:
+                self.coalesced += 1
+            self._latest[kind] = event
+        self._wake.set()
+
+    def _next_event(self) -> Optional[dict]:
+        try:
+            return self._events.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._latest:
+                kind = next(iter(self._latest))
+                return self._latest.pop(kind)
+        return None
+
+    def _sender(self) -> None:
+        try:
+            while not self._closed.is_set():
+                event = self._next_event()
+                if event is None:
+                    self._wake.wait(0.5)
+                    self._wake.clear()
+                    continue
+                self._ws.send(json.dumps(event))
+                self.sent += 1
+        except Exception as e:
+            logger.debug(f"WebSocket send failed: {e}")
+        finally:
+            self.close()
+
+    # --- Server-side change detection ---
+
+    def _watcher(self) -> None:
+        last_status = last_overlay = None
+        camera_on = False
+        next_status = 0.0
+        while not self._closed.is_set():
+            try:
+                now = time.monotonic()
+                if now >= next_status:
+                    next_status = now + self._status_interval
+                    status = self._backend.status()
+                    key = (
+                        tuple(sorted(status["status"].items())),
+                        status["camera_enabled"],
+                        (status["load"] or {}).get("mode"),
+                        tuple(sorted((name, c["state"]) for name, c in (status.get("warmup") or {}).items())),
+                    )
+                    camera_on = status["camera_enabled"] and status["status"].get("camera", False)
+                    if key != last_status:
+                        last_status = key
+                        self.push_state("status", {"type": "status", **status})
+                if not self._overlay_wanted.is_set():
+                    last_overlay = None  # Re-send the current overlay after the next camera_on
+                elif camera_on:
+                    # Passive: these checks alone must not keep the emotion model loaded
+                    overlay = self._backend.camera_overlay(passive=True)
+                    key = (overlay.get("emotion"), tuple((tuple(f["box"]), f["emotion"]) for f in overlay.get("faces", [])))
+                    if key != last_overlay:
+                        last_overlay = key
+                        self.push_state("overlay", {"type": "overlay", **overlay})
+            except Exception as e:
+                logger.debug(f"WebSocket watcher error: {e}")
+            self._closed.wait(self._push_interval)
+
+    # --- Incoming ---
+
+    def _chat(self, msg: dict) -> None:
+        request_id = msg.get("id")
+        events = None
+        try:
+            events = self._backend.chat_events(
+                msg.get("message", "").strip(),
+                capture_emotion=bool(msg.get("capture_emotion")),
+                profile=msg.get("profile") or None,
+            )
+            for event in events:
+                self.send_event({**event, "id": request_id})
+        except ChannelClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Error processing WebSocket chat: {e}", exc_info=True)
+            try:
+                self.send_event({"type": "error", "error": str(e), "id": request_id})
+            except ChannelClosed:
+                pass
+        finally:
+            if events is not None:
+                events.close()
+
+    def _dispatch(self, msg: dict) -> None:
+        kind = msg.get("type")
+        if kind == "chat":
+            if not msg.get("message", "").strip():
+                self.send_event({"type": "error", "error": "Empty message", "id": msg.get("id")})
+                return
+            threading.Thread(target=self._chat, args=(msg,), name="ws-chat", daemon=True).start()
+        elif kind == "camera_on":
+            self._overlay_wanted.set()
+            try:
+                self._backend.camera_overlay()  # Counts as use: reloads an unloaded emotion model
+            except Exception as e:
+                logger.debug(f"Camera overlay on camera_on failed: {e}")
+        elif kind == "camera_off":
+            self._overlay_wanted.clear()
+        elif kind == "trigger_exercise":
+            self.send_event({"type": "exercise_offer", "exercises": self._backend.trigger_exercise()})
+        elif kind == "ping":
+            self.send_event({"type": "pong"})
+        else:
+            self.send_event({"type": "error", "error": f"Unknown message type '{kind}'"})
+
+    def run(self) -> None:
+        """Serve the connection until the client disconnects."""
+        threading.Thread(target=self._sender, name="ws-sender", daemon=True).start()
+        threading.Thread(target=self._watcher, name="ws-watcher", daemon=True).start()
+        try:
+            while not self._closed.is_set():
+                raw = self._ws.receive(timeout=1)
+                if raw is None:
+                    continue
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    self.send_event({"type": "error", "error": "Invalid JSON"})
+                    continue
+                self._dispatch(msg)
+        except ChannelClosed:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
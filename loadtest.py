@@ -0,0 +1,459 @@
+"""
+Synthetic load test for the web API.
+Simulates concurrent users against /api/chat_stream, /api/chat,
+/api/camera/snapshot and /api/status with a configurable request mix and
+think times. By default it starts everything itself — a fake Ollama
+(fake_ollama.py), the synthetic replay camera and the app, single-process
+or multi-worker — so results are reproducible without a model or webcam.
+
+Reports throughput, time to first token, latency percentiles and error
+rates per endpoint, plus the server's RSS and CPU over time. Chat turns
+use the "loadtest" memory profile; a server started by the script stores
+memories and mood timelines in a temporary directory, never in data/.
+
+Usage: python loadtest.py [--users 8] [--duration 60] [--think 3] [--ramp 10]
+                          [--mix chat_stream=2,chat=1,snapshot=4,status=3]
+                          [--mode single|multi] [--workers 4] [--url URL --server-pid PID]
+                          [--json results.json] [--max-error-rate 0.05]
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import requests
+
+DEFAULT_MIX = "chat_stream=2,chat=1,snapshot=4,status=3"
+PROFILE = "loadtest"
+PROMPTS = [
+    "Tell me something calming about the evening",
+    "I went for a walk today and it was nice",
+    "What is a good way to wind down before bed?",
+    "I'm doing okay, just checking in",
+]
+READY_TIMEOUT = 180.0
+
+
+# --- Server under test ---
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scratch_env(env: dict, root: str) -> dict:
+    """``env`` with the app's memory store and mood timelines under ``root``, so test turns never reach data/."""
+    return {**env, "MEMORY_DIR": os.path.join(root, "memory"), "MOOD_DIR": os.path.join(root, "mood")}
+
+
+def spawn(args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def flask_worker(port: int) -> list[str]:
+    return [sys.executable, "-c", f"import web_app; web_app.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+
+
+def wait_ready(urls: list[str], procs: list[subprocess.Popen]) -> None:
+    """Block until every URL answers /api/status and is no longer warming up."""
+    deadline = time.time() + READY_TIMEOUT
+    for url in urls:
+        while True:
+            if any(p.poll() is not None for p in procs):
+                raise SystemExit("✗ A server process exited during start-up")
+            try:
+                resp = requests.get(f"{url}/api/status", timeout=30)
+                if resp.ok and not resp.json().get("warming"):
+                    break
+            except requests.RequestException:
+                pass
+            if time.time() > deadline:
+                raise SystemExit(f"✗ {url} did not become ready")
+            time.sleep(0.5)
+
+
+def start_single(env: dict) -> tuple[list[str], list[subprocess.Popen]]:
+    """The app as one Flask process with the brain in-process."""
+    port = free_port()
+    procs = [spawn(flask_worker(port), {**env, "BRAIN_SERVICE": "local"})]
+    return [f"http://127.0.0.1:{port}"], procs
+
+
+def start_multi(env: dict, workers: int, sock: str) -> tuple[list[str], list[subprocess.Popen]]:
+    """brain_service.py plus ``workers`` HTTP workers (gunicorn, or Flask servers balanced by the client)."""
+    env = {**env, "BRAIN_SERVICE": "socket", "BRAIN_SERVICE_SOCKET": sock}
+    procs = [spawn([sys.executable, "brain_service.py", "--socket", sock], env)]
+    deadline = time.time() + READY_TIMEOUT
+    while not os.path.exists(sock):
+        if procs[0].poll() is not None or time.time() > deadline:
+            raise SystemExit("✗ Brain service did not start")
+        time.sleep(0.2)
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        ports = [free_port() for _ in range(workers)]
+        procs += [spawn(flask_worker(p), env) for p in ports]
+        return [f"http://127.0.0.1:{p}" for p in ports], procs
+
+    port = free_port()
+    procs.append(spawn([
+        sys.executable, "-m", "gunicorn", "-w", str(workers), "-k", "gthread", "--threads", "8",
+        "-b", f"127.0.0.1:{port}", "--timeout", "300", "web_app:app",
+    ], env))
+    return [f"http://127.0.0.1:{port}"], procs
+
+
+def stop_all(procs: list[subprocess.Popen]) -> None:
+    for p in reversed(procs):
+        p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+# --- Server resource sampling (Linux /proc; no psutil needed) ---
+
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_stat(pid: int) -> Optional[tuple[int, int, int]]:
+    """(ppid, utime + stime ticks, RSS kB) for ``pid``, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return int(fields[1]), int(fields[11]) + int(fields[12]), rss_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def process_tree(roots: list[int]) -> dict[int, tuple[int, int]]:
+    """{pid: (cpu ticks, RSS kB)} for ``roots`` and all their descendants."""
+    stats = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            stat = _read_stat(int(name))
+            if stat is not None:
+                stats[int(name)] = stat
+    tree, frontier = {}, [p for p in roots if p in stats]
+    while frontier:
+        pid = frontier.pop()
+        if pid in tree:
+            continue
+        tree[pid] = stats[pid][1:]
+        frontier += [child for child, (ppid, _, _) in stats.items() if ppid == pid]
+    return tree
+
+
+class ResourceSampler(threading.Thread):
+    """Samples total RSS and CPU% of the server process tree every ``interval`` seconds."""
+
+    def __init__(self, roots: list[int], interval: float = 1.0):
+        super().__init__(name="resource-sampler", daemon=True)
+        self.roots = roots
+        self.interval = interval
+        self.samples: list[dict] = []
+        self._done = threading.Event()
+        self.available = os.path.isdir("/proc") and bool(roots)
+
+    def run(self):
+        if not self.available:
+            return
+        start = time.time()
+        last = process_tree(self.roots)
+        last_t = time.time()
+        while not self._done.wait(self.interval):
+            tree, now = process_tree(self.roots), time.time()
+            # CPU of processes alive in both samples (new processes start counting next time)
+            ticks = sum(t - last[pid][0] for pid, (t, _) in tree.items() if pid in last)
+            self.samples.append({
+                "t": round(now - start, 1),
+                "rss_mb": round(sum(rss for _, rss in tree.values()) / 1024, 1),
+                "cpu_pct": round(100 * ticks / CLK_TCK / (now - last_t), 1),
+                "processes": len(tree),
+            })
+            last, last_t = tree, now
+
+    def stop(self):
+        self._done.set()
+
+
+# --- Virtual users ---
+
+@dataclass
+class Sample:
+    kind: str
+    t: float  # Seconds since the test started when the request finished
+    latency_ms: float
+    ok: bool
+    ttft_ms: Optional[float] = None
+    error: Optional[str] = None
+    turn: Optional[int] = None  # turn_count reported by /api/chat
+    degradation: Optional[str] = None  # Load level the server answered a chat turn at
+
+
+def run_request(session: requests.Session, base: str, kind: str, rng: random.Random) -> Sample:
+    """Issue one request of ``kind``; never raises."""
+    start = time.perf_counter()
+    ttft = turn = mode = None
+    error = None
+    try:
+        if kind == "chat_stream":
+            body = {"message": rng.choice(PROMPTS), "profile": PROFILE}
+            with session.post(f"{base}/api/chat_stream", json=body, stream=True, timeout=300) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if not line.startswith(b"data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if ttft is None and event["type"] in ("token", "exercise_offer"):
+                        ttft = (time.perf_counter() - start) * 1000
+                    if event["type"] == "token" and event["token"].startswith("[Error"):
+                        error = event["token"]
+                    elif event["type"] == "error":
+                        error = event["error"]
+                    elif event["type"] == "done":
+                        mode = event.get("degradation")
+                if ttft is None and error is None:
+                    error = "stream ended without a reply"
+        elif kind == "chat":
+            body = {"message": rng.choice(PROMPTS), "profile": PROFILE}
+            resp = session.post(f"{base}/api/chat", json=body, timeout=300)
+            resp.raise_for_status()
+            data = resp.json()
+            turn = data.get("turn_count")
+            mode = data.get("degradation")
+            if str(data.get("response", "")).startswith("[Error"):
+                error = data["response"]
+        elif kind == "snapshot":
+            session.get(f"{base}/api/camera/snapshot", timeout=60).raise_for_status()
+        elif kind == "status":
+            session.get(f"{base}/api/status", timeout=60).raise_for_status()
+        else:
+            raise ValueError(f"unknown request kind {kind!r}")
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return Sample(kind, 0.0, (time.perf_counter() - start) * 1000, error is None, ttft, error, turn, mode)
+
+
+class LoadRun:
+    """``users`` virtual users, each looping request → think time until ``duration`` ends."""
+
+    def __init__(self, urls: list[str], users: int, duration: float, mix: dict[str, float], think: float, ramp: float, seed: int = 0):
+        self.urls = urls
+        self.users = users
+        self.duration = duration
+        self.mix = mix
+        self.think = think
+        self.ramp = ramp
+        self.seed = seed
+        self.samples: list[Sample] = []
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def _user(self, i: int, start: float) -> None:
+        rng = random.Random(self.seed * 1000 + i)
+        session = requests.Session()
+        time.sleep(self.ramp * i / max(1, self.users))
+        with self._lock:
+            self.active += 1
+        n = i
+        while time.time() - start < self.duration:
+            kind = rng.choices(list(self.mix), list(self.mix.values()))[0]
+            sample = run_request(session, self.urls[n % len(self.urls)], kind, rng)
+            n += 1
+            sample.t = round(time.time() - start, 2)
+            with self._lock:
+                self.samples.append(sample)
+            if self.think > 0:
+                time.sleep(min(rng.expovariate(1 / self.think), 5 * self.think))
+        with self._lock:
+            self.active -= 1
+
+    def run(self) -> float:
+        start = time.time()
+        threads = [threading.Thread(target=self._user, args=(i, start), daemon=True) for i in range(self.users)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.time() - start
+
+
+# --- Reporting ---
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 1)
+
+
+def summarize(run: LoadRun, elapsed: float, resources: list[dict]) -> dict:
+    endpoints = {}
+    for kind in run.mix:
+        samples = [s for s in run.samples if s.kind == kind]
+        ok = [s.latency_ms for s in samples if s.ok]
+        ttft = [s.ttft_ms for s in samples if s.ok and s.ttft_ms is not None]
+        errors = [s.error for s in samples if not s.ok]
+        endpoints[kind] = {
+            "requests": len(samples),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(samples), 4) if samples else 0.0,
+            "per_s": round(len(samples) / elapsed, 2),
+            "p50_ms": percentile(ok, 0.50),
+            "p90_ms": percentile(ok, 0.90),
+            "p99_ms": percentile(ok, 0.99),
+            "ttft_p50_ms": percentile(ttft, 0.50),
+            "ttft_p90_ms": percentile(ttft, 0.90),
+            "first_errors": sorted(set(errors))[:3],
+        }
+
+    turns = [s.turn for s in run.samples if s.turn is not None]
+    modes: dict[str, int] = {}
+    for s in run.samples:
+        if s.degradation:
+            modes[s.degradation] = modes.get(s.degradation, 0) + 1
+    total = len(run.samples)
+    failed = sum(not s.ok for s in run.samples)
+    return {
+        "users": run.users,
+        "elapsed_s": round(elapsed, 1),
+        "requests": total,
+        "throughput_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        # Two turns reporting the same turn_count means the shared counter raced
+        "turn_count_collisions": len(turns) - len(set(turns)),
+        "chat_turns_by_degradation": modes,
+        "endpoints": endpoints,
+        "resources": resources,
+        "peak_rss_mb": max((r["rss_mb"] for r in resources), default=None),
+        "mean_cpu_pct": round(statistics.mean(r["cpu_pct"] for r in resources), 1) if resources else None,
+    }
+
+
+def print_report(result: dict, timeline_every: float) -> None:
+    print("=" * 86)
+    print(f"Load Test ({result['users']} users, {result['elapsed_s']:.0f}s, {result['target']})")
+    print("=" * 86)
+    print(f"\n  {'endpoint':12s} {'reqs':>6s} {'err %':>6s} {'req/s':>7s} {'p50 ms':>9s} {'p90 ms':>9s} "
+          f"{'p99 ms':>9s} {'TTFT p50':>9s} {'TTFT p90':>9s}")
+
+    def cell(v, width=9):
+        return f"{v:{width}.1f}" if v is not None else f"{'-':>{width}s}"
+
+    for kind, e in result["endpoints"].items():
+        print(f"  {kind:12s} {e['requests']:6d} {100 * e['error_rate']:6.1f} {e['per_s']:7.2f} {cell(e['p50_ms'])} "
+              f"{cell(e['p90_ms'])} {cell(e['p99_ms'])} {cell(e['ttft_p50_ms'])} {cell(e['ttft_p90_ms'])}")
+        for err in e["first_errors"]:
+            print(f"      ! {err[:100]}")
+
+    print(f"\n  throughput: {result['throughput_per_s']:.2f} req/s, errors: {100 * result['error_rate']:.1f}%, "
+          f"turn_count collisions: {result['turn_count_collisions']}")
+    if result["chat_turns_by_degradation"]:
+        levels = ", ".join(f"{mode} {n}" for mode, n in result["chat_turns_by_degradation"].items())
+        print(f"  chat turns by degradation level: {levels}")
+
+    resources = result["resources"]
+    if resources:
+        print(f"  server: peak RSS {result['peak_rss_mb']:.0f} MB, mean CPU {result['mean_cpu_pct']:.0f}%\n")
+        print(f"  {'t (s)':>6s} {'RSS MB':>8s} {'CPU %':>7s} {'procs':>6s}")
+        next_t = 0.0
+        for r in resources:
+            if r["t"] >= next_t:
+                print(f"  {r['t']:6.0f} {r['rss_mb']:8.0f} {r['cpu_pct']:7.0f} {r['processes']:6d}")
+                next_t = r["t"] + timeline_every
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight or 1)
+    unknown = set(mix) - {"chat_stream", "chat", "snapshot", "status"}
+    if unknown:
+        raise SystemExit(f"✗ Unknown request kinds in --mix: {', '.join(sorted(unknown))}")
+    return {k: w for k, w in mix.items() if w > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic load test for the web API.")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of load")
+    parser.add_argument("--think", type=float, default=3.0, help="Mean think time between a user's requests (s)")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds over which users start")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Relative request weights, e.g. chat_stream=2,status=1")
+    parser.add_argument("--mode", choices=["single", "multi"], default="single", help="How to start the app")
+    parser.add_argument("--workers", type=int, default=4, help="HTTP workers in multi mode")
+    parser.add_argument("--url", help="Test an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, action="append", default=[], help="With --url: PID(s) to sample RSS/CPU of")
+    parser.add_argument("--camera", default="synthetic", help="CAMERA_SOURCE for the started app")
+    parser.add_argument("--tps", type=float, default=8.0, help="Fake LLM tokens per second")
+    parser.add_argument("--ttft", type=float, default=0.5, help="Fake LLM seconds before the first token")
+    parser.add_argument("--sample", type=float, default=1.0, help="Seconds between resource samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the full results (incl. raw samples) here")
+    parser.add_argument("--max-error-rate", type=float, help="Exit with status 1 if the error rate exceeds this")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    fake, procs, tmp = None, [], None
+    if args.url:
+        urls, roots, target = [args.url.rstrip("/")], args.server_pid, args.url
+    else:
+        from fake_ollama import FakeOllama
+
+        fake = FakeOllama(tps=args.tps, ttft=args.ttft).start()
+        tmp = tempfile.TemporaryDirectory()
+        env = scratch_env({**os.environ, "OLLAMA_BASE_URL": fake.url, "CAMERA_SOURCE": args.camera}, tmp.name)
+        if args.mode == "single":
+            urls, procs = start_single(env)
+        else:
+            urls, procs = start_multi(env, args.workers, os.path.join(tmp.name, "brain.sock"))
+        roots = [p.pid for p in procs]
+        target = f"{args.mode}, fake LLM {args.tps:g} tok/s, camera {args.camera}"
+
+    try:
+        if procs:
+            print("Starting server (loading models)...", file=sys.stderr)
+            wait_ready(urls, procs)
+        sampler = ResourceSampler(roots, args.sample)
+        sampler.start()
+        run = LoadRun(urls, args.users, args.duration, mix, args.think, args.ramp, args.seed)
+        elapsed = run.run()
+        sampler.stop()
+    finally:
+        stop_all(procs)
+        if fake is not None:
+            fake.stop()
+        if tmp is not None:
+            tmp.cleanup()
+
+    result = {"target": target, **summarize(run, elapsed, sampler.samples)}
+    print_report(result, timeline_every=max(args.sample, args.duration / 12))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({**result, "samples": [asdict(s) for s in run.samples]}, f, indent=2)
+        print(f"\n  results written to {args.json}")
+    if args.max_error_rate is not None and result["error_rate"] > args.max_error_rate:
+        print(f"\n✗ Error rate {100 * result['error_rate']:.1f}% exceeds {100 * args.max_error_rate:.1f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,28 @@
 """
 Wellbeing AI Companion — Main Entry Point.
 Runs the conversational loop connecting all modules.
+
+Usage: python main.py [--profile-startup] [--profile-turns]
 """
 
-import logging
 import sys
 
+from agent.startup import profiler
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    profiler.enable_imports()  # Before the imports below, so they are timed too
+PROFILE_TURNS = "--profile-turns" in sys.argv  # Sample-profile every turn into PROFILE_DIR
+
+import logging
+
 from agent.brain import AgentBrain
+from agent.deadline import TurnDeadline
+from agent.idle import manage_idle_models
+from agent.warmup import warm_up_models
 from interface.display import create_display
 from interface.camera import create_camera
-from config.config import CAMERA_ENABLED, CAMERA_SAMPLE_INTERVAL
+from config.config import CAMERA_ENABLED, CAMERA_SAMPLE_INTERVAL, WARMUP_MODELS
 
 
 def setup_logging():
@@ -26,18 +39,28 @@ def main():
     logger = logging.getLogger("main")
 
     display = create_display()
-    camera = create_camera()
+    with profiler.stage("camera"):
+        camera = create_camera()
 
     display.clear()
     display.show_welcome()
 
     # Initialize agent
     display.show_status("Initializing AI systems...")
-    brain = AgentBrain()
+    with profiler.stage("brain"):
+        brain = AgentBrain()
+    if WARMUP_MODELS:
+        warm_up_models(brain, camera)  # Loads models in the background while the user types
+    idle = manage_idle_models(brain, camera)
 
     # System check
-    status = brain.check_systems()
-    status["camera"] = camera.is_available() if CAMERA_ENABLED else False
+    with profiler.stage("system check"):
+        status = brain.check_systems()
+        status["camera"] = camera.is_available() if CAMERA_ENABLED else False
+    profiler.mark("ready")
+    if PROFILE_STARTUP:
+        profiler.disable_imports()
+        print(profiler.report(), file=sys.stderr)
     
     for system_name, ok in status.items():
         icon = "✓" if ok else "✗"
@@ -78,20 +101,24 @@ def main():
 
         turn_count += 1
 
-        # Capture facial emotion (if camera enabled and sampling interval reached)
+        # Capture facial emotion (if camera enabled, sampling interval reached and not shed under load)
+        load = brain.load.begin_turn()
+        deadline = TurnDeadline(brain.fallbacks)
         face_emotion = None
-        if CAMERA_ENABLED and status["camera"] and (turn_count % CAMERA_SAMPLE_INTERVAL == 0):
+        if CAMERA_ENABLED and status["camera"] and load.allows("camera") and (turn_count % CAMERA_SAMPLE_INTERVAL == 0):
             display.show_status("Capturing emotion from camera...")
-            face_emotion = camera.capture_emotion()
+            face_emotion = deadline.run("vision", camera.capture_emotion, None)
             if face_emotion:
                 display.show_emotion(face_emotion)
             else:
                 print("  ⚠️  No emotion detected (check camera, lighting, or face visibility)")
 
         display.show_status("Thinking...")
-        response = brain.process(user_input, face_emotion=face_emotion)
+        response = brain.process(user_input, face_emotion=face_emotion, load=load, deadline=deadline, profiled=PROFILE_TURNS)
         display.show_message("assistant", response)
 
+    idle.stop()
+    brain.load.close()
     camera.release()
     logger.info("Session ended.")
 
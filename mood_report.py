@@ -0,0 +1,61 @@
+"""
+Mood Trend Report
+Prints daily mood from the materialized mood timeline without reading
+the vector store.
+Usage: python mood_report.py [namespace] [days] [--rebuild]
+
+--rebuild backfills the timeline once from stored memories (scans ChromaDB).
+"""
+
+import sys
+
+from config.config import MEMORY_DEFAULT_NAMESPACE
+from agent.memory import collection_name_for
+from agent.mood_timeline import MoodTimeline, timeline_path_for
+
+
+def rebuild(namespace: str) -> None:
+    """Backfill the timeline for a namespace from its ChromaDB metadata."""
+    from agent.memory import MemoryNamespaces
+
+    memory = MemoryNamespaces().get(namespace)
+    turns = memory.rebuild_timeline()
+    print(f"✓ Rebuilt mood timeline for '{namespace}' from {turns} stored turns")
+
+
+def mood_report(namespace: str = MEMORY_DEFAULT_NAMESPACE, days: int = 14):
+    """Display daily mood rollups and the overall trend."""
+    print("=" * 80)
+    print("Mood Trend Report")
+    print("=" * 80)
+
+    timeline = MoodTimeline(timeline_path_for(collection_name_for(namespace)))
+    report = timeline.report(days)
+
+    print(f"\nNamespace: {namespace}")
+    print(f"Last {days} days: {report['turns']} turns, trend: {report['trend']}")
+    if report["average"] is not None:
+        print(f"Average sentiment: {report['average']:+.2f}")
+
+    if not report["daily"]:
+        print("\nNo mood data in this period.")
+        return
+
+    print()
+    for day in report["daily"]:
+        avg = day["avg_sentiment"]
+        bar = ("█" * int(abs(avg) * 20)).rjust(20) if avg < 0 else " " * 20
+        bar += "|" + ("█" * int(avg * 20) if avg > 0 else "")
+        print(
+            f"  {day['start'][:10]}  {avg:+.2f} {bar:41s} "
+            f"{day['count']:3d} turns, mostly {day['dominant_emotion']}"
+        )
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    ns = args[0] if args else MEMORY_DEFAULT_NAMESPACE
+    if "--rebuild" in sys.argv:
+        rebuild(ns)
+    mood_report(ns, int(args[1]) if len(args) > 1 else 14)
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from agent import deadline
+from agent.deadline import FallbackLog, TurnDeadline
+
+
+@pytest.fixture(autouse=True)
+def clear_stuck():
+    deadline._stuck.clear()
+    yield
+    deadline._stuck.clear()
+
+
+def test_run_returns_value_within_budget():
+    log = FallbackLog()
+    turn = TurnDeadline(log, total=5.0, budgets={"sentiment": 1.0})
+    assert turn.run("sentiment", lambda x: x * 2, None, 21) == 42
+    assert turn.fallbacks == [] and log.snapshot()["counts"] == {}
+
+
+def test_run_falls_back_on_timeout():
+    release = threading.Event()
+    log = FallbackLog()
+    turn = TurnDeadline(log, total=5.0, budgets={"vision": 0.05})
+    started = time.monotonic()
+    assert turn.run("vision", release.wait, "neutral") == "neutral"
+    assert time.monotonic() - started < 1.0
+    assert turn.fell_back("vision")
+    assert turn.summary() == [{"stage": "vision", "reason": "timeout"}]
+    assert log.snapshot()["counts"] == {"vision": 1}
+    release.set()
+
+
+def test_run_falls_back_on_error():
+    def broken():
+        raise RuntimeError("camera unplugged")
+
+    turn = TurnDeadline(total=5.0, budgets={"vision": 1.0})
+    assert turn.run("vision", broken, "neutral") == "neutral"
+    assert turn.summary() == [{"stage": "vision", "reason": "error: camera unplugged"}]
+
+
+def test_stuck_stage_falls_back_immediately_until_it_returns():
+    release = threading.Event()
+    first = TurnDeadline(total=5.0, budgets={"retrieval": 0.05})
+    assert first.run("retrieval", release.wait, []) == []
+
+    calls = []
+    second = TurnDeadline(total=5.0, budgets={"retrieval": 1.0})
+    assert second.run("retrieval", lambda: calls.append(1) or ["hit"], []) == []
+    assert calls == []  # Never started while the earlier call is still blocked
+    assert second.summary() == [{"stage": "retrieval", "reason": "previous call still running"}]
+
+    release.set()
+    deadline._stuck["retrieval"].join(1.0)
+    third = TurnDeadline(total=5.0, budgets={"retrieval": 1.0})
+    assert third.run("retrieval", lambda: ["hit"], []) == ["hit"]
+    assert third.fallbacks == []
+
+
+def test_stuck_stage_does_not_block_other_stages():
+    release = threading.Event()
+    turn = TurnDeadline(total=5.0, budgets={"retrieval": 0.05, "sentiment": 1.0})
+    turn.run("retrieval", release.wait, [])
+    assert turn.run("sentiment", lambda: "positive", None) == "positive"
+    release.set()
+
+
+def test_budget_is_capped_by_the_turn_deadline():
+    turn = TurnDeadline(total=0.5, budgets={"first_token": 10.0, "vision": 0.1})
+    assert turn.budget("first_token") <= 0.5
+    assert turn.budget("vision") == 0.1
+    assert turn.budget("unbudgeted") <= 0.5
+
+
+def test_expired_turn_falls_back_without_waiting():
+    turn = TurnDeadline(total=0.0, budgets={"sentiment": 1.0})
+    started = time.monotonic()
+    assert turn.run("sentiment", lambda: time.sleep(0.5) or "late", "neutral") == "neutral"
+    assert time.monotonic() - started < 0.3
+
+
+def test_stream_relays_tokens():
+    turn = TurnDeadline(total=5.0, budgets={"first_token": 1.0})
+    assert list(turn.stream(lambda: iter(["Hel", "lo"]), "Sorry.")) == ["Hel", "lo"]
+    assert turn.fallbacks == []
+
+
+def test_stream_yields_fallback_when_first_token_is_late():
+    release = threading.Event()
+    closed = threading.Event()
+
+    def tokens():
+        try:
+            release.wait()
+            yield "late"
+        finally:
+            closed.set()
+
+    turn = TurnDeadline(total=5.0, budgets={"first_token": 0.05})
+    assert list(turn.stream(tokens, "Sorry, I'm slow today.")) == ["Sorry, I'm slow today."]
+    assert turn.summary() == [{"stage": "first_token", "reason": "timeout"}]
+    release.set()
+    assert closed.wait(1.0)  # The pump closes the abandoned token stream
+
+
+def test_stream_yields_fallback_when_opening_fails():
+    def tokens():
+        raise ConnectionError("ollama down")
+
+    turn = TurnDeadline(total=5.0, budgets={"first_token": 1.0})
+    assert list(turn.stream(tokens, "Sorry.")) == ["Sorry."]
+    assert turn.summary() == [{"stage": "first_token", "reason": "error: ollama down"}]
+
+
+def test_stream_keeps_partial_reply_on_stall(monkeypatch):
+    monkeypatch.setattr(deadline, "TURN_TOKEN_STALL", 0.05)
+    release = threading.Event()
+
+    def tokens():
+        yield "Take a"
+        yield " breath"
+        release.wait()
+        yield " ignored"
+
+    turn = TurnDeadline(total=5.0, budgets={"first_token": 1.0})
+    assert list(turn.stream(tokens, "Sorry.")) == ["Take a", " breath"]
+    assert turn.fell_back("token_stall") and not turn.fell_back("first_token")
+    release.set()
+
+
+def test_fallback_log_keeps_counts_and_recent_events():
+    log = FallbackLog(size=2)
+    for stage in ("vision", "vision", "retrieval"):
+        log.record(stage, "timeout", 12.34)
+    snapshot = log.snapshot()
+    assert snapshot["counts"] == {"vision": 2, "retrieval": 1}
+    assert [e["stage"] for e in snapshot["recent"]] == ["vision", "retrieval"]
+    assert snapshot["recent"][-1]["elapsed_ms"] == 12.3
@@ -0,0 +1,146 @@
+from agent import degradation
+from agent.degradation import DegradationController, LEVELS
+
+
+def make_controller(monkeypatch, clock, **kwargs):
+    monkeypatch.setattr(degradation, "time", clock)
+    options = dict(
+        enabled=True, target_latency=10.0, max_inflight=2, window=4, min_samples=2,
+        sample_max_age=120.0, raise_at=1.0, recover_at=0.6, raise_dwell=5.0, recover_dwell=30.0,
+    )
+    options.update(kwargs)
+    return DegradationController(**options)
+
+
+def run_turn(controller, clock, latency):
+    turn = controller.begin_turn()
+    clock.advance(latency)
+    turn.first_output()
+    turn.finish()
+    return turn
+
+
+def test_starts_normal_and_allows_everything(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock)
+    turn = controller.begin_turn()
+    assert turn.mode == "normal"
+    assert all(turn.allows(f) for f in ("camera", "rag", "full_reply", "sync_writes"))
+    assert turn.llm_overrides() == {}
+
+
+def test_one_slow_turn_alone_does_not_degrade(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock)
+    clock.advance(10)
+    run_turn(controller, clock, 30.0)
+    assert controller.mode == "normal"
+
+
+def test_slow_turns_raise_one_level_at_a_time(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock)
+    clock.advance(10)
+    run_turn(controller, clock, 20.0)
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"
+    # Samples are cleared on a change: the new level must prove itself before the next step
+    assert controller.mode == "no_camera"
+    run_turn(controller, clock, 20.0)
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_rag"
+
+
+def test_raise_dwell_limits_how_fast_levels_climb(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, raise_dwell=100.0, min_samples=1)
+    clock.advance(100)
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"  # Pressure is high but the dwell has not passed
+    clock.advance(100)
+    assert controller.mode == "no_rag"
+
+
+def test_recovery_needs_low_pressure_and_dwell(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, min_samples=1)
+    clock.advance(10)
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"
+
+    # Between recover_at and raise_at: hysteresis keeps the level
+    run_turn(controller, clock, 8.0)
+    clock.advance(60)
+    assert controller.mode == "no_camera"
+
+    run_turn(controller, clock, 1.0)
+    run_turn(controller, clock, 1.0)
+    run_turn(controller, clock, 1.0)
+    run_turn(controller, clock, 1.0)  # Window of 4 now only holds fast turns
+    assert controller.mode == "normal"
+
+
+def test_recovery_waits_for_recover_dwell(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, min_samples=1)
+    clock.advance(10)
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"
+    run_turn(controller, clock, 0.5)
+    assert controller.mode == "no_camera"  # Only 0.5 s into the level
+    clock.advance(30)
+    assert controller.mode == "normal"
+
+
+def test_inflight_turns_count_as_pressure(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock)
+    clock.advance(10)
+    turns = [controller.begin_turn() for _ in range(3)]
+    assert controller.mode == "no_camera"
+    assert controller.snapshot()["inflight"] == 3
+    for turn in turns:
+        turn.finish()
+    assert controller.snapshot()["inflight"] == 0
+
+
+def test_disabled_controller_never_degrades(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, enabled=False, min_samples=1)
+    clock.advance(10)
+    for _ in range(5):
+        run_turn(controller, clock, 60.0)
+    assert controller.mode == "normal"
+    assert controller.snapshot()["pressure"] > 1.0
+
+
+def test_level_is_fixed_when_the_turn_starts(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, min_samples=1)
+    clock.advance(10)
+    turn = controller.begin_turn()
+    run_turn(controller, clock, 20.0)
+    assert controller.mode == "no_camera"
+    assert turn.mode == "normal" and turn.allows("camera")
+    turn.finish()
+
+
+def test_short_replies_level_shortens_the_llm_call(monkeypatch, clock):
+    monkeypatch.setattr(degradation, "DEGRADE_MODEL", "tiny")
+    controller = make_controller(monkeypatch, clock)
+    turn = degradation.TurnLoad(controller, 1, LEVELS.index("short_replies"))
+    assert not turn.allows("rag") and not turn.allows("full_reply") and turn.allows("sync_writes")
+    assert turn.llm_overrides() == {"max_tokens": degradation.DEGRADE_MAX_TOKENS, "model": "tiny"}
+
+
+class RecordingMemory:
+    def __init__(self):
+        self.entries = []
+
+    def store(self, entry):
+        self.entries.append(entry)
+
+
+def test_deferred_writes_are_kept_and_flushed(monkeypatch, clock):
+    controller = make_controller(monkeypatch, clock, write_queue=1)
+    memory = RecordingMemory()
+    monkeypatch.setattr(controller, "_start_writer", lambda: None)
+    controller.store(memory, "a", defer=True)
+    assert memory.entries == []
+    controller.store(memory, "b", defer=True)  # Queue full: written now, never dropped
+    assert memory.entries == ["b"]
+    controller.flush()
+    assert memory.entries == ["b", "a"]
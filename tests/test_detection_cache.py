@@ -0,0 +1,85 @@
+import threading
+
+from interface import camera
+from interface.camera import CapturedFrame, DetectionCache
+
+
+def frame(seq, timestamp):
+    return CapturedFrame(None, seq, timestamp)
+
+
+def counting_detector(faces):
+    calls = []
+
+    def detect(captured):
+        calls.append(captured.seq)
+        return faces
+
+    return detect, calls
+
+
+def test_same_frame_is_detected_once(monkeypatch, clock):
+    monkeypatch.setattr(camera, "time", clock)
+    cache = DetectionCache(ttl=0.0)
+    detect, calls = counting_detector([{"box": [1, 2, 3, 4]}])
+    assert cache.get_or_detect(frame(1, clock.now), detect) == [{"box": [1, 2, 3, 4]}]
+    clock.advance(5)
+    cache.get_or_detect(frame(1, clock.now - 5), detect)
+    assert calls == [1]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_newer_frame_reuses_result_within_ttl(monkeypatch, clock):
+    monkeypatch.setattr(camera, "time", clock)
+    cache = DetectionCache(ttl=0.5)
+    detect, calls = counting_detector([])
+    cache.get_or_detect(frame(1, clock.now), detect)
+    clock.advance(0.2)
+    cache.get_or_detect(frame(2, clock.now), detect)
+    assert calls == [1]
+    clock.advance(0.4)  # Cached frame is now 0.6 s old
+    cache.get_or_detect(frame(3, clock.now), detect)
+    assert calls == [1, 3]
+    assert cache.latest.seq == 3
+
+
+def test_concurrent_callers_share_one_detection():
+    cache = DetectionCache(ttl=0.0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_detect(captured):
+        calls.append(captured.seq)
+        started.set()
+        release.wait(5)
+        return [{"box": [0, 0, 1, 1]}]
+
+    captured = frame(7, 0.0)
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_detect(captured, slow_detect)))
+    first.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_detect(captured, slow_detect))) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    release.set()
+    for t in [first] + waiters:
+        t.join(5)
+    assert calls == [7]
+    assert results == [[{"box": [0, 0, 1, 1]}]] * 4
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 3
+
+
+def test_failed_detection_releases_waiters():
+    cache = DetectionCache(ttl=0.0)
+
+    def broken(captured):
+        raise RuntimeError("model crashed")
+
+    try:
+        cache.get_or_detect(frame(1, 0.0), broken)
+    except RuntimeError:
+        pass
+    detect, calls = counting_detector([])
+    assert cache.get_or_detect(frame(1, 0.0), detect) == []
+    assert calls == [1]
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from config.config import EMOTION_ONNX_LABELS
+from interface.camera import order_faces
+from interface.emotion_backends import FER_LABELS, OnnxBackend
+
+SHAPE = (480, 640, 3)
+SMALL_CENTRE = {"box": [300, 220, 40, 40]}
+LARGE_CORNER = {"box": [0, 0, 200, 200]}
+MEDIUM = {"box": [500, 300, 100, 100]}
+
+
+@pytest.mark.parametrize("policy, primary", [
+    ("largest", LARGE_CORNER),
+    ("central", SMALL_CENTRE),
+    ("first", MEDIUM),
+])
+def test_order_faces_puts_primary_first_and_keeps_the_rest(policy, primary):
+    faces = [MEDIUM, SMALL_CENTRE, LARGE_CORNER]
+    ordered = order_faces(faces, SHAPE, policy)
+    assert ordered[0] is primary
+    assert [f for f in faces if f is not primary] == ordered[1:]
+
+
+def test_order_faces_single_face_is_unchanged():
+    assert order_faces([MEDIUM], SHAPE, "central") == [MEDIUM]
+    assert order_faces([], SHAPE, "largest") == []
+
+
+class StubNet:
+    """Stands in for the ONNX session: one score row per face, from its mean brightness."""
+
+    def __init__(self, batched=True):
+        self.batched = batched
+        self.calls = []
+
+    def __call__(self, blob):
+        self.calls.append(len(blob))
+        if not self.batched and len(blob) > 1:
+            raise RuntimeError("fixed batch size 1")
+        scores = np.zeros((len(blob), len(EMOTION_ONNX_LABELS)), dtype=np.float32)
+        for i, face in enumerate(blob):
+            scores[i, 0 if face.mean() < 128 else 1] = 10.0  # "neutral" for dark, "happiness" for bright
+        return scores
+
+
+def make_backend(net):
+    backend = OnnxBackend.__new__(OnnxBackend)
+    backend._mapping = np.zeros((len(EMOTION_ONNX_LABELS), len(FER_LABELS)))
+    for i, label in enumerate(EMOTION_ONNX_LABELS):
+        backend._mapping[i, FER_LABELS.index(EMOTION_ONNX_LABELS[label])] = 1.0
+    backend._size = (64, 64)
+    backend._batched = True
+    backend._forward = net
+    return backend
+
+
+def frame_with_faces():
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    frame[0:100, 0:100] = 255  # Bright face
+    return frame
+
+
+BOXES = [(0, 0, 100, 100), (200, 200, 80, 80), (400, 100, 60, 60)]
+
+
+def test_onnx_classifies_all_faces_in_one_pass():
+    net = StubNet()
+    results = make_backend(net).classify(frame_with_faces(), BOXES)
+    assert net.calls == [3]
+    assert [r["box"] for r in results] == [list(b) for b in BOXES]
+    assert [max(r["emotions"], key=r["emotions"].get) for r in results] == ["happy", "neutral", "neutral"]
+    for r in results:
+        assert set(r["emotions"]) == set(FER_LABELS)
+        assert sum(r["emotions"].values()) == pytest.approx(1.0, abs=1e-3)
+
+
+def test_onnx_fixed_batch_model_falls_back_to_one_pass_per_face():
+    net = StubNet(batched=False)
+    backend = make_backend(net)
+    batched = make_backend(StubNet()).classify(frame_with_faces(), BOXES)
+    assert backend.classify(frame_with_faces(), BOXES) == batched
+    assert net.calls == [3, 1, 1, 1]
+    backend.classify(frame_with_faces(), BOXES)
+    assert net.calls[4:] == [1, 1, 1]  # Does not retry the batch
+
+
+def test_onnx_skips_empty_crops():
+    net = StubNet()
+    results = make_backend(net).classify(frame_with_faces(), [(700, 500, 50, 50), (0, 0, 100, 100)])
+    assert [r["box"] for r in results] == [[0, 0, 100, 100]]
+    assert make_backend(net).classify(frame_with_faces(), []) == []
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+
+from interface.camera import CapturedFrame, FrameEncoder
+
+
+class FakeCamera:
+    """Serves ``frames`` new frames, then stalls (returns None, or repeats the last one)."""
+
+    def __init__(self, frames, repeat_last=False):
+        self.frames = frames
+        self.repeat_last = repeat_last
+        self.seq = 0
+
+    def latest_frame(self):
+        if self.seq < self.frames:
+            self.seq += 1
+        elif not self.repeat_last:
+            return None
+        return CapturedFrame(np.full((8, 8, 3), self.seq, dtype=np.uint8), self.seq, time.time())
+
+
+def test_stream_yields_each_new_frame_once():
+    encoder = FrameEncoder(FakeCamera(3, repeat_last=True))
+    stream = encoder.stream(fps=100, max_stall=0.1)
+    assert [encoded.seq for encoded in stream] == [1, 2, 3]
+
+
+def test_stream_ends_when_the_camera_stops_delivering():
+    encoder = FrameEncoder(FakeCamera(2))
+    started = time.monotonic()
+    assert [encoded.seq for encoded in encoder.stream(fps=100, max_stall=0.1)] == [1, 2]
+    assert time.monotonic() - started < 1.0
+
+
+def test_stream_ends_if_no_frame_ever_arrives():
+    encoder = FrameEncoder(FakeCamera(0))
+    assert list(encoder.stream(fps=100, max_stall=0.05)) == []
+
+
+def test_viewers_share_one_encode_per_frame():
+    encoder = FrameEncoder(FakeCamera(1, repeat_last=True))
+    first, second = encoder.latest(), encoder.latest()
+    assert first is second and first.jpeg.startswith(b"\xff\xd8")
+    assert (encoder.encodes, encoder.reuses) == (1, 1)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+
+from interface.camera import FrameGrabber
+
+
+class FakeCapture:
+    """VideoCapture stand-in producing numbered frames as fast as it is asked."""
+
+    def __init__(self, fail_grabs=0):
+        self.grabs = 0
+        self.retrieves = 0
+        self.fail_grabs = fail_grabs
+        self.lock = threading.Lock()
+
+    def grab(self):
+        with self.lock:
+            self.grabs += 1
+            return self.grabs > self.fail_grabs
+
+    def retrieve(self):
+        with self.lock:
+            self.retrieves += 1
+            return True, np.full((4, 4, 3), self.grabs % 256, dtype=np.uint8)
+
+
+def run_for(grabber, seconds):
+    grabber.start()
+    time.sleep(seconds)
+    grabber.stop()
+
+
+def test_latest_returns_the_newest_frame_without_blocking():
+    cap = FakeCapture()
+    grabber = FrameGrabber(cap, fps=0)
+    grabber.start()
+    try:
+        first = grabber.latest()
+        assert first is not None and first.seq >= 1
+        time.sleep(0.05)
+        later = grabber.latest()
+        assert later.seq > first.seq
+        started = time.monotonic()
+        grabber.latest()
+        assert time.monotonic() - started < 0.05
+    finally:
+        grabber.stop()
+
+
+def test_decodes_at_most_fps_but_keeps_draining_the_driver():
+    cap = FakeCapture()
+    grabber = FrameGrabber(cap, fps=20)
+    run_for(grabber, 0.3)
+    assert grabber.frames_decoded <= 8
+    assert grabber.frames_grabbed > 10 * grabber.frames_decoded
+    assert grabber.latest().seq == grabber.frames_decoded
+
+
+def test_no_frame_yet_waits_only_briefly():
+    grabber = FrameGrabber(FakeCapture(fail_grabs=10**9), fps=0)
+    grabber.start()
+    try:
+        started = time.monotonic()
+        assert grabber.latest(wait_first=0.1) is None
+        assert time.monotonic() - started < 0.5
+    finally:
+        grabber.stop()
+
+
+def test_stop_ends_the_thread():
+    grabber = FrameGrabber(FakeCapture(), fps=0)
+    grabber.start()
+    grabber.stop()
+    assert not grabber._thread.is_alive()
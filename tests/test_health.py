@@ -0,0 +1,74 @@
+import threading
+import time
+
+from agent.health import HealthMonitor
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_failing_probe_backs_off_and_recovers():
+    monitor = HealthMonitor(retry_min=1.0, retry_max=4.0)
+    healthy = [False]
+    monitor.add_probe("llm", lambda: healthy[0], interval=30.0)
+
+    first = monitor.refresh()["llm"]
+    assert not first.ok and first.failures == 1
+    due = monitor._probes["llm"].next_due - time.monotonic()
+    assert 0.9 < due <= 1.0
+    monitor.refresh()
+    monitor.refresh()
+    assert monitor.results()["llm"].failures == 3
+    assert 3.9 < monitor._probes["llm"].next_due - time.monotonic() <= 4.0  # 1, 2, 4: capped
+
+    healthy[0] = True
+    assert monitor.refresh()["llm"].ok
+    assert monitor.status() == {"llm": True}
+    assert 29.9 < monitor._probes["llm"].next_due - time.monotonic() <= 30.0
+
+
+def test_probe_errors_are_failures_with_a_message():
+    monitor = HealthMonitor()
+
+    def broken():
+        raise ConnectionError("refused")
+
+    monitor.add_probe("memory", broken, interval=30.0)
+    result = monitor.refresh()["memory"]
+    assert not result.ok and result.error == "ConnectionError: refused"
+    assert monitor.details()["memory"]["error"] == "ConnectionError: refused"
+
+
+def test_cached_status_never_blocks_on_a_running_probe():
+    monitor = HealthMonitor(retry_min=0.1, retry_max=5.0)
+    release = threading.Event()
+    monitor.add_probe("camera", lambda: release.wait(5), interval=30.0)
+    monitor.start()
+    try:
+        assert wait_for(lambda: monitor._probes["camera"].lock.locked())
+        started = time.monotonic()
+        assert monitor.status() == {"camera": False}
+        assert time.monotonic() - started < 0.05
+        release.set()
+        assert wait_for(lambda: monitor.status() == {"camera": True})
+    finally:
+        monitor.stop()
+
+
+def test_probe_added_while_running_is_probed_without_waiting_for_the_interval():
+    monitor = HealthMonitor(retry_min=0.1, retry_max=5.0)
+    monitor.add_probe("llm", lambda: True, interval=30.0)
+    monitor.start()
+    try:
+        assert wait_for(lambda: monitor.status() == {"llm": True})
+        time.sleep(0.05)  # Scheduler is now in its long wait
+        monitor.add_probe("camera", lambda: True, interval=30.0)
+        assert wait_for(lambda: monitor.status().get("camera"), timeout=1.0)
+    finally:
+        monitor.stop()
@@ -0,0 +1,80 @@
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from agent import lexicon
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return SentimentIntensityAnalyzer()
+
+
+@pytest.fixture
+def mapped(tmp_path, monkeypatch):
+    """Tables from a cache compiled into tmp_path, installed as the process mapping."""
+    monkeypatch.setattr(lexicon, "_mapped", None)
+    return lexicon.load_lexicon_cache(tmp_path / "vader.lexcache")
+
+
+def test_tables_hold_exactly_the_vader_entries(mapped, reference):
+    table, emojis = mapped
+    assert len(table) == len(reference.lexicon)
+    assert dict(table.items()) == reference.lexicon
+    assert len(emojis) == len(reference.emojis)
+    assert dict(emojis.items()) == reference.emojis
+
+
+def test_lookups_match_vader_dicts(mapped, reference):
+    table, emojis = mapped
+    for word in ("happy", "sad", ":)", "not", "ok", "unknownword", "", "HAPPY"):
+        assert (word in table) == (word in reference.lexicon)
+        assert table.get(word) == reference.lexicon.get(word)
+    assert table["love"] == reference.lexicon["love"]
+    with pytest.raises(KeyError):
+        table["definitely-not-a-word"]
+    for emoji, description in list(reference.emojis.items())[:50]:
+        assert emojis[emoji] == description
+    assert "happy" not in emojis  # ASCII keys are skipped without probing the emoji table
+    assert table.get(42) is None
+
+
+def test_memo_is_bounded_and_stays_correct(tmp_path, monkeypatch, reference):
+    monkeypatch.setattr(lexicon, "_mapped", None)
+    table, _ = lexicon.load_lexicon_cache(tmp_path / "vader.lexcache")
+    table._memo_size = 8
+    words = list(reference.lexicon)[:40] + ["missing-a", "missing-b"]
+    for _ in range(2):
+        for word in words:
+            assert table.get(word) == reference.lexicon.get(word)
+    assert len(table._memo) <= 8
+
+
+def test_analyzer_scores_match_vader(mapped, reference):
+    analyzer = lexicon.create_vader_analyzer(use_cache=True)
+    assert isinstance(analyzer.lexicon, lexicon.MappedTable)
+    for text in (
+        "I feel great today!",
+        "I'm not happy at all, this is the worst week.",
+        "Honestly it's kind of OK, but I'm SO tired :(",
+        "Thanks 😊 that really helped",
+        "nothing much",
+        "",
+    ):
+        assert analyzer.polarity_scores(text) == reference.polarity_scores(text)
+
+
+def test_stale_cache_is_rebuilt(tmp_path, monkeypatch, reference):
+    path = tmp_path / "vader.lexcache"
+    lexicon.build_lexicon_cache(path)
+    data = bytearray(path.read_bytes())
+    data[8:16] = b"\0" * 8  # Source signature no longer matches the installed lexicons
+    path.write_bytes(bytes(data))
+
+    monkeypatch.setattr(lexicon, "_mapped", None)
+    table, _ = lexicon.load_lexicon_cache(path)
+    assert table.get("happy") == reference.lexicon["happy"]
+
+
+def test_disabled_cache_uses_vader_loader():
+    analyzer = lexicon.create_vader_analyzer(use_cache=False)
+    assert isinstance(analyzer.lexicon, dict)
@@ -0,0 +1,86 @@
+import json
+import queue
+import threading
+import time
+
+from live_channel import LiveChannel
+
+
+class FakeSocket:
+    def __init__(self):
+        self.incoming: queue.Queue = queue.Queue()
+        self.sent: list[dict] = []
+
+    def receive(self, timeout=None):
+        try:
+            return self.incoming.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def send(self, raw):
+        self.sent.append(json.loads(raw))
+
+    def of_type(self, kind):
+        return [e for e in self.sent if e.get("type") == kind]
+
+
+class FakeBackend:
+    def __init__(self):
+        self.overlay_calls: list[bool] = []
+        self.emotion = "happy"
+
+    def status(self):
+        return {"status": {"camera": True, "llm": True}, "camera_enabled": True, "load": None}
+
+    def camera_overlay(self, passive=False):
+        self.overlay_calls.append(passive)
+        return {"emotion": self.emotion, "faces": []}
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def open_channel():
+    ws, backend = FakeSocket(), FakeBackend()
+    channel = LiveChannel(ws, backend, push_interval=0.02, status_interval=0.02)
+    thread = threading.Thread(target=channel.run, daemon=True)
+    thread.start()
+    return ws, backend, channel
+
+
+def test_no_overlay_until_the_client_opts_in():
+    ws, backend, channel = open_channel()
+    try:
+        assert wait_for(lambda: ws.of_type("status"))
+        time.sleep(0.1)
+        assert backend.overlay_calls == [] and ws.of_type("overlay") == []
+
+        ws.incoming.put(json.dumps({"type": "camera_on"}))
+        assert wait_for(lambda: ws.of_type("overlay"))
+        assert backend.overlay_calls[0] is False  # The opt-in itself counts as model use
+        assert all(backend.overlay_calls[1:]) and len(backend.overlay_calls) > 1  # Watcher polls are passive
+    finally:
+        channel.close()
+
+
+def test_camera_off_stops_polls_and_camera_on_resends_the_overlay():
+    ws, backend, channel = open_channel()
+    try:
+        ws.incoming.put(json.dumps({"type": "camera_on"}))
+        assert wait_for(lambda: ws.of_type("overlay"))
+        ws.incoming.put(json.dumps({"type": "camera_off"}))
+        time.sleep(0.1)
+        calls = len(backend.overlay_calls)
+        time.sleep(0.1)
+        assert len(backend.overlay_calls) == calls
+
+        ws.incoming.put(json.dumps({"type": "camera_on"}))
+        assert wait_for(lambda: len(ws.of_type("overlay")) == 2)  # Unchanged overlay is pushed again
+    finally:
+        channel.close()
@@ -0,0 +1,106 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+
+from agent import mood_timeline
+from agent.mood_timeline import MoodTimeline
+
+
+@pytest.fixture(autouse=True)
+def no_pending_flushes():
+    yield
+    with mood_timeline._dirty_lock:
+        mood_timeline._dirty.clear()
+
+
+def at(days_ago: int, hour: int = 12) -> float:
+    return datetime.combine(date.today() - timedelta(days=days_ago), time(hour)).timestamp()
+
+
+def test_turns_are_bucketed_by_day(tmp_path):
+    timeline = MoodTimeline(tmp_path / "mood.npz")
+    timeline.record(0.8, "positive", "happy", timestamp=at(1, 9))
+    timeline.record(-0.4, "negative", "sad", timestamp=at(1, 18))
+    timeline.record(0.6, "positive", "happy", timestamp=at(1, 20))
+    timeline.record(0.0, "neutral", "neutral", timestamp=at(3))
+
+    daily = timeline.daily(7)
+    assert [b.start.date() for b in daily] == [date.today() - timedelta(days=3), date.today() - timedelta(days=1)]
+    yesterday = daily[-1]
+    assert yesterday.count == 3
+    assert yesterday.avg_sentiment == pytest.approx(1.0 / 3)
+    assert yesterday.min_sentiment == pytest.approx(-0.4)
+    assert yesterday.max_sentiment == pytest.approx(0.8)
+    assert (yesterday.positive, yesterday.neutral, yesterday.negative) == (2, 0, 1)
+    assert yesterday.dominant_emotion == "happy"
+
+
+def test_hourly_buckets(tmp_path):
+    timeline = MoodTimeline(tmp_path / "mood.npz")
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    timeline.record(0.5, "positive", "happy", timestamp=now.timestamp())
+    timeline.record(-0.5, "negative", "angry", timestamp=(now - timedelta(hours=2)).timestamp())
+    timeline.record(0.9, "positive", "happy", timestamp=(now - timedelta(hours=30)).timestamp())
+    hourly = timeline.hourly(24)
+    assert [b.start for b in hourly] == [now - timedelta(hours=2), now]
+    assert hourly[0].dominant_emotion == "angry"
+
+
+def test_baseline_window_and_empty(tmp_path):
+    timeline = MoodTimeline(tmp_path / "mood.npz")
+    assert timeline.baseline(7) is None
+    timeline.record(0.2, "positive", "happy", timestamp=at(2))
+    timeline.record(0.4, "positive", "happy", timestamp=at(5))
+    timeline.record(-1.0, "negative", "sad", timestamp=at(30))  # Outside the window
+    timeline.record(-1.0, "negative", "sad", timestamp=at(0))   # Today is excluded
+    assert timeline.baseline(7) == pytest.approx(0.3)
+    assert timeline.baseline(2, before=date.today() - timedelta(days=1)) == pytest.approx(0.2)
+
+
+def test_trend(tmp_path):
+    timeline = MoodTimeline(tmp_path / "mood.npz")
+    for days_ago, score in ((6, -0.6), (5, -0.4), (2, 0.3), (1, 0.5)):
+        timeline.record(score, "neutral", "neutral", timestamp=at(days_ago))
+    assert timeline.trend(7) == "improving"
+    report = timeline.report(7)
+    assert report["turns"] == 4 and report["trend"] == "improving"
+    assert report["average"] == pytest.approx(-0.05)
+
+
+def test_rollups_grow_past_initial_rows(tmp_path):
+    timeline = MoodTimeline(tmp_path / "mood.npz")
+    for days_ago in range(100):
+        timeline.record(0.1, "positive", "happy", timestamp=at(days_ago))
+    assert len(timeline.daily(100)) == 100
+    assert timeline.baseline(99) == pytest.approx(0.1)
+
+
+def test_record_defers_the_write_until_flush(tmp_path):
+    path = tmp_path / "mood.npz"
+    timeline = MoodTimeline(path)
+    timeline.record(0.5, "positive", "happy", timestamp=at(1))
+    assert not path.exists()
+    assert timeline in mood_timeline._dirty
+    mood_timeline.flush_all()
+    assert path.exists() and timeline not in mood_timeline._dirty
+
+    reloaded = MoodTimeline(path)
+    assert reloaded.daily(3)[0].to_dict() == timeline.daily(3)[0].to_dict()
+    with np.load(path) as data:
+        assert "day_count" in data.files and "hour_count" in data.files
+
+
+def test_failed_write_keeps_changes_pending(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    timeline = MoodTimeline(blocker / "mood.npz")
+    timeline.record(0.5, "positive", "happy", timestamp=at(1))
+    mood_timeline.flush_all()
+    assert timeline in mood_timeline._dirty
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "mood.npz"
+    path.write_bytes(b"not a numpy file")
+    assert MoodTimeline(path).daily(7) == []
@@ -0,0 +1,74 @@
+import numpy as np
+
+from interface.camera import MotionGate
+
+FACE = [{"box": [200, 120, 160, 160], "emotions": {"happy": 0.9}}]
+
+
+def scene(value=100):
+    return np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def make_gate():
+    return MotionGate(threshold=4.0, max_reuse=2.0, backoff_min=0.5, backoff_max=2.0)
+
+
+def test_first_frame_always_runs_inference():
+    faces, thumb = make_gate().check(scene(), now=0.0)
+    assert faces is None and thumb.shape == (48, 64)
+
+
+def test_static_scene_reuses_faces_until_max_reuse():
+    gate = make_gate()
+    _, thumb = gate.check(scene(), now=0.0)
+    gate.record(thumb, FACE, now=0.0)
+    assert gate.check(scene(), now=1.0)[0] == FACE
+    assert gate.check(scene(), now=2.5)[0] is None
+    assert gate.stats()["skipped_static"] == 1
+
+
+def test_whole_frame_change_runs_inference():
+    gate = make_gate()
+    _, thumb = gate.check(scene(), now=0.0)
+    gate.record(thumb, FACE, now=0.0)
+    assert gate.check(scene(140), now=0.1)[0] is None
+
+
+def test_change_inside_face_box_is_not_averaged_away():
+    gate = make_gate()
+    _, thumb = gate.check(scene(), now=0.0)
+    gate.record(thumb, FACE, now=0.0)
+
+    moved_face = scene()
+    moved_face[120:280, 200:360] = 130  # Whole-frame mean change is only ~2.5
+    assert gate.check(moved_face, now=0.1)[0] is None
+
+    moved_elsewhere = scene()
+    moved_elsewhere[0:40, 0:100] = 130
+    assert gate.check(moved_elsewhere, now=0.1)[0] == FACE
+
+
+def test_no_face_backs_off_exponentially():
+    gate = make_gate()
+    _, thumb = gate.check(scene(), now=0.0)
+    gate.record(thumb, [], now=0.0)
+    assert gate.check(scene(), now=0.4)[0] == []       # Within 0.5 s backoff
+    assert gate.check(scene(), now=0.6)[0] is None
+    gate.record(thumb, [], now=0.6)
+    assert gate.check(scene(), now=1.5)[0] == []       # Backoff doubled to 1.0 s
+    gate.record(thumb, [], now=1.7)
+    gate.record(thumb, [], now=1.7)
+    assert gate.check(scene(), now=3.6)[0] == []       # Capped at 2.0 s
+    assert gate.check(scene(), now=3.8)[0] is None
+    assert gate.stats()["skipped_absent"] == 3
+
+
+def test_motion_ends_backoff_and_a_face_resets_it():
+    gate = make_gate()
+    _, thumb = gate.check(scene(), now=0.0)
+    gate.record(thumb, [], now=0.0)
+    assert gate.check(scene(160), now=0.1)[0] is None
+    gate.record(thumb, FACE, now=0.1)
+    gate.record(thumb, [], now=0.2)
+    assert gate.check(scene(), now=0.6)[0] == []
+    assert gate.check(scene(), now=0.8)[0] is None     # Back to backoff_min
@@ -0,0 +1,73 @@
+import pytest
+
+from agent.sentiment import SentimentAnalyzer, split_sentences
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentAnalyzer(sentence_cache_size=4)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(analyzer):
+    analyzer._sentence_cache.clear()
+    analyzer.cache_hits = analyzer.cache_misses = 0
+
+
+def test_split_sentences():
+    text = "I slept badly. Work was fine!  Was it?\n\nMaybe… tomorrow\nok"
+    assert split_sentences(text) == ["I slept badly.", "Work was fine!", "Was it?", "Maybe…", "tomorrow", "ok"]
+    assert split_sentences("") == [] and split_sentences("  \n ") == []
+    assert split_sentences("3.5 hours of sleep") == ["3.5 hours of sleep"]
+
+
+def test_single_sentence_matches_analyze(analyzer):
+    text = "I feel really good about today!"
+    result = analyzer.analyze_sentences(text)
+    assert result.compound == analyzer.analyze(text).compound
+    assert result.sentences == [(text, result.compound)]
+    assert analyzer.analyze_sentences("").label == "neutral"
+
+
+def test_sentences_are_scored_once_and_cached(analyzer):
+    text = "I love my new job. The commute is awful."
+    first = analyzer.analyze_sentences(text)
+    assert (analyzer.cache_hits, analyzer.cache_misses) == (0, 2)
+    assert [s for s, _ in first.sentences] == ["I love my new job.", "The commute is awful."]
+    assert first.sentences[0][1] > 0 > first.sentences[1][1]
+
+    edited = analyzer.analyze_sentences(text + " Still, I'm happy.")
+    assert (analyzer.cache_hits, analyzer.cache_misses) == (2, 3)
+    assert edited.sentences[:2] == first.sentences
+
+
+def test_aggregate_is_word_weighted(analyzer):
+    result = analyzer.aggregate([("great", 1.0), ("this is really quite bad", -0.5)])
+    assert result.compound == pytest.approx((1 * 1.0 + 5 * -0.5) / 6, abs=1e-4)
+    assert result.label == "negative"
+    assert analyzer.aggregate([]).label == "neutral"
+
+
+def test_sentence_cache_is_lru_bounded(analyzer):
+    for word in ("one.", "two.", "three.", "four."):
+        analyzer.score_sentence(word)
+    analyzer.score_sentence("one.")  # Now most recent
+    analyzer.score_sentence("five.")  # Evicts "two."
+    assert len(analyzer._sentence_cache) == 4
+    misses = analyzer.cache_misses
+    analyzer.score_sentence("one.")
+    assert analyzer.cache_misses == misses
+    analyzer.score_sentence("two.")
+    assert analyzer.cache_misses == misses + 1
+
+
+def test_stream_scorer_matches_whole_text(analyzer):
+    text = "Thanks for asking. I had a rough week, honestly. But the weekend was lovely"
+    scorer = analyzer.stream_scorer()
+    completed = []
+    for i in range(0, len(text), 7):
+        completed += scorer.feed(text[i:i + 7])
+    assert [s for s, _ in completed] == ["Thanks for asking.", "I had a rough week, honestly."]
+    result = scorer.finish()
+    assert result.compound == analyzer.analyze_sentences(text).compound
+    assert len(result.sentences) == 3
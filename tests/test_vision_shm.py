@@ -0,0 +1,109 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from interface.vision_worker import DetectionBoard, FrameRing
+
+
+def second_mapping(block_name):
+    # Not ``attach``: that unregisters the block from this process's resource tracker,
+    # which is right in the worker process but not in the process that created it
+    return shared_memory.SharedMemory(name=block_name)
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create(slots=3, capacity=32 * 24 * 3)
+    yield ring
+    ring.close(unlink=True)
+
+
+@pytest.fixture
+def board():
+    board = DetectionBoard.create(size=4096)
+    yield board
+    board.close(unlink=True)
+
+
+def frame(value, shape=(24, 32, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_empty_ring_has_no_frames(ring):
+    assert ring.latest_seq() == 0
+    assert ring.read_latest() is None
+    assert ring.read(1) is None
+
+
+def test_frames_round_trip_through_a_second_mapping(ring):
+    ring.write(frame(7), seq=1, timestamp=12.5)
+    ring.write(frame(9, (24, 32)), seq=2, timestamp=13.0)
+    reader = FrameRing(second_mapping(ring.name))
+    try:
+        first = reader.read(1)
+        assert first.seq == 1 and first.timestamp == 12.5
+        np.testing.assert_array_equal(first.frame, frame(7))
+        latest = reader.read_latest()
+        assert latest.seq == 2 and latest.frame.shape == (24, 32)
+        assert int(latest.frame[0, 0]) == 9
+    finally:
+        reader.close()
+
+
+def test_read_copies_out_of_shared_memory(ring):
+    ring.write(frame(1), seq=1, timestamp=0.0)
+    captured = ring.read(1)
+    ring.write(frame(2), seq=4, timestamp=0.0)  # Same slot
+    assert int(captured.frame[0, 0, 0]) == 1
+
+
+def test_lapped_frame_is_not_returned(ring):
+    for seq in range(1, 5):
+        ring.write(frame(seq), seq=seq, timestamp=float(seq))
+    assert ring.read(1) is None  # Slot now holds frame 4
+    assert ring.read(4).seq == 4
+    assert ring.read(2).seq == 2
+
+
+def test_torn_frame_is_rejected(ring):
+    ring.write(frame(3), seq=3, timestamp=0.0)
+    offset = ring._slot_offset(3)
+    struct.pack_into("<Q", ring._shm.buf, offset, 6)  # Writer has begun frame 6 in this slot
+    assert ring.read(3) is None
+
+
+def test_oversized_frame_is_downscaled_to_fit(ring):
+    ring.write(frame(5, (48, 64, 3)), seq=1, timestamp=0.0)
+    captured = ring.read(1)
+    assert captured.frame.nbytes <= ring.capacity
+    assert captured.frame.shape[2] == 3
+
+
+def test_attaching_to_a_non_ring_fails(board):
+    with pytest.raises(ValueError):
+        FrameRing(board._shm)
+
+
+def test_board_round_trip(board):
+    assert board.read() is None
+    board.write({"emotion": "happy", "seq": 3})
+    board.write({"emotion": "sad", "seq": 4})
+    reader = DetectionBoard(second_mapping(board.name))
+    try:
+        assert reader.read() == {"emotion": "sad", "seq": 4}
+    finally:
+        reader.close()
+
+
+def test_board_drops_state_that_does_not_fit(board):
+    board.write({"seq": 1})
+    board.write({"blob": "x" * 8192})
+    assert board.read() == {"seq": 1}
+
+
+def test_board_mid_update_is_not_read(board):
+    board.write({"seq": 1})
+    struct.pack_into("<Q", board._shm.buf, 0, 2)  # Writer has begun version 2
+    assert board.read() is None
@@ -1,24 +1,30 @@
 """
 Memory Database Viewer
 View all stored conversations without resetting.
+Usage: python view_memory.py [namespace]
 """
 
+import sys
+
 import chromadb
 from datetime import datetime
 
-from config.config import MEMORY_DIR, MEMORY_COLLECTION
+from config.config import MEMORY_DIR, MEMORY_DEFAULT_NAMESPACE
+from agent.memory import collection_name_for
 
-def view_memory():
-    """Display all stored conversations."""
+def view_memory(namespace: str = MEMORY_DEFAULT_NAMESPACE):
+    """Display all stored conversations for one memory namespace."""
     print("=" * 80)
     print("Memory Database Viewer")
     print("=" * 80)
     
     try:
         client = chromadb.PersistentClient(path=str(MEMORY_DIR))
-        collection = client.get_collection(name=MEMORY_COLLECTION)
+        collection = client.get_collection(name=collection_name_for(namespace))
         count = collection.count()
         
+        print(f"\nNamespace: {namespace}")
+        
         print(f"\nTotal conversations stored: {count}")
         
         if count == 0:
@@ -56,4 +62,4 @@ def view_memory():
         print(f"\n✗ Error reading memory: {e}")
 
 if __name__ == "__main__":
-    view_memory()
+    view_memory(sys.argv[1] if len(sys.argv) > 1 else MEMORY_DEFAULT_NAMESPACE)
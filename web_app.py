@@ -1,20 +1,45 @@
 """
 Flask web application for the Wellbeing AI Companion.
 Provides a browser-based interface accessible on Raspberry Pi.
+
+Usage: python web_app.py [--profile-startup]
 """
 
-import logging
 import sys
+
+from agent.startup import profiler
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    profiler.enable_imports()  # Before the imports below, so they are timed too
+
+import logging
 import base64
 import json
+import threading
 from flask import Flask, render_template, request, jsonify, Response
 from flask_cors import CORS
-from agent.brain import AgentBrain
-from interface.camera import create_camera
-from config.config import CAMERA_ENABLED, OLLAMA_BASE_URL, LLM_MODEL
+from brain_service import BrainService, ServiceClient, warming_status
+from live_channel import LiveChannel
+from config.config import (
+    CAMERA_ENABLED,
+    CAMERA_STREAM_FPS,
+    BRAIN_SERVICE,
+    BRAIN_SERVICE_SOCKET,
+    WS_PING_INTERVAL,
+    STARTUP_BACKGROUND_WARMUP,
+    PROFILE_ALLOW_HEADER,
+)
+
+try:
+    from flask_sock import Sock
+except ImportError:  # WebSocket channel is optional; the UI falls back to SSE + polling
+    Sock = None
 
 app = Flask(__name__)
 CORS(app)
+app.config['SOCK_SERVER_OPTIONS'] = {'ping_interval': WS_PING_INTERVAL}
+sock = Sock(app) if Sock is not None else None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,24 +48,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-brain = None
-camera = None
-turn_count = 0
+backend = None  # BrainService (in-process) or ServiceClient (shared brain service)
+_backend_lock = threading.Lock()
+_warmup_done = threading.Event()
 
 
-def initialize_agent():
-    """Initialize the AI agent and camera."""
-    global brain, camera
-    
-    logger.info("Initializing AI agent...")
-    brain = AgentBrain()
-    camera = create_camera()
-    
-    status = brain.check_systems()
-    status["camera"] = camera.is_available() if CAMERA_ENABLED else False
-    
-    logger.info(f"System status: {status}")
-    return status
+def get_backend():
+    """The brain/camera backend, created on first use.
+
+    With BRAIN_SERVICE="socket" this worker holds no state of its own and
+    forwards every call to brain_service.py, so any number of WSGI worker
+    processes can serve the app.
+    """
+    global backend
+    
+    with _backend_lock:
+        if backend is None:
+            if BRAIN_SERVICE == "socket":
+                logger.info(f"Using brain service at {BRAIN_SERVICE_SOCKET}")
+                backend = ServiceClient(BRAIN_SERVICE_SOCKET)
+            else:
+                backend = BrainService()
+    return backend
+
+
+def _warm_up():
+    """Build the backend in the background so the UI and a warming status are served at once."""
+    try:
+        get_backend()
+    except Exception as e:
+        logger.error(f"Backend warm-up failed: {e}", exc_info=True)
+    finally:
+        _warmup_done.set()
+    if PROFILE_STARTUP:
+        profiler.disable_imports()
+        print(profiler.report(), file=sys.stderr)
+
+
+if STARTUP_BACKGROUND_WARMUP:
+    threading.Thread(target=_warm_up, name="backend-warmup", daemon=True).start()
 
 
 @app.route('/')
@@ -51,54 +97,46 @@ def index():
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
-    """Check system status."""
-    global brain, camera
-    
-    if brain is None:
-        status = initialize_agent()
+    """System status from the health monitor's cache (``?fresh=1`` re-probes first)."""
+    fresh = request.args.get('fresh') in ('1', 'true')
+    if backend is None and STARTUP_BACKGROUND_WARMUP and not _warmup_done.is_set():
+        status = warming_status()  # Still loading; don't hold the request until the brain is up
     else:
-        status = brain.check_systems()
-        status["camera"] = camera.is_available() if CAMERA_ENABLED else False
-    
-    return jsonify({
-        "status": status,
-        "camera_enabled": CAMERA_ENABLED,
-        "ollama_url": OLLAMA_BASE_URL,
-        "model": LLM_MODEL
-    })
+        status = get_backend().status(fresh=fresh)
+    status["websocket"] = sock is not None
+    return jsonify(status)
+
+
+if sock is not None:
+    @sock.route('/ws')
+    def live_socket(ws):
+        """Single WebSocket carrying chat streams, camera updates and status changes."""
+        LiveChannel(ws, get_backend()).run()
+
+
+def _profile_requested() -> bool:
+    """True if the request asks for its turn to be profiled (``X-Profile-Turn: 1``) and PROFILE_ALLOW_HEADER is on."""
+    if not PROFILE_ALLOW_HEADER:
+        return False
+    return request.headers.get('X-Profile-Turn', '').lower() in ('1', 'true')
 
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """Process a chat message."""
-    global brain, camera, turn_count
-    
-    if brain is None:
-        initialize_agent()
+    agent = get_backend()
     
     data = request.json
     user_message = data.get('message', '').strip()
     capture_emotion = data.get('capture_emotion', False)
+    profile = data.get('profile') or None
+    profiled = _profile_requested()
     
     if not user_message:
         return jsonify({"error": "Empty message"}), 400
     
-    turn_count += 1
-    face_emotion = None
-    
-    if capture_emotion and CAMERA_ENABLED and camera.is_available():
-        logger.info("Capturing emotion from camera...")
-        face_emotion = camera.capture_emotion()
-        logger.info(f"Detected emotion: {face_emotion}")
-    
     try:
-        response = brain.process(user_message, face_emotion=face_emotion)
-        
-        return jsonify({
-            "response": response,
-            "face_emotion": face_emotion,
-            "turn_count": turn_count
-        })
+        return jsonify(agent.chat(user_message, capture_emotion=capture_emotion, profile=profile, profiled=profiled))
     except Exception as e:
         logger.error(f"Error processing message: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
@@ -107,48 +145,21 @@ def chat():
 @app.route('/api/chat_stream', methods=['POST'])
 def chat_stream():
     """Process a chat message and stream the response via SSE."""
-    global brain, camera, turn_count
-    
-    if brain is None:
-        initialize_agent()
+    agent = get_backend()
     
     data = request.json
     user_message = data.get('message', '').strip()
     capture_emotion = data.get('capture_emotion', False)
+    profile = data.get('profile') or None
+    profiled = _profile_requested()
     
     if not user_message:
         return jsonify({"error": "Empty message"}), 400
     
-    turn_count += 1
-    face_emotion = None
-    
-    if capture_emotion and CAMERA_ENABLED and camera.is_available():
-        logger.info("Capturing emotion from camera...")
-        face_emotion = camera.capture_emotion()
-        logger.info(f"Detected emotion: {face_emotion}")
-    
     def generate():
         try:
-            if face_emotion:
-                yield f"data: {json.dumps({'type': 'emotion', 'emotion': face_emotion})}\n\n"
-            
-            response_generator = brain.process(user_message, face_emotion=face_emotion, stream=True)
-            
-            # Check if brain triggered an exercise offer during processing
-            if brain._exercise_state.get("pending"):
-                exercises = brain.exercise_manager.get_all_exercises()
-                yield f"data: {json.dumps({'type': 'exercise_offer', 'exercises': exercises})}\n\n"
-                # Consume the text generator so it doesn't leak
-                for _ in response_generator:
-                    pass
-                brain._exercise_state["pending"] = False
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
-                return
-            
-            for token in response_generator:
-                yield f"data: {json.dumps({'type': 'token', 'token': token})}\n\n"
-                
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            for event in agent.chat_events(user_message, capture_emotion=capture_emotion, profile=profile, profiled=profiled):
+                yield f"data: {json.dumps(event)}\n\n"
         except Exception as e:
             logger.error(f"Error processing message stream: {e}", exc_info=True)
             yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
@@ -159,16 +170,15 @@ def chat_stream():
 @app.route('/api/camera/snapshot', methods=['GET'])
 def camera_snapshot():
     """Capture a single frame from the camera with emotion detection overlay."""
-    global camera
-    
-    if not CAMERA_ENABLED or camera is None:
+    if not CAMERA_ENABLED:
         return jsonify({"error": "Camera not enabled"}), 400
     
-    if not camera.is_available():
+    agent = get_backend()
+    if not agent.camera_available():
         return jsonify({"error": "Camera not initialized. Check webcam connection and permissions."}), 400
     
     try:
-        jpeg_bytes, emotion = camera.capture_snapshot_with_overlay()
+        jpeg_bytes, emotion = agent.snapshot()
         if jpeg_bytes is None:
             return jsonify({"error": "Failed to capture frame from webcam"}), 500
         
@@ -183,16 +193,76 @@ def camera_snapshot():
         return jsonify({"error": f"Camera error: {str(e)}"}), 500
 
 
+@app.route('/api/camera/frame.jpg', methods=['GET'])
+def camera_frame():
+    """Latest raw camera frame as binary JPEG; honours If-None-Match (304)."""
+    agent = get_backend()
+    
+    if not CAMERA_ENABLED or not agent.camera_available():
+        return jsonify({"error": "Camera not available"}), 400
+    
+    latest = agent.latest_jpeg()
+    if latest is None:
+        return jsonify({"error": "Failed to capture frame from webcam"}), 500
+    
+    jpeg, etag = latest
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers=headers)
+    return Response(jpeg, mimetype='image/jpeg', headers=headers)
+
+
+@app.route('/api/camera/stream', methods=['GET'])
+def camera_stream():
+    """MJPEG stream of raw frames; each frame is encoded once for all viewers."""
+    agent = get_backend()
+    
+    if not CAMERA_ENABLED or not agent.camera_available():
+        return jsonify({"error": "Camera not available"}), 400
+    
+    fps = request.args.get('fps', CAMERA_STREAM_FPS, type=float)
+    fps = min(max(fps, 0.5), CAMERA_STREAM_FPS)
+    
+    def generate():
+        for jpeg in agent.stream_jpeg(fps):
+            yield (
+                b"--frame\r\nContent-Type: image/jpeg\r\n"
+                b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n"
+                + jpeg + b"\r\n"
+            )
+    
+    return Response(
+        generate(),
+        mimetype='multipart/x-mixed-replace; boundary=frame',
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.route('/api/camera/overlay', methods=['GET'])
+def camera_overlay():
+    """Face boxes and emotion for the latest frame (JSON, no image data)."""
+    agent = get_backend()
+    
+    if not CAMERA_ENABLED or not agent.camera_available():
+        return jsonify({"error": "Camera not available"}), 400
+    
+    try:
+        return jsonify(agent.camera_overlay())
+    except Exception as e:
+        logger.error(f"Error building camera overlay: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/camera/emotion', methods=['GET'])
 def detect_emotion():
     """Detect emotion from current camera frame."""
-    global camera
+    agent = get_backend()
     
-    if not CAMERA_ENABLED or camera is None or not camera.is_available():
+    if not CAMERA_ENABLED or not agent.camera_available():
         return jsonify({"error": "Camera not available"}), 400
     
     try:
-        emotion = camera.capture_emotion()
+        emotion = agent.camera_emotion()
         return jsonify({
             "emotion": emotion,
             "success": emotion is not None
@@ -202,15 +272,35 @@ def detect_emotion():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/memory/stats', methods=['GET'])
+def memory_stats():
+    """Return per-namespace memory statistics for namespaces open in the brain process."""
+    return jsonify({"namespaces": get_backend().memory_stats()})
+
+
+@app.route('/api/mood/trend', methods=['GET'])
+def mood_trend():
+    """Return a mood-trend report from the materialized mood timeline."""
+    days = request.args.get('days', 14, type=int)
+    profile = request.args.get('profile') or None
+    return jsonify(get_backend().mood_trend(days, profile=profile))
+
+
+@app.route('/api/camera/stats', methods=['GET'])
+def camera_stats():
+    """Return camera capture, inference and detection-cache counters."""
+    stats = get_backend().camera_stats()
+    if stats is None:
+        return jsonify({"error": "Camera not available"}), 400
+    
+    return jsonify(stats)
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset_conversation():
     """Reset the conversation history."""
-    global brain, turn_count
-    
-    if brain:
-        brain._conversation_history = []
-        turn_count = 0
-        logger.info("Conversation reset")
+    if backend is not None or BRAIN_SERVICE == "socket":
+        get_backend().reset()
     
     return jsonify({"success": True})
 
@@ -218,15 +308,10 @@ def reset_conversation():
 @app.route('/api/trigger_exercise', methods=['POST'])
 def trigger_exercise():
     """Manually trigger an exercise offer (for demos/evaluation)."""
-    global brain
-    
-    if brain is None:
-        initialize_agent()
+    agent = get_backend()
     
     try:
-        brain._exercise_state["pending"] = True
-        exercises = brain.exercise_manager.get_all_exercises()
-        logger.info("Manual exercise trigger activated")
+        exercises = agent.trigger_exercise()
         
         return jsonify({
             "success": True,
@@ -240,26 +325,13 @@ def trigger_exercise():
 @app.route('/api/exercises', methods=['GET'])
 def list_exercises():
     """Return the full list of available exercises with step metadata."""
-    global brain
-    
-    if brain is None:
-        initialize_agent()
-    
-    return jsonify({"exercises": brain.exercise_manager.get_all_exercises()})
+    return jsonify({"exercises": get_backend().list_exercises()})
 
 
 @app.route('/api/exercise/skip', methods=['POST'])
 def skip_exercise():
     """Clear exercise state when user skips via frontend."""
-    global brain
-    
-    if brain is None:
-        initialize_agent()
-    
-    brain._exercise_state["pending"] = False
-    brain._exercise_state["active"] = False
-    brain._exercise_state["current_exercise"] = None
-    logger.info("Exercise skipped via frontend")
+    get_backend().skip_exercise()
     
     return jsonify({"success": True})
 
@@ -267,26 +339,16 @@ def skip_exercise():
 @app.route('/api/exercise/start', methods=['POST'])
 def start_exercise():
     """Start a specific exercise by name. Returns exercise steps with timer data."""
-    global brain
-    
-    if brain is None:
-        initialize_agent()
-    
     data = request.json
     exercise_name = data.get("name", "")
     
-    exercise = brain.exercise_manager.get_exercise_by_name(exercise_name)
+    exercise = get_backend().start_exercise(exercise_name)
     if exercise is None:
         return jsonify({"error": f"Exercise '{exercise_name}' not found"}), 404
     
-    brain._exercise_state["pending"] = False
-    brain._exercise_state["active"] = True
-    brain._exercise_state["current_exercise"] = exercise
-    logger.info(f"Starting exercise: {exercise.name}")
-    
     return jsonify({
         "success": True,
-        "exercise": exercise.to_dict()
+        "exercise": exercise
     })
 
 
@@ -294,5 +356,8 @@ if __name__ == '__main__':
     logger.info("Starting Wellbeing AI Web Application...")
     logger.info("Access the app at: http://localhost:5000")
     logger.info("Or from another device: http://<raspberry-pi-ip>:5000")
+    profiler.mark("ui_ready")
+    if PROFILE_STARTUP and not STARTUP_BACKGROUND_WARMUP:
+        threading.Thread(target=_warm_up, name="backend-warmup", daemon=True).start()
     
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)